@@ -1,10 +1,41 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes.route import router as agent_router
 from app.routes.authRoute import router as auth_router
+from app.services.mongodb_service import (
+    aclose_clients,
+    acounters_need_reconcile,
+    aensure_indexes,
+    areconcile_counters,
+)
+from app.services.job_queue import job_queue
+from app.services.scheduler import scheduler
+from app.services.linkedin_client import aclose_linkedin_http
+from app.utils.config import validate_config
+from app.utils.metrics import render_metrics
 import uvicorn
 
-app = FastAPI(title="LinkedIn AI Posting Agent")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    validate_config()
+    await aensure_indexes()
+    # First start after upgrading: seed the counters from the posts ledger
+    if await acounters_need_reconcile():
+        await areconcile_counters()
+    await job_queue.start()
+    # Submits to job_queue, so it starts after it and stops before it
+    await scheduler.start()
+    yield
+    await scheduler.stop()
+    await job_queue.stop()
+    await aclose_linkedin_http()
+    # Release pooled MongoDB connections on shutdown
+    await aclose_clients()
+
+
+app = FastAPI(title="LinkedIn AI Posting Agent", lifespan=lifespan)
 
 aorigins = [
     "https://post-sync-public-7uqj.vercel.app",  # Your Vercel frontend URL
@@ -26,6 +57,13 @@ app.include_router(auth_router)
 def root():
     return {"message": "Welcome to the LinkedIn AI Agent API 🚀"}
 
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8080, reload=True)
 
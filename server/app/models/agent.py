@@ -1,20 +1,29 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Annotated, Optional
 from typing import List
 from langchain_core.messages import BaseMessage
 
+
+def _latest(_previous, new):
+    """Reducer letting parallel graph branches both report their node."""
+    return new
+
 class AgentState(BaseModel):
     """Typed, validated state for LinkedIn content creation workflow."""
     messages: List[BaseMessage] = Field(default_factory=list)
     niche: str
     topic: Optional[str] = None
     post_draft: Optional[str] = None
+    draft_candidates: List[str] = Field(default_factory=list)
     is_approved: bool = False
     final_post: Optional[str] = None
-    current_node: str = "topic_generator"
+    current_node: Annotated[str, _latest] = "topic_generator"
     iteration_count: int = 0
     image_asset_urn: Optional[str] = None
+    idempotency_key: Optional[str] = None  # one per workflow; publishing it twice is a no-op
+    linkedin_post_id: Optional[str] = None
+    linkedin_post_url: Optional[str] = None
     started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     finished_at: Optional[datetime] = None
     user_email: Optional[str] = None  # Add this line
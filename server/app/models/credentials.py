@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class LinkedInCredentials(BaseModel):
+    """OAuth credentials of one LinkedIn member."""
+    user: str  # email, or the person URN when no email was shared
+    access_token: str
+    person_urn: str
+    expires_at: Optional[datetime] = None
+
+    def is_expired(self, skew_seconds: int = 60) -> bool:
+        if self.expires_at is None:
+            return False
+        expires_at = self.expires_at
+        if expires_at.tzinfo is None:  # MongoDB hands back naive UTC datetimes
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return (expires_at - datetime.now(timezone.utc)).total_seconds() <= skew_seconds
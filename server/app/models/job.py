@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Optional
+from uuid import uuid4
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    """A queued or finished run of the agent workflow."""
+    job_id: str = Field(default_factory=lambda: uuid4().hex)
+    niche: str
+    user_email: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    resumes: int = 0
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    worker: Optional[str] = None  # JobQueue.owner of the process running it
+    heartbeat_at: Optional[datetime] = None
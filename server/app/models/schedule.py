@@ -0,0 +1,100 @@
+from pydantic import BaseModel, Field, field_validator, model_validator
+from datetime import datetime, time, timedelta, timezone
+from enum import Enum
+from typing import List, Optional
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+
+class ScheduleCadence(str, Enum):
+    ONCE = "once"
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # MongoDB returns naive UTC datetimes
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class Schedule(BaseModel):
+    """A one-off or recurring autopilot run of the agent workflow for one user."""
+    schedule_id: str = Field(default_factory=lambda: uuid4().hex)
+    user_email: str
+    niche: str
+    cadence: ScheduleCadence
+    timezone: str = "UTC"  # IANA name; times of day are local to it
+    run_at: Optional[datetime] = None  # ONCE: when to run (naive = in timezone)
+    time_of_day: Optional[str] = Field(None, pattern=r"^([01]\d|2[0-3]):[0-5]\d$")  # DAILY/WEEKLY: "HH:MM"
+    weekdays: List[int] = Field(default_factory=list)  # WEEKLY: 0 = Monday ... 6 = Sunday
+    active: bool = True
+    next_run_at: Optional[datetime] = None  # UTC; what the scheduler polls on
+    last_run_at: Optional[datetime] = None
+    last_job_id: Optional[str] = None
+    runs: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @field_validator("niche")
+    @classmethod
+    def niche_not_empty(cls, v: str) -> str:
+        if not v or not v.strip():
+            raise ValueError("niche must not be empty")
+        return v
+
+    @field_validator("timezone")
+    @classmethod
+    def known_timezone(cls, v: str) -> str:
+        try:
+            ZoneInfo(v)
+        except Exception:
+            raise ValueError(f"unknown timezone: {v}")
+        return v
+
+    @field_validator("weekdays")
+    @classmethod
+    def valid_weekdays(cls, v: List[int]) -> List[int]:
+        if any(day not in range(7) for day in v):
+            raise ValueError("weekdays must be between 0 (Monday) and 6 (Sunday)")
+        return sorted(set(v))
+
+    @field_validator("next_run_at", "last_run_at", "created_at")
+    @classmethod
+    def utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        return _utc(v)
+
+    @model_validator(mode="after")
+    def cadence_fields(self) -> "Schedule":
+        if self.cadence == ScheduleCadence.ONCE:
+            if self.run_at is None:
+                raise ValueError("a one-off schedule needs run_at")
+            if self.run_at.tzinfo is None:
+                self.run_at = self.run_at.replace(tzinfo=ZoneInfo(self.timezone))
+            self.run_at = self.run_at.astimezone(timezone.utc)
+        elif self.time_of_day is None:
+            raise ValueError(f"a {self.cadence.value} schedule needs time_of_day")
+        if self.cadence == ScheduleCadence.WEEKLY and not self.weekdays:
+            raise ValueError("a weekly schedule needs at least one weekday")
+        return self
+
+    def next_run_after(self, after: datetime) -> Optional[datetime]:
+        """
+        First run strictly after the given instant, in UTC.
+
+        Returns:
+            Optional[datetime]: None if the schedule has no runs left.
+        """
+        if self.cadence == ScheduleCadence.ONCE:
+            return self.run_at if self.run_at > after else None
+        zone = ZoneInfo(self.timezone)
+        hour, minute = map(int, self.time_of_day.split(":"))
+        local_day = after.astimezone(zone).date()
+        for offset in range(8):
+            day = local_day + timedelta(days=offset)
+            if self.cadence == ScheduleCadence.WEEKLY and day.weekday() not in self.weekdays:
+                continue
+            candidate = datetime.combine(day, time(hour, minute), tzinfo=zone).astimezone(timezone.utc)
+            if candidate > after:
+                return candidate
+        return None
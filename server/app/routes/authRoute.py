@@ -1,10 +1,15 @@
-import json
+import hashlib
 import os
-import requests
 from fastapi import APIRouter, HTTPException, Header
 
 from app.services.Linkedin_credentials import set_credentials
+from app.services.linkedin_client import get_linkedin_http
 from app.services.mongodb_service import get_or_create_user
+from app.utils.config import USERINFO_CACHE_TTL_SECONDS
+from app.utils.logger import get_logger
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/auth/linkedin", tags=["LinkedIn OAuth"])
 
@@ -18,17 +23,38 @@ TOKEN_URL = "https://www.linkedin.com/oauth/v2/accessToken"
 USERINFO_URL = "https://api.linkedin.com/v2/userinfo"
 
 
+# Successful /userinfo responses keyed by a hash of the bearer token
+_userinfo_cache = TTLCache(USERINFO_CACHE_TTL_SECONDS)
+
+
+def _token_key(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+
+def _fetch_userinfo(access_token: str) -> dict:
+    """Call LinkedIn /userinfo, raising HTTPException on failure."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    res = get_linkedin_http().request("userinfo", "GET", USERINFO_URL, headers=headers)
+    logger.debug("⬅️ LinkedIn /userinfo status: %d", res.status_code)
+
+    if res.status_code == 401:
+        raise HTTPException(status_code=401, detail="Access token invalid or revoked")
+    elif res.status_code != 200:
+        raise HTTPException(status_code=res.status_code, detail=res.text)
+
+    data = res.json()
+    if not data.get("sub"):
+        raise HTTPException(status_code=400, detail="Could not get user ID from LinkedIn")
+    _userinfo_cache.set(_token_key(access_token), data)
+    return data
+
+
 # === Step 1: Exchange Code for Access Token ===
 @router.post("/token")
 def get_access_token(data: dict):
     code = data.get("code")
     redirect_uri = data.get("redirect_uri") or REDIRECT_URI
 
-    print("\n=================== LINKEDIN TOKEN DEBUG ===================")
-    print(f"Received code: {code}")
-    print(f"Received redirect_uri: {redirect_uri}")
-    print("============================================================\n")
-
     if not code:
         raise HTTPException(status_code=400, detail="Missing authorization code")
 
@@ -41,25 +67,36 @@ def get_access_token(data: dict):
     }
 
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    # Never log the payload or the response: they carry the code, client secret and token
+    logger.debug("➡️ Exchanging authorization code (received redirect_uri: %s)", redirect_uri)
 
-    print("➡️ Sending POST to LinkedIn token endpoint:")
-    print(json.dumps(payload, indent=2))
-    print("============================================================\n")
-
-    res = requests.post(TOKEN_URL, data=payload, headers=headers)
-    print(f"⬅️ LinkedIn token response status: {res.status_code}")
-    print(f"Response body:\n{res.text}\n")
+    # Authorization codes are single-use, so never retry after a 5xx
+    res = get_linkedin_http().request("token", "POST", TOKEN_URL, idempotent=False,
+                                      data=payload, headers=headers)
+    logger.debug("⬅️ LinkedIn token response status: %d", res.status_code)
 
     if res.status_code != 200:
         raise HTTPException(status_code=res.status_code, detail=res.text)
 
     token_data = res.json()
     access_token = token_data.get("access_token")
-    print("access_token:", access_token)
     if not access_token:
         raise HTTPException(status_code=400, detail="No access token in response")
 
-    print("✅ Access Token received successfully!")
+    logger.info("✅ Access Token received successfully!")
+
+    # Store the member's credentials now, while the token lifetime is known.
+    # Best effort: /me stores them again (without expiry) on the next page load.
+    try:
+        userinfo = _fetch_userinfo(access_token)
+        set_credentials(
+            access_token,
+            f"urn:li:person:{userinfo['sub']}",
+            user=userinfo.get("email"),
+            expires_in=token_data.get("expires_in"),
+        )
+    except HTTPException as e:
+        logger.warning("⚠️ Could not store credentials at token exchange: %s", e.detail)
     return token_data
 
 
@@ -70,39 +107,26 @@ def get_user_info(authorization: str = Header(...)):
         raise HTTPException(status_code=401, detail="Missing Bearer token")
 
     access_token = authorization.replace("Bearer ", "")
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    print("\n=================== LINKEDIN USER DEBUG ===================")
-    print(f"Authorization header: {authorization}")
-    print("============================================================\n")
-
-    res = requests.get(USERINFO_URL, headers=headers)
-    print(f"⬅️ LinkedIn /userinfo status: {res.status_code}")
-    print(f"Response:\n{res.text}\n")
-
-    if res.status_code == 401:
-        raise HTTPException(status_code=401, detail="Access token invalid or revoked")
-    elif res.status_code != 200:
-        raise HTTPException(status_code=res.status_code, detail=res.text)
-
-    data = res.json()
-    user_id = data.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=400, detail="Could not get user ID from LinkedIn")
 
+    data = _userinfo_cache.get(_token_key(access_token))
+    cached = data is not None
+    if not cached:
+        data = _fetch_userinfo(access_token)
+    user_id = data["sub"]
     person_urn = f"urn:li:person:{user_id}"
     email = data.get("email")
 
-    # Set credentials before initializing user
-    set_credentials(access_token, person_urn)
-    print(f"✅ Set credentials - token: {bool(access_token)}, urn: {person_urn}")
+    # Set credentials before initializing user (already stored if cached)
+    if not cached:
+        set_credentials(access_token, person_urn, user=email)
+        logger.info("✅ Set credentials for %s", person_urn)
 
     # Initialize user in MongoDB
     try:
         mongo_user = get_or_create_user(user_id, email)
-        print(f"MongoDB user data: {mongo_user}")
+        logger.debug("MongoDB user data: %s", mongo_user)
     except Exception as e:
-        print(f"Failed to initialize MongoDB user: {e}")
+        logger.error("❌ Failed to initialize MongoDB user: %s", e)
         mongo_user = {"total_posts": 0}
 
     return {
@@ -1,10 +1,33 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.temp_pydantic_v1_params import Query
-from pydantic import BaseModel
+import json
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional
+from uuid import uuid4
 from app.models.agent import AgentState
-from app.services.mongodb_service import get_job_summary_from_summary_collection, get_total_posts, get_user_post_count, get_user_posts
-from app.utils.logger import get_logger
-from app.services.agent_graph import app
+from app.models.schedule import Schedule, ScheduleCadence
+from app.services.mongodb_service import (
+    aget_job,
+    acreate_schedule,
+    alist_schedules,
+    adelete_schedule,
+    aget_job_summary_from_summary_collection,
+    areconcile_counters,
+    aget_user_post_count,
+    aget_user_posts_page,
+    arecord_workflow_outcome,
+)
+from app.utils.logger import get_logger, log_context
+from app.services.agent_graph import get_graph
+from app.services.job_queue import job_queue
+from app.services.scheduler import scheduler
+from app.services.batch_runner import run_batch
+from app.services.llm_cache import get_llm_cache_stats
+from app.services.linkedin_client import get_linkedin_http_stats
+from app.services.token_budget import TokenBudgetExceeded, aensure_token_budget
+from app.utils.config import BATCH_MAX_ITEMS
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/agent", tags=["Agent Workflow"])
@@ -13,65 +36,221 @@ router = APIRouter(prefix="/agent", tags=["Agent Workflow"])
 class NicheRequest(BaseModel):
     niche: str
     email: str  # Add this line
+    # Client-chosen key: retrying a request with it never publishes twice
+    idempotency_key: Optional[str] = Field(None, min_length=1, max_length=128)
 
-@router.post("/start")
+
+class ScheduleRequest(BaseModel):
+    email: str
+    niche: str
+    cadence: ScheduleCadence
+    timezone: str = "UTC"
+    run_at: Optional[datetime] = None
+    time_of_day: Optional[str] = None
+    weekdays: List[int] = Field(default_factory=list)
+
+
+class BatchRequest(BaseModel):
+    items: List[NicheRequest] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+    max_concurrency: Optional[int] = Field(None, ge=1)
+
+@router.post("/start", status_code=202)
 async def run_agent_workflow(req: NicheRequest):
     """
-    🚀 Run the AI agent workflow for a given niche.
+    🚀 Queue the AI agent workflow for a given niche.
+
+    Returns immediately with a job id; poll /agent/jobs/{job_id} for the result.
     """
     try:
-        state = AgentState(
-            niche=req.niche,
-            topic=None,
-            post_draft=None,
-            final_post=None,
-            image_asset_urn=None,
-            is_approved=False,
-            iteration_count=0,
-            user_email=req.email,  # Add this line
-        )
+        # Validate the request up front so bad input fails fast, not in a worker
+        AgentState(niche=req.niche, user_email=req.email)
+        await aensure_token_budget(req.email)
+        job = await job_queue.submit(req.niche, req.email, req.idempotency_key)
+        return {"status": job.status.value, "message": "Workflow queued", "job_id": job.job_id}
+
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.exception("❌ Failed to queue workflow: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to queue workflow: {str(e)}")
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    📋 Report the status and result of a queued workflow.
+    """
+    job = await aget_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.model_dump()
+
+
+@router.post("/jobs/{job_id}/resume", status_code=202)
+async def resume_job(job_id: str):
+    """
+    ⏯️ Continue a failed workflow from its last successful node.
+
+    Nodes that already finished (topic, draft, review, image) are not run
+    again, so their LLM calls are not paid twice.
+    """
+    job = await aget_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    try:
+        await job_queue.resume(job)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "queued", "message": "Workflow resuming", "job_id": job_id}
+
+@router.post("/schedules", status_code=201)
+async def create_schedule(req: ScheduleRequest):
+    """
+    🗓️ Register a one-off or recurring autopilot run.
+
+    cadence "once" runs at run_at; "daily" at time_of_day ("HH:MM"); "weekly"
+    at time_of_day on the given weekdays (0 = Monday). Times without an
+    offset are local to timezone (IANA name, default UTC).
+    """
+    try:
+        schedule = Schedule(user_email=req.email, **req.model_dump(exclude={"email"}))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    schedule.next_run_at = schedule.next_run_after(datetime.now(timezone.utc))
+    if schedule.next_run_at is None:
+        raise HTTPException(status_code=422, detail="run_at is in the past; the schedule would never run")
+
+    await acreate_schedule(schedule)
+    scheduler.wake()
+    logger.info("🗓️ Schedule %s created for %s (%s)", schedule.schedule_id, req.email, req.cadence.value)
+    return schedule.model_dump()
+
+
+@router.get("/schedules")
+async def list_schedules(email: str):
+    """
+    📋 A user's schedules with their next run, newest first.
+    """
+    return [schedule.model_dump() for schedule in await alist_schedules(email)]
+
+
+@router.delete("/schedules/{schedule_id}", status_code=204)
+async def delete_schedule(schedule_id: str, email: str):
+    """
+    🗑️ Stop and remove one of a user's schedules. Jobs it already started are kept.
+    """
+    if not await adelete_schedule(schedule_id, email):
+        raise HTTPException(status_code=404, detail=f"Schedule {schedule_id} not found")
+    return Response(status_code=204)
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.get("/stream")
+async def stream_agent_workflow(niche: str, email: str, idempotency_key: Optional[str] = None):
+    """
+    📡 Run the workflow and stream each node's state update as it completes.
+
+    Emits Server-Sent Events: one `node` event per executed node carrying
+    that node's partial state (topic, draft, review verdict, image URN,
+    publish result), then a final `done` event, or `error` on failure.
+    Compatible with the browser EventSource API.
+    """
+    try:
+        state = AgentState(niche=niche, user_email=email, idempotency_key=idempotency_key)
+        await aensure_token_budget(email)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    async def events():
+        with log_context(workflow_id=uuid4().hex):
+            logger.info("📡 Streaming workflow for niche: %s", niche)
+            try:
+                async for chunk in get_graph().astream(state):
+                    for node_name, update in chunk.items():
+                        logger.info("➡ Node executed: %s", node_name)
+                        yield _sse_event("node", {"node": node_name, "update": update})
+                yield _sse_event("done", {"status": "success"})
+            except Exception as e:
+                logger.exception("❌ Streamed workflow failed: %s", e)
+                # The graph never reached post_executor, which counts its own outcomes
+                await arecord_workflow_outcome(email, niche, succeeded=False)
+                yield _sse_event("error", {"status": "failed", "detail": str(e)})
 
-        logger.info("🚀 Starting workflow for niche: %s", req.niche)
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        final_state = None
-        async for s in app.astream(state):
-            node_name = list(s.keys())[0]
-            logger.info("➡ Node executed: %s", node_name)
-            final_state = s
 
-        logger.info("🎯 Workflow finished successfully for niche: %s", req.niche)
-        return {"status": "success", "message": "Workflow completed", "final_state": final_state}
+@router.post("/batch")
+async def run_agent_batch(req: BatchRequest):
+    """
+    📦 Run the workflow for many niches/accounts concurrently.
+
+    At most `max_concurrency` workflows (capped by BATCH_MAX_CONCURRENCY)
+    run at once. Returns per-item results and timings in request order.
+    """
+    for item in req.items:
+        try:
+            AgentState(niche=item.niche, user_email=item.email)
+            await aensure_token_budget(item.email)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except TokenBudgetExceeded as e:
+            raise HTTPException(status_code=429, detail=str(e))
 
+    try:
+        items = [(i.niche, i.email, i.idempotency_key) for i in req.items]
+        return await run_batch(get_graph(), items, req.max_concurrency)
     except Exception as e:
-        logger.exception("❌ Workflow execution failed: %s", e)
-        raise HTTPException(status_code=500, detail=f"Workflow execution failed: {str(e)}")
+        logger.exception("❌ Batch execution failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"Batch execution failed: {str(e)}")
+
 
 @router.get("/summary")
-def get_jobs_summary():
+async def get_jobs_summary():
     """
     ✅ Returns total completed and failed jobs.
     """
     try:
-        print("Fetching job summary from database...")
+        logger.debug("Fetching job summary from database...")
 
-        job_summary =get_job_summary_from_summary_collection()  
+        job_summary = await aget_job_summary_from_summary_collection()
         logger.info("Job summary fetched: completed=%d, failed=%d", job_summary["total_completed"], job_summary["total_failed"])
         
-        return {
-            "total_completed": get_total_posts(),
-            "total_failed": 0        }
+        return job_summary
 
     except Exception as e:
         logger.exception("Failed to fetch job summary: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch job summary: {str(e)}")
 
+@router.post("/counters/reconcile")
+async def reconcile_counters():
+    """
+    🔢 Rebuild the post counters from the posts ledger.
+    """
+    try:
+        return await areconcile_counters()
+    except Exception as e:
+        logger.exception("Failed to reconcile counters: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to reconcile counters: {str(e)}")
+
+
 @router.get("/user/post-count/{email}")
-def get_user_posts_count(email: str):
+async def get_user_posts_count(email: str):
     """
     Get the total number of posts for a specific user.
     """
     try:
-        count = get_user_post_count(email)
+        count = await aget_user_post_count(email)
         return {"count": count}
     except Exception as e:
         logger.exception("Failed to fetch user post count: %s", e)
@@ -79,27 +258,51 @@ def get_user_posts_count(email: str):
 
 
 @router.get("/user-posts/{email}")
-def get_user_posts_route(email: str, limit: int = Query(10, ge=1, le=100)):
+async def get_user_posts_route(
+    email: str,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
     """
-    📰 Get all posts published by a specific user.
+    📰 Get the posts published by a specific user, newest first, one page at a time.
 
     Args:
         email (str): User's email address.
-        limit (int): Number of posts to retrieve (default=10, max=100).
+        limit (int): Page size (default=10, max=100).
+        cursor (str): Continuation token from the previous response; omit for the first page.
 
     Returns:
-        JSON with the user's posts list.
+        JSON with the page of posts and next_cursor (null on the last page).
     """
     try:
-        posts = get_user_posts(email, limit)
+        page = await aget_user_posts_page(email, limit, cursor)
         return {
             "email": email,
-            "total_posts": len(posts),
-            "posts": posts,
+            "total_posts": len(page["posts"]),
+            "posts": page["posts"],
+            "next_cursor": page["next_cursor"],
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception("Failed to fetch posts for user %s: %s", email, e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch posts for user {email}: {e}",
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/llm-cache/stats")
+def get_llm_cache_statistics():
+    """
+    📊 Hit/miss statistics of the LLM response cache.
+    """
+    return get_llm_cache_stats()
+
+
+@router.get("/linkedin/stats")
+def get_linkedin_statistics():
+    """
+    📊 Per-endpoint latency, error and retry statistics for LinkedIn calls.
+    """
+    return get_linkedin_http_stats()
@@ -1,28 +1,130 @@
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
+
+from app.models.credentials import LinkedInCredentials
+from app.services.mongodb_service import (
+    save_linkedin_credentials,
+    find_linkedin_credentials,
+    afind_linkedin_credentials,
+)
+from app.utils.config import LINKEDIN_ACCESS_TOKEN, LINKEDIN_PERSON_URN, CREDENTIALS_CACHE_TTL_SECONDS
 from app.utils.logger import get_logger
+from app.utils.ttl_cache import TTLCache
 
 logger = get_logger(__name__)
 
-# Global variables to store credentials
-_access_token: Optional[str] = None
-_person_urn: Optional[str] = None
+# Per-user credentials, persisted in MongoDB and cached in-process for
+# CREDENTIALS_CACHE_TTL_SECONDS. An expired cached token is re-read at once:
+# the member may have logged in again through another process.
+_cache = TTLCache(CREDENTIALS_CACHE_TTL_SECONDS)
+
+Credentials = Tuple[Optional[str], Optional[str]]
+
+
+def _usable(credentials: Optional[LinkedInCredentials]) -> Credentials:
+    if credentials is None:
+        return None, None
+    if credentials.is_expired():
+        logger.warning("⚠️ LinkedIn token for %s has expired", credentials.user)
+        return None, None
+    return credentials.access_token, credentials.person_urn
+
+
+def _default_credentials() -> Credentials:
+    """Account configured via LINKEDIN_ACCESS_TOKEN / LINKEDIN_PERSON_URN."""
+    if not LINKEDIN_ACCESS_TOKEN or not LINKEDIN_PERSON_URN:
+        logger.warning("⚠️ No credentials found")
+    return LINKEDIN_ACCESS_TOKEN, LINKEDIN_PERSON_URN
+
+
+def _cached(user: str) -> Optional[LinkedInCredentials]:
+    """Cached credentials of user, unless missing or their token has expired."""
+    credentials = _cache.get(user)
+    return None if credentials is None or credentials.is_expired() else credentials
+
+
+def _remember(credentials: LinkedInCredentials) -> None:
+    _cache.set(credentials.user, credentials)
+
+
+def set_credentials(access_token: str, person_urn: str, user: Optional[str] = None,
+                    expires_in: Optional[int] = None) -> None:
+    """
+    Store LinkedIn credentials for a user.
 
-def set_credentials(access_token: str, person_urn: str) -> None:
-    """Set LinkedIn credentials globally."""
-    global _access_token, _person_urn
-    
+    Args:
+        access_token (str): OAuth access token.
+        person_urn (str): Member URN, e.g. urn:li:person:xxxx.
+        user (str, optional): Email of the member; defaults to the URN.
+        expires_in (int, optional): Token lifetime in seconds from the token
+            response. When omitted, a known expiry for the same token is kept.
+    """
     if not access_token or not person_urn:
-        logger.error("❌ Invalid credentials provided: token=%s, urn=%s", 
+        logger.error("❌ Invalid credentials provided: token=%s, urn=%s",
                     bool(access_token), bool(person_urn))
         return
-        
-    _access_token = access_token
-    _person_urn = person_urn
-    logger.info("✅ Credentials set successfully: urn=%s", person_urn)
-
-def get_credentials() -> Tuple[Optional[str], Optional[str]]:
-    """Get stored LinkedIn credentials."""
-    if not _access_token or not _person_urn:
-        logger.warning("⚠️ No credentials found")
-        
-    return _access_token, _person_urn
+
+    key = user or person_urn
+    if expires_in:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(expires_in))
+    else:
+        try:
+            previous = _cached(key) or find_linkedin_credentials(key)
+        except Exception:
+            previous = None
+        same_token = previous is not None and previous.access_token == access_token
+        expires_at = previous.expires_at if same_token else None
+
+    credentials = LinkedInCredentials(
+        user=key, access_token=access_token, person_urn=person_urn, expires_at=expires_at
+    )
+    _remember(credentials)
+    try:
+        save_linkedin_credentials(credentials)
+    except Exception as e:
+        logger.error("❌ Failed to persist LinkedIn credentials for %s: %s", key, e)
+    logger.info("✅ Credentials set successfully: user=%s, urn=%s", key, person_urn)
+
+
+def get_credentials(user: Optional[str] = None) -> Credentials:
+    """
+    Get LinkedIn credentials for a user.
+
+    Without a user, the account from the environment is used. With a user,
+    only that user's own token is ever returned, so one member's workflow
+    can never publish as another.
+    """
+    if user is None:
+        return _default_credentials()
+
+    credentials = _cached(user)
+    if credentials is None:
+        try:
+            credentials = find_linkedin_credentials(user)
+        except Exception as e:
+            logger.error("❌ Failed to load LinkedIn credentials for %s: %s", user, e)
+        if credentials is not None:
+            _remember(credentials)
+
+    if credentials is None:
+        logger.warning("⚠️ No credentials found for %s", user)
+    return _usable(credentials)
+
+
+async def aget_credentials(user: Optional[str] = None) -> Credentials:
+    """Async counterpart of get_credentials()."""
+    if user is None:
+        return _default_credentials()
+
+    credentials = _cached(user)
+    if credentials is None:
+        try:
+            credentials = await afind_linkedin_credentials(user)
+        except Exception as e:
+            logger.error("❌ Failed to load LinkedIn credentials for %s: %s", user, e)
+        if credentials is not None:
+            _remember(credentials)
+
+    if credentials is None:
+        logger.warning("⚠️ No credentials found for %s", user)
+    return _usable(credentials)
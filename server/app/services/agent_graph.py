@@ -1,42 +1,307 @@
 from __future__ import annotations
-import os
-from typing import Optional, Dict
+import asyncio
+import re
+import threading
+from typing import Optional, Dict, List
 from datetime import datetime, timezone
 
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langgraph.prebuilt import create_react_agent
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 
-from app.services.linkedin_service import post_to_linkedin, upload_media_to_linkedin
+from app.services.linkedin_service import (
+    publish_to_linkedin,
+    upload_media_to_linkedin,
+    apublish_to_linkedin,
+    aupload_media_to_linkedin,
+    post_url,
+    PublicationUnconfirmed,
+)
 from app.services.gemini_service import generate_gemini_image
-from app.services.mongodb_service import save_post
+from app.services.llm_cache import get_llm_cache
+from app.services.token_budget import (
+    TokenBudgetExceeded,
+    invoke_llm,
+    ainvoke_llm,
+    generate_candidates,
+    agenerate_candidates,
+)
+from app.services.mongodb_service import (
+    PUBLICATION_CLAIMED,
+    PUBLICATION_PUBLISHED,
+    PUBLICATION_UNCONFIRMED,
+    claim_publication,
+    finish_publication,
+    fail_publication,
+    hold_publication,
+    aclaim_publication,
+    afinish_publication,
+    afail_publication,
+    ahold_publication,
+    record_workflow_outcome,
+    arecord_workflow_outcome,
+    get_user_topics,
+    aget_user_topics,
+)
+from app.services.topic_index import DuplicateTopic, TopicIndex, get_topic_index, load_topic_index
+from app.services.rate_limiter import RateLimited
 from app.utils.logger import get_logger
-from app.utils.config import OPENAI_API_KEY
+from app.utils.metrics import REVIEW_ITERATIONS, instrument_node, llm_metrics
+from app.utils.config import (
+    OPENAI_API_KEY,
+    LLM_CACHE_NODES,
+    LLM_MODEL,
+    DRAFT_CANDIDATES,
+    REVIEW_MAX_ITERATIONS,
+    IMAGE_PROMPT_SOURCE,
+    TOPIC_SIMILARITY_THRESHOLD,
+    TOPIC_MAX_REGENERATIONS,
+)
 from app.models.agent import AgentState
 from app.utils.constants import (
     TOPIC_GENERATOR_SYSTEM_PROMPT,
     TOPIC_GENERATOR_USER_PROMPT,
+    TOPIC_GENERATOR_AVOID_PROMPT,
     CONTENT_CREATOR_SYSTEM_PROMPT,
     CONTENT_CREATOR_USER_PROMPT,
     REVIEWER_SYSTEM_PROMPT,
+    DRAFT_SELECTOR_SYSTEM_PROMPT,
+    DRAFT_SELECTOR_CANDIDATE,
     POST_EXECUTOR_SUCCESS_MESSAGE,
     POST_EXECUTOR_FAILURE_MESSAGE,
+    POST_LEDGER_ERROR,
+    LINKEDIN_POST_SUCCESS,
 )
 
 # === Logger ===
 logger = get_logger(__name__)
 
 # === LLM Configuration ===
-MAX_ITERATIONS = 1
-llm = ChatOpenAI(model="gpt-4o", temperature=0.7, openai_api_key=OPENAI_API_KEY)
+MAX_ITERATIONS = REVIEW_MAX_ITERATIONS
+# Created on first use (see get_llm); assign a model here to replace it
+llm: Optional[BaseChatModel] = None
+_llm_lock = threading.Lock()
+
+
+def get_llm() -> BaseChatModel:
+    """Return the shared chat model, creating the OpenAI client on first use."""
+    global llm
+    if llm is None:
+        with _llm_lock:
+            if llm is None:
+                # Imported here: the OpenAI SDK is a large share of import time
+                from langchain_openai import ChatOpenAI
+
+                llm = ChatOpenAI(model=LLM_MODEL, temperature=0.7, openai_api_key=OPENAI_API_KEY)
+    return llm
+
+# ------------------------------------------------------------
+# 🧱 Shared prompt & result helpers
+# ------------------------------------------------------------
+
+def _llm_for(node: str, state: AgentState):
+    """
+    Chat model for a node: instrumented and routed through the response cache
+    if the node opted in. The token_budget helpers add the node's max_tokens.
+
+    Rework passes (iteration_count > 0) skip the cache: their prompts repeat
+    the first pass's, so a cached reply would bring back the rejected draft.
+    """
+    update = {"callbacks": [llm_metrics], "metadata": {"node": node}}
+    cache = get_llm_cache()
+    if cache is not None and node in LLM_CACHE_NODES and state.iteration_count == 0:
+        update["cache"] = cache
+    return get_llm().model_copy(update=update)
+
+
+def _topic_messages(state: AgentState, avoid: List[str] = ()) -> List[BaseMessage]:
+    prompt = TOPIC_GENERATOR_USER_PROMPT.format(niche=state.niche)
+    if avoid:
+        prompt += TOPIC_GENERATOR_AVOID_PROMPT.format(topics="\n".join(f"- {topic}" for topic in avoid))
+    return [SystemMessage(TOPIC_GENERATOR_SYSTEM_PROMPT), HumanMessage(prompt)]
+
+
+def _topic_fallback(state: AgentState) -> Dict[str, Optional[str]]:
+    fallback = f"{state.niche} insight {datetime.utcnow().isoformat()}"
+    return {"topic": fallback, "current_node": "topic_generator"}
+
+
+# Generated topics are checked against the user's posted topics in the niche
+# (see topic_index) and regenerated, with the clashes listed as topics to
+# avoid, before any drafting or image tokens are spent on a repeat.
+
+def _topic_index(state: AgentState) -> Optional[TopicIndex]:
+    """The user's index of posted topics in the niche, loaded on first use."""
+    if not state.user_email:
+        return None
+    index = get_topic_index(state.user_email, state.niche)
+    if index is None:
+        try:
+            topics = get_user_topics(state.user_email, state.niche)
+        except Exception as e:
+            logger.warning("⚠️ Posted topics unavailable, skipping the duplicate check: %s", e)
+            return None
+        index = load_topic_index(state.user_email, state.niche, topics)
+    return index
+
+
+async def _atopic_index(state: AgentState) -> Optional[TopicIndex]:
+    """Async counterpart of _topic_index()."""
+    if not state.user_email:
+        return None
+    index = get_topic_index(state.user_email, state.niche)
+    if index is None:
+        try:
+            topics = await aget_user_topics(state.user_email, state.niche)
+        except Exception as e:
+            logger.warning("⚠️ Posted topics unavailable, skipping the duplicate check: %s", e)
+            return None
+        index = load_topic_index(state.user_email, state.niche, topics)
+    return index
+
+
+def _posted_duplicate(index: Optional[TopicIndex], topic: str) -> Optional[str]:
+    """The posted topic most similar to topic, if it is similar enough to count as a repeat."""
+    matches = index.similar(topic, TOPIC_SIMILARITY_THRESHOLD) if index is not None else []
+    if not matches:
+        return None
+    similarity, posted = matches[0]
+    logger.warning("🔁 Topic %r repeats posted %r (similarity %.2f).", topic, posted, similarity)
+    return posted
+
+
+def _topic_outcome(topic: str) -> Dict[str, Optional[str]]:
+    logger.info("✅ Topic generated: %s", topic)
+    return {"topic": topic, "current_node": "topic_generator"}
+
+
+def _content_messages(state: AgentState) -> List[BaseMessage]:
+    return [
+        SystemMessage(CONTENT_CREATOR_SYSTEM_PROMPT),
+        HumanMessage(CONTENT_CREATOR_USER_PROMPT.format(topic=state.topic)),
+    ]
+
+
+def _content_fallback(state: AgentState) -> Dict[str, Optional[str]]:
+    return {"post_draft": f"{state.topic} — quick insight", "current_node": "content_creator"}
+
+
+def _content_outcome(drafts: List[str]) -> Dict[str, object]:
+    """State update for one draft, or for several candidates awaiting selection."""
+    if len(drafts) > 1:
+        logger.info("✍️ %d candidate drafts created.", len(drafts))
+    else:
+        logger.info("✍️ Post draft created successfully.")
+    return {"post_draft": drafts[0], "draft_candidates": drafts, "current_node": "content_creator"}
+
+
+def _review_messages(state: AgentState) -> List[BaseMessage]:
+    return [
+        SystemMessage(REVIEWER_SYSTEM_PROMPT),
+        HumanMessage(f"Critique this draft:\n\n{state.post_draft}"),
+    ]
+
+
+def _review_fallback(current_iter: int) -> str:
+    return "APPROVED" if current_iter >= MAX_ITERATIONS else "Minor rewrite suggested."
+
+
+def _review_outcome(state: AgentState, content: str, current_iter: int) -> Dict[str, Optional[str]]:
+    """Turn the reviewer's verdict into a state update."""
+    if "APPROVED" in content.upper() or current_iter >= MAX_ITERATIONS:
+        if current_iter >= MAX_ITERATIONS and "APPROVED" not in content.upper():
+            logger.warning("⚠️ Max iterations reached, forcing approval.")
+        logger.info("✅ Post approved.")
+        return {
+            "is_approved": True,
+            "final_post": state.post_draft,
+            "current_node": "reviewer",
+            "iteration_count": current_iter,
+        }
+    else:
+        logger.info("🔁 Rework suggested (iteration %d): %s", current_iter, content[:80])
+        return {
+            "post_draft": content,
+            "is_approved": False,
+            "current_node": "reviewer",
+            "iteration_count": current_iter,
+        }
+
+
+# With DRAFT_CANDIDATES > 1 the reviewer picks among candidates in one call
+# instead of the critique loop, trading tokens for sequential round trips.
+
+def _selection_messages(state: AgentState) -> List[BaseMessage]:
+    drafts = "\n\n".join(
+        DRAFT_SELECTOR_CANDIDATE.format(index=i, draft=draft)
+        for i, draft in enumerate(state.draft_candidates, start=1)
+    )
+    return [SystemMessage(DRAFT_SELECTOR_SYSTEM_PROMPT), HumanMessage(drafts)]
+
+
+def _selection_outcome(state: AgentState, content: str) -> Dict[str, object]:
+    """Approve the candidate the reviewer picked (the first one if the answer is unusable)."""
+    candidates = state.draft_candidates
+    match = re.search(r"\d+", content)
+    index = int(match.group()) - 1 if match else -1
+    if not 0 <= index < len(candidates):
+        logger.warning("⚠️ Unusable draft selection %r, keeping the first candidate.", content[:20])
+        index = 0
+    logger.info("✅ Draft %d of %d selected.", index + 1, len(candidates))
+    return {
+        "is_approved": True,
+        "post_draft": candidates[index],
+        "final_post": candidates[index],
+        "current_node": "reviewer",
+        "iteration_count": state.iteration_count + 1,
+    }
+
+
+IMAGE_PROMPT_SOURCES = ("topic", "final_post")
+
+
+def _image_prompt(state: AgentState) -> Optional[str]:
+    """
+    Text the image is rendered from: the approved post, or the topic when
+    the graph runs image generation before review (image_prompt_source "topic").
+    """
+    return state.final_post or state.topic
+
+
+def _image_outcome(asset_urn: Optional[str]) -> Dict[str, Optional[str]]:
+    # registerUpload returns urn:li:digitalmediaAsset:...
+    if asset_urn and asset_urn.startswith(("urn:li:digitalmediaAsset:", "urn:li:asset:")):
+        logger.info("🖼️ Image asset URN generated: %s", asset_urn)
+        return {"image_asset_urn": asset_urn, "current_node": "image_generation"}
+    logger.warning("⚠️ Image upload failed, post will be text-only.")
+    return {"image_asset_urn": None, "current_node": "image_generation"}
+
+
+def _post_result(status: str, post_urn: Optional[str] = None) -> Dict[str, object]:
+    return {
+        "messages": [{"role": "system", "content": status}],
+        "linkedin_post_id": post_urn,
+        "linkedin_post_url": post_url(post_urn),
+        "current_node": "post_executor",
+    }
+
+
+def _ledger_result(claim: str, entry: dict) -> Dict[str, object]:
+    """Outcome of a publish attempt the ledger turned into a no-op."""
+    if claim == PUBLICATION_PUBLISHED:
+        logger.info("♻️ Already published (%s), not publishing again.", entry.get("linkedin_post_url"))
+        return _post_result("post_success", entry.get("linkedin_post_id"))
+    if claim == PUBLICATION_UNCONFIRMED:
+        logger.warning("❓ An earlier attempt got no answer from LinkedIn and may have published this post; "
+                       "not publishing again.")
+        return _post_result("post_unconfirmed")
+    # The attempt holding the claim records the outcome
+    logger.warning("⏳ Another attempt is publishing this post right now; not publishing again.")
+    return _post_result("post_failed")
 
-# === LangGraph Tools (already decorated) ===
-posting_tools = [post_to_linkedin, generate_gemini_image, save_post]
-posting_agent = create_react_agent(model=llm, tools=posting_tools)
 
 # ------------------------------------------------------------
-# 🧩 Node Implementations
+# 🧩 Node Implementations (sync)
 # ------------------------------------------------------------
 
 def topic_generator_node(state: AgentState) -> Dict[str, Optional[str]]:
@@ -44,113 +309,92 @@ def topic_generator_node(state: AgentState) -> Dict[str, Optional[str]]:
 
     """Generate a topic for the given niche."""
     try:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", TOPIC_GENERATOR_SYSTEM_PROMPT),
-            ("user", TOPIC_GENERATOR_USER_PROMPT.format(niche=state.niche)),
-        ])
-        chain = prompt | llm
-        result = chain.invoke({"niche": state.niche})
-        topic = result.content.strip()
-        logger.info("✅ Topic generated: %s", topic)
-        return {"topic": topic, "current_node": "topic_generator"}
+        index = _topic_index(state)
+        avoid: List[str] = []
+        for _ in range(TOPIC_MAX_REGENERATIONS + 1):
+            result = invoke_llm("topic_generator", _llm_for("topic_generator", state),
+                                _topic_messages(state, avoid), state.user_email)
+            topic = result.content.strip()
+            posted = _posted_duplicate(index, topic)
+            if posted is None:
+                return _topic_outcome(topic)
+            avoid += [t for t in (posted, topic) if t not in avoid]
+        raise DuplicateTopic(state.user_email, state.niche, topic, posted)
+    except (TokenBudgetExceeded, RateLimited, DuplicateTopic):
+        raise
     except Exception as e:
         logger.exception("❌ Topic generation failed: %s", e)
-        fallback = f"{state.niche} insight {datetime.utcnow().isoformat()}"
-        return {"topic": fallback, "current_node": "topic_generator"}
+        return _topic_fallback(state)
 
 
 def content_creator_node(state: AgentState) -> Dict[str, Optional[str]]:
     logger.info("➡ Entering content_creator_node...")
 
-    """Generate a LinkedIn post draft from the topic."""
+    """Generate a LinkedIn post draft (or DRAFT_CANDIDATES candidates) from the topic."""
     try:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", CONTENT_CREATOR_SYSTEM_PROMPT),
-            ("user", CONTENT_CREATOR_USER_PROMPT.format(topic=state.topic)),
-        ])
-        chain = prompt | llm
-        result = chain.invoke({"topic": state.topic})
-        post_draft = result.content.strip()
-        logger.info("✍️ Post draft created successfully.")
-        return {"post_draft": post_draft, "current_node": "content_creator"}
+        if DRAFT_CANDIDATES > 1:
+            results = generate_candidates("content_creator", _llm_for("content_creator", state),
+                                          _content_messages(state), state.user_email, DRAFT_CANDIDATES)
+        else:
+            results = [invoke_llm("content_creator", _llm_for("content_creator", state), _content_messages(state),
+                                  state.user_email)]
+        return _content_outcome([result.content.strip() for result in results])
+    except (TokenBudgetExceeded, RateLimited):
+        raise
     except Exception as e:
         logger.exception("❌ Content creation failed: %s", e)
-        return {"post_draft": f"{state.topic} — quick insight", "current_node": "content_creator"}
+        return _content_fallback(state)
 
 
 def reviewer_node(state: AgentState) -> Dict[str, Optional[str]]:
     logger.info("➡ Entering reviewer_node...")
     """Review and refine post drafts until approved or max iterations reached."""
+    if len(state.draft_candidates) > 1:
+        try:
+            result = invoke_llm("draft_selector", _llm_for("draft_selector", state), _selection_messages(state),
+                                state.user_email)
+            content = result.content.strip()
+        except (TokenBudgetExceeded, RateLimited):
+            raise
+        except Exception as e:
+            logger.exception("⚠️ Draft selection failed: %s", e)
+            content = ""
+        return _selection_outcome(state, content)
+
     current_iter = state.iteration_count + 1
     try:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", REVIEWER_SYSTEM_PROMPT),
-            ("user", f"Critique this draft:\n\n{state.post_draft}"),
-        ])
-        chain = prompt | llm
-        result = chain.invoke({"post_draft": state.post_draft})
+        result = invoke_llm("reviewer", _llm_for("reviewer", state), _review_messages(state), state.user_email)
         content = result.content.strip()
+    except (TokenBudgetExceeded, RateLimited):
+        raise
     except Exception as e:
         logger.exception("⚠️ Review step failed: %s", e)
-        content = "APPROVED" if current_iter >= MAX_ITERATIONS else "Minor rewrite suggested."
+        content = _review_fallback(current_iter)
 
-    if "APPROVED" in content.upper() or current_iter >= MAX_ITERATIONS:
-        if current_iter >= MAX_ITERATIONS and "APPROVED" not in content.upper():
-            logger.warning("⚠️ Max iterations reached, forcing approval.")
-        logger.info("✅ Post approved.")
-        return {
-            "is_approved": True,
-            "final_post": state.post_draft,
-            "current_node": "reviewer",
-            "iteration_count": current_iter,
-        }
-    else:
-        logger.info("🔁 Rework suggested (iteration %d): %s", current_iter, content[:80])
-        return {
-            "post_draft": content,
-            "is_approved": False,
-            "current_node": "reviewer",
-            "iteration_count": current_iter,
-        }
+    return _review_outcome(state, content, current_iter)
 
 
 def image_generation_node(state: AgentState) -> Dict[str, Optional[str]]:
     logger.info("➡ Entering image_generation_node...")
     """Generate image using Gemini and upload to LinkedIn."""
-    if not state.final_post:
-        logger.warning("⚠️ No final_post available, skipping image generation.")
+    prompt = _image_prompt(state)
+    if not prompt:
+        logger.warning("⚠️ No post or topic available, skipping image generation.")
         return {"image_asset_urn": None, "current_node": "image_generation"}
 
-    TEMP_IMAGE_PATH = "temp_dummy_image.png"  # Hardcoded temp path
-
     try:
         # 1️⃣ Generate dummy image bytes
-        image_bytes = generate_gemini_image.invoke(state.final_post)
+        image_bytes = generate_gemini_image.invoke(prompt)
 
         if not image_bytes:
             logger.warning("⚠️ Image generation returned no data. Skipping image.")
             return {"image_asset_urn": None, "current_node": "image_generation"}
 
-        # 2️⃣ Save bytes temporarily to disk
-        with open(TEMP_IMAGE_PATH, "wb") as f:
-            f.write(image_bytes)
-        logger.info(f"✅ Dummy image saved at {TEMP_IMAGE_PATH}")
-
-        # 3️⃣ Upload to LinkedIn
-        asset_urn = upload_media_to_linkedin(TEMP_IMAGE_PATH)
-
-        # 4️⃣ Clean up temp file
-        if os.path.exists(TEMP_IMAGE_PATH):
-            os.remove(TEMP_IMAGE_PATH)
-            logger.info("🧹 Temporary image file removed.")
+        # 2️⃣ Upload the in-memory image to LinkedIn
+        asset_urn = upload_media_to_linkedin(image_bytes, state.user_email)
 
-        # 5️⃣ Return result
-        if asset_urn and asset_urn.startswith("urn:li:asset:"):
-            logger.info("🖼️ Image asset URN generated: %s", asset_urn)
-            return {"image_asset_urn": asset_urn, "current_node": "image_generation"}
-        else:
-            logger.warning("⚠️ Image upload failed, post will be text-only.")
-            return {"image_asset_urn": None, "current_node": "image_generation"}
+        # 3️⃣ Return result
+        return _image_outcome(asset_urn)
 
     except Exception as e:
         logger.exception("❌ Image generation error: %s", e)
@@ -162,57 +406,274 @@ def post_executor_node(state: AgentState) -> Dict[str, Optional[str]]:
     """Post content to LinkedIn and save record in MongoDB."""
     if not state.final_post:
         logger.error("❌ No final_post to publish.")
-        return {"messages": [{"role": "system", "content": "post_failed"}], "current_node": "post_executor"}
+        record_workflow_outcome(state.user_email, state.niche, succeeded=False)
+        return _post_result("post_failed")
 
+    entry = None
     try:
-        # 1️⃣ Post to LinkedIn
-        linkedin_response = post_to_linkedin.invoke({
-            "post_content": state.final_post,
-            "image_urn": state.image_asset_urn
-        })
-        logger.info("✅ LinkedIn post successful: %s", linkedin_response)
+        # 1️⃣ Claim the post in the ledger: a retry of a published workflow stops here
+        claim, entry = claim_publication(state.user_email, state.niche, state.topic, state.final_post,
+                                         state.image_asset_urn, state.idempotency_key)
+        if claim != PUBLICATION_CLAIMED:
+            return _ledger_result(claim, entry)
+
+        # 2️⃣ Post to LinkedIn
+        linkedin_response, post_urn = publish_to_linkedin(state.final_post, state.image_asset_urn,
+                                                          state.user_email)
+        if linkedin_response != LINKEDIN_POST_SUCCESS:
+            raise RuntimeError(linkedin_response)
+        logger.info("✅ LinkedIn post successful: %s", post_urn)
+    except PublicationUnconfirmed as e:
+        # The post may be live: keep the claim, so no retry publishes it again
+        hold_publication(entry, str(e))
+        record_workflow_outcome(state.user_email, state.niche, succeeded=False)
+        return _post_result("post_unconfirmed")
+    except Exception as e:
+        logger.exception(POST_EXECUTOR_FAILURE_MESSAGE.format(error=e))
+        if entry is not None:
+            fail_publication(entry, str(e))
+        record_workflow_outcome(state.user_email, state.niche, succeeded=False)
+        return _post_result("post_failed")
 
-        # 2️⃣ Save post to MongoDB with user email
-        save_post.invoke({
-            "user_email": state.user_email,  # Use email from state
-            "niche": state.niche,
-            "topic": state.topic,
-        })
+    # 3️⃣ Record the LinkedIn post in the ledger. The post is live now, so the
+    # claim is never released: a retry must not publish it again.
+    try:
+        finish_publication(entry, post_urn, post_url(post_urn))
         logger.info(f"✅ Post saved to MongoDB for user: {state.user_email}")
+    except Exception as e:
+        logger.exception(POST_LEDGER_ERROR.format(urn=post_urn, error=e))
+    return _post_result("post_success", post_urn)
+
+
+# ------------------------------------------------------------
+# ⚡ Node Implementations (async)
+# ------------------------------------------------------------
+# Same behaviour as the sync nodes, but LLM calls use ainvoke, LinkedIn
+# calls use httpx and MongoDB uses the async client. LangGraph runs sync
+# nodes on the default thread pool, which caps concurrent workflows at the
+# pool size; async nodes let one event loop interleave all of them.
+
+async def atopic_generator_node(state: AgentState) -> Dict[str, Optional[str]]:
+    """Async counterpart of topic_generator_node."""
+    logger.info("➡ Entering topic_generator node...")
+    try:
+        index = await _atopic_index(state)
+        avoid: List[str] = []
+        for _ in range(TOPIC_MAX_REGENERATIONS + 1):
+            result = await ainvoke_llm("topic_generator", _llm_for("topic_generator", state),
+                                       _topic_messages(state, avoid), state.user_email)
+            topic = result.content.strip()
+            posted = _posted_duplicate(index, topic)
+            if posted is None:
+                return _topic_outcome(topic)
+            avoid += [t for t in (posted, topic) if t not in avoid]
+        raise DuplicateTopic(state.user_email, state.niche, topic, posted)
+    except (TokenBudgetExceeded, RateLimited, DuplicateTopic):
+        raise
+    except Exception as e:
+        logger.exception("❌ Topic generation failed: %s", e)
+        return _topic_fallback(state)
+
+
+async def acontent_creator_node(state: AgentState) -> Dict[str, Optional[str]]:
+    """Async counterpart of content_creator_node."""
+    logger.info("➡ Entering content_creator_node...")
+    try:
+        if DRAFT_CANDIDATES > 1:
+            results = await agenerate_candidates("content_creator", _llm_for("content_creator", state),
+                                                 _content_messages(state), state.user_email, DRAFT_CANDIDATES)
+        else:
+            results = [await ainvoke_llm("content_creator", _llm_for("content_creator", state),
+                                         _content_messages(state), state.user_email)]
+        return _content_outcome([result.content.strip() for result in results])
+    except (TokenBudgetExceeded, RateLimited):
+        raise
+    except Exception as e:
+        logger.exception("❌ Content creation failed: %s", e)
+        return _content_fallback(state)
+
+
+async def areviewer_node(state: AgentState) -> Dict[str, Optional[str]]:
+    """Async counterpart of reviewer_node."""
+    logger.info("➡ Entering reviewer_node...")
+    if len(state.draft_candidates) > 1:
+        try:
+            result = await ainvoke_llm("draft_selector", _llm_for("draft_selector", state),
+                                       _selection_messages(state), state.user_email)
+            content = result.content.strip()
+        except (TokenBudgetExceeded, RateLimited):
+            raise
+        except Exception as e:
+            logger.exception("⚠️ Draft selection failed: %s", e)
+            content = ""
+        return _selection_outcome(state, content)
+
+    current_iter = state.iteration_count + 1
+    try:
+        result = await ainvoke_llm("reviewer", _llm_for("reviewer", state), _review_messages(state),
+                                   state.user_email)
+        content = result.content.strip()
+    except (TokenBudgetExceeded, RateLimited):
+        raise
+    except Exception as e:
+        logger.exception("⚠️ Review step failed: %s", e)
+        content = _review_fallback(current_iter)
+
+    return _review_outcome(state, content, current_iter)
+
+
+async def aimage_generation_node(state: AgentState) -> Dict[str, Optional[str]]:
+    """Async counterpart of image_generation_node."""
+    logger.info("➡ Entering image_generation_node...")
+    prompt = _image_prompt(state)
+    if not prompt:
+        logger.warning("⚠️ No post or topic available, skipping image generation.")
+        return {"image_asset_urn": None, "current_node": "image_generation"}
+
+    try:
+        # Image rendering is CPU-bound, keep it off the loop
+        image_bytes = await asyncio.to_thread(generate_gemini_image.invoke, prompt)
+
+        if not image_bytes:
+            logger.warning("⚠️ Image generation returned no data. Skipping image.")
+            return {"image_asset_urn": None, "current_node": "image_generation"}
+
+        asset_urn = await aupload_media_to_linkedin(image_bytes, state.user_email)
+        return _image_outcome(asset_urn)
+
+    except Exception as e:
+        logger.exception("❌ Image generation error: %s", e)
+        return {"image_asset_urn": None, "current_node": "image_generation"}
+
+
+async def apost_executor_node(state: AgentState) -> Dict[str, Optional[str]]:
+    """Async counterpart of post_executor_node."""
+    logger.info("➡ Entering post_executor_node...")
+    if not state.final_post:
+        logger.error("❌ No final_post to publish.")
+        await arecord_workflow_outcome(state.user_email, state.niche, succeeded=False)
+        return _post_result("post_failed")
 
-        return {"messages": [{"role": "system", "content": "post_success"}], "current_node": "post_executor"}
+    entry = None
+    try:
+        claim, entry = await aclaim_publication(state.user_email, state.niche, state.topic, state.final_post,
+                                                state.image_asset_urn, state.idempotency_key)
+        if claim != PUBLICATION_CLAIMED:
+            return _ledger_result(claim, entry)
+
+        linkedin_response, post_urn = await apublish_to_linkedin(state.final_post, state.image_asset_urn,
+                                                                 state.user_email)
+        if linkedin_response != LINKEDIN_POST_SUCCESS:
+            raise RuntimeError(linkedin_response)
+        logger.info("✅ LinkedIn post successful: %s", post_urn)
+    except PublicationUnconfirmed as e:
+        await ahold_publication(entry, str(e))
+        await arecord_workflow_outcome(state.user_email, state.niche, succeeded=False)
+        return _post_result("post_unconfirmed")
     except Exception as e:
         logger.exception(POST_EXECUTOR_FAILURE_MESSAGE.format(error=e))
-        return {"messages": [{"role": "system", "content": "post_failed"}], "current_node": "post_executor"}
+        if entry is not None:
+            await afail_publication(entry, str(e))
+        await arecord_workflow_outcome(state.user_email, state.niche, succeeded=False)
+        return _post_result("post_failed")
+
+    try:
+        await afinish_publication(entry, post_urn, post_url(post_urn))
+        logger.info(f"✅ Post saved to MongoDB for user: {state.user_email}")
+    except Exception as e:
+        logger.exception(POST_LEDGER_ERROR.format(urn=post_urn, error=e))
+    return _post_result("post_success", post_urn)
 
 
 # ------------------------------------------------------------
 # 🧭 Decision Function
 # ------------------------------------------------------------
 def decide_to_rework(state: AgentState) -> str:
-    return "image_generation" if state.is_approved else "content_creator"
+    if state.is_approved:
+        REVIEW_ITERATIONS.observe(state.iteration_count)
+        return "approved"
+    return "rework"
 
 
 # ------------------------------------------------------------
 # ⚙️ Graph Builder
 # ------------------------------------------------------------
-builder = StateGraph(AgentState)
-builder.add_node("topic_generator", topic_generator_node)
-builder.add_node("content_creator", content_creator_node)
-builder.add_node("reviewer", reviewer_node)
-builder.add_node("image_generation", image_generation_node)
-builder.add_node("post_executor", post_executor_node)
-
-builder.set_entry_point("topic_generator")
-builder.add_edge("topic_generator", "content_creator")
-builder.add_edge("content_creator", "reviewer")
-builder.add_conditional_edges("reviewer", decide_to_rework, {
-    "image_generation": "image_generation",
-    "content_creator": "content_creator",
-})
-builder.add_edge("image_generation", "post_executor")
-builder.add_edge("post_executor", END)
+SYNC_NODES = {
+    "topic_generator": topic_generator_node,
+    "content_creator": content_creator_node,
+    "reviewer": reviewer_node,
+    "image_generation": image_generation_node,
+    "post_executor": post_executor_node,
+}
+
+ASYNC_NODES = {
+    "topic_generator": atopic_generator_node,
+    "content_creator": acontent_creator_node,
+    "reviewer": areviewer_node,
+    "image_generation": aimage_generation_node,
+    "post_executor": apost_executor_node,
+}
+
+
+def build_graph(use_async: bool = True, image_prompt_source: str = IMAGE_PROMPT_SOURCE, checkpointer=None):
+    """
+    Build and compile the LinkedIn posting workflow.
+
+    Args:
+        use_async (bool): Use the async node implementations (default).
+            The sync nodes hold a worker thread for every LLM/HTTP call and
+            are kept for comparison (see benchmarks/bench_async_nodes.py).
+        image_prompt_source (str): "final_post" runs image generation and
+            upload after review; "topic" runs them as a branch started right
+            after topic generation, in parallel with drafting and review.
+        checkpointer: LangGraph checkpointer saving state after every node
+            (see mongodb_service.get_checkpointer). Runs of a checkpointed
+            graph need a thread_id in their config.
+    """
+    if image_prompt_source not in IMAGE_PROMPT_SOURCES:
+        raise ValueError(f"image_prompt_source must be one of {IMAGE_PROMPT_SOURCES}, got {image_prompt_source!r}")
+    nodes = ASYNC_NODES if use_async else SYNC_NODES
+    parallel_image = image_prompt_source == "topic"
+
+    builder = StateGraph(AgentState)
+    for name, node in nodes.items():
+        # Deferred: post_executor runs once, after both branches have finished
+        defer = parallel_image and name == "post_executor"
+        builder.add_node(name, instrument_node(name, node), defer=defer)
+
+    builder.set_entry_point("topic_generator")
+    builder.add_edge("topic_generator", "content_creator")
+    builder.add_edge("content_creator", "reviewer")
+    if parallel_image:
+        builder.add_edge("topic_generator", "image_generation")
+        builder.add_edge("image_generation", "post_executor")
+        builder.add_conditional_edges("reviewer", decide_to_rework, {
+            "approved": "post_executor",
+            "rework": "content_creator",
+        })
+    else:
+        builder.add_conditional_edges("reviewer", decide_to_rework, {
+            "approved": "image_generation",
+            "rework": "content_creator",
+        })
+        builder.add_edge("image_generation", "post_executor")
+    builder.add_edge("post_executor", END)
+
+    return builder.compile(checkpointer=checkpointer)
+
 
 # === Compile the Agent ===
-app = builder.compile()
-logger.info("✅ Agent graph compiled successfully.")
+# Built on first use, so importing the app does not compile the graph
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_graph():
+    """Return the shared default workflow graph (not checkpointed), compiling it on first use."""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = build_graph()
+                logger.info("✅ Agent graph compiled successfully.")
+    return _graph
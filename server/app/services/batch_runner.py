@@ -0,0 +1,73 @@
+import asyncio
+import time
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+from app.models.agent import AgentState
+from app.services.job_queue import summarize_final_state
+from app.services.mongodb_service import arecord_workflow_outcome
+from app.utils.config import BATCH_MAX_CONCURRENCY
+from app.utils.logger import get_logger, log_context
+
+logger = get_logger(__name__)
+
+
+async def _run_one(graph, index: int, niche: str, email: Optional[str], idempotency_key: Optional[str],
+                   semaphore: asyncio.Semaphore) -> dict:
+    async with semaphore:
+        with log_context(workflow_id=uuid4().hex):
+            started = time.perf_counter()
+            item = {"index": index, "niche": niche, "email": email}
+            try:
+                state = AgentState(niche=niche, user_email=email, idempotency_key=idempotency_key)
+                final_state = await graph.ainvoke(state)
+                result = summarize_final_state(final_state)
+                succeeded = result["outcome"] == "post_success"
+                item.update(
+                    status="success" if succeeded else "failed",
+                    result=result,
+                    error=None if succeeded else "Publishing failed",
+                )
+            except Exception as e:
+                logger.exception("❌ Batch item %d (%s) failed: %s", index, niche, e)
+                item.update(status="failed", result=None, error=str(e))
+                # The graph never reached post_executor, which counts its own outcomes
+                await arecord_workflow_outcome(email, niche, succeeded=False)
+            item["duration_seconds"] = round(time.perf_counter() - started, 3)
+            return item
+
+
+async def run_batch(graph, items: List[Tuple[Optional[str], ...]],
+                    max_concurrency: Optional[int] = None) -> dict:
+    """
+    Run the workflow for several (niche, email) pairs concurrently.
+
+    Args:
+        graph: Compiled agent graph.
+        items: (niche, email) or (niche, email, idempotency_key) tuples,
+            one workflow each.
+        max_concurrency (int, optional): Cap on simultaneous workflows. Never
+            exceeds BATCH_MAX_CONCURRENCY.
+
+    Returns:
+        dict: Per-item results in input order, plus totals and wall time.
+    """
+    limit = min(max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(1, limit))
+    logger.info("📦 Running batch of %d workflow(s), concurrency=%d", len(items), limit)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        _run_one(graph, i, niche, email, key[0] if key else None, semaphore)
+        for i, (niche, email, *key) in enumerate(items)
+    ))
+    succeeded = sum(1 for r in results if r["status"] == "success")
+
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "max_concurrency": limit,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
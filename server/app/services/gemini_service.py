@@ -1,9 +1,7 @@
 from typing import Optional
 from io import BytesIO
-from PIL import Image
 import os
-import google.generativeai as genai
-from langchain.tools import tool
+from langchain_core.tools import tool
 
 from app.utils.config import GEMINI_API_KEY
 from app.utils.logger import get_logger
@@ -12,13 +10,15 @@ from app.utils.constants import (
     GEMINI_IMAGE_GEN_FAIL,
     GEMINI_NO_IMAGE_DATA,
     GEMINI_IMAGE_SAVE_FAIL,
-    TEMP_FILE_REMOVED,
     GEMINI_MODEL,
     GEMINI_IMAGE_PROMPT_TEMPLATE,
 )
 
 logger = get_logger(__name__)
 
+# The Gemini client below is disabled. Its SDK (google.generativeai) takes
+# about a second to import, so import it inside the client when re-enabling it.
+
 
 # def get_gemini_client() -> bool:
 #     """Initialize Gemini with the API key."""
@@ -81,24 +81,21 @@ logger = get_logger(__name__)
 
 
 @tool("generate_gemini_image")
-def generate_gemini_image(prompt: str, temp_path: str = "generated_image.png") -> Optional[bytes]:
+def generate_gemini_image(prompt: str) -> Optional[bytes]:
     """
     Temporary stub for Gemini image generation.
-    Generates a dummy RGB image for testing workflows without a Gemini API key.
+    Generates a dummy RGB image in memory for testing workflows without a Gemini API key.
 
     Args:
-        temp_path (str, optional): Path to save the dummy image. Defaults to "generated_image.png".
+        prompt (str): The topic or description for the image.
 
     Returns:
-        Optional[bytes]: Image data in bytes.
+        Optional[bytes]: PNG image data in bytes.
     """
-    temp_path = "dummy_image.png"  # Hardcoded path
-    image = Image.new("RGB", (512, 512), color=(73, 109, 137))
-    image.save(temp_path)
-    logger.info(f"✅ Dummy image saved at {temp_path}")
-     # Read image bytes
-    with open(temp_path, "rb") as f:
-        image_bytes = f.read()
-
-    return image_bytes
+    from PIL import Image  # deferred: only needed once an image is generated
 
+    image = Image.new("RGB", (512, 512), color=(73, 109, 137))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    logger.info("✅ Dummy image generated in memory (%d bytes)", buffer.getbuffer().nbytes)
+    return buffer.getvalue()
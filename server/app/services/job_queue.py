@@ -0,0 +1,285 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+from uuid import uuid4
+
+from app.models.agent import AgentState
+from app.models.job import Job, JobStatus
+from app.services.agent_graph import build_graph
+from pymongo.errors import DuplicateKeyError
+
+from app.services.mongodb_service import (
+    get_checkpointer,
+    acreate_job,
+    aget_job,
+    aget_job_by_idempotency_key,
+    aupdate_job,
+    aheartbeat_job,
+    arelease_jobs,
+    arequeue_unfinished_jobs,
+    arecord_workflow_outcome,
+)
+from app.utils.config import JOB_WORKERS, JOB_LEASE_SECONDS
+from app.utils.logger import get_logger, log_context
+
+logger = get_logger(__name__)
+
+
+def summarize_final_state(final_state: dict) -> dict:
+    """Keep the JSON-friendly parts of a finished workflow state."""
+    messages = final_state.get("messages") or []
+    last_message = messages[-1] if messages else {}
+    if not isinstance(last_message, dict):
+        last_message = {"content": getattr(last_message, "content", None)}
+    return {
+        "topic": final_state.get("topic"),
+        "final_post": final_state.get("final_post"),
+        "image_asset_urn": final_state.get("image_asset_urn"),
+        "linkedin_post_id": final_state.get("linkedin_post_id"),
+        "linkedin_post_url": final_state.get("linkedin_post_url"),
+        "iteration_count": final_state.get("iteration_count", 0),
+        "outcome": last_message.get("content"),
+    }
+
+
+class JobQueue:
+    """
+    In-process queue of agent workflow runs backed by MongoDB job records.
+
+    Jobs are persisted before they are enqueued, so anything still queued or
+    running when the process stops is picked up again on the next start().
+    Each job runs on its own checkpoint thread (thread_id = job_id): a job
+    interrupted mid-run, or resumed after it failed, continues from its last
+    completed node instead of starting over.
+
+    Several processes may share the job records. A job runs in the worker
+    that moves it from 'queued' to 'running', which then keeps a heartbeat
+    on it. Running jobs whose heartbeat went stale are taken over on start()
+    and by a sweep every lease_seconds while the queue runs.
+    """
+
+    def __init__(self, graph=None, workers: int = JOB_WORKERS, lease_seconds: float = JOB_LEASE_SECONDS):
+        """
+        Args:
+            graph: Compiled agent graph. By default a graph checkpointed to
+                MongoDB is built on start().
+            lease_seconds (float): How long a running job may go without a
+                heartbeat before another process takes it over.
+        """
+        self.graph = graph
+        self._workers = max(1, workers)
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._waiting: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Re-enqueue unfinished jobs and spawn the worker and sweep tasks."""
+        if self._tasks:
+            return
+        if self.graph is None:
+            self.graph = build_graph(checkpointer=await asyncio.to_thread(get_checkpointer))
+        await self._requeue_unfinished()
+
+        self._tasks = [
+            asyncio.create_task(self._worker(n), name=f"job-worker-{n}")
+            for n in range(self._workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._sweep(), name="job-sweep"))
+        logger.info("✅ Job queue started with %d worker(s).", self._workers)
+
+    async def stop(self) -> None:
+        """Cancel the workers and the sweep. In-flight jobs go back to 'queued' and are retried on restart."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if tasks:
+            try:
+                released = await arelease_jobs(self.owner)
+                if released:
+                    logger.info("↩️ Released %d in-flight job(s).", released)
+            except Exception as e:
+                # Still taken over once their heartbeat is stale
+                logger.warning("⚠️ Could not release in-flight jobs: %s", e)
+        logger.info("🛑 Job queue stopped.")
+
+    async def submit(self, niche: str, user_email: Optional[str] = None,
+                     idempotency_key: Optional[str] = None) -> Job:
+        """
+        Persist a new job and hand it to the workers.
+
+        A repeated idempotency_key from the same user returns the job created
+        for it the first time instead of queuing another run.
+        """
+        job = Job(niche=niche, user_email=user_email, idempotency_key=idempotency_key)
+        try:
+            await acreate_job(job)
+        except DuplicateKeyError:
+            existing = await aget_job_by_idempotency_key(user_email, idempotency_key) if idempotency_key else None
+            if existing is None:
+                raise
+            logger.info("♻️ Job %s already exists for idempotency key %s", existing.job_id, idempotency_key)
+            return existing
+        self._enqueue(job.job_id)
+        logger.info("📥 Job %s queued for niche: %s", job.job_id, niche)
+        return job
+
+    async def resume(self, job: Job) -> None:
+        """
+        Re-enqueue a failed job to continue from its last checkpoint.
+
+        Raises:
+            ValueError: If the job has not failed or left nothing to resume from.
+        """
+        if job.status != JobStatus.FAILED:
+            raise ValueError(f"Job {job.job_id} is {job.status.value}; only failed jobs can be resumed")
+        if await self._resume_config(job.job_id) is None:
+            raise ValueError(f"Job {job.job_id} has no checkpoint to resume from; submit it again")
+        # Conditional on FAILED so concurrent resume calls enqueue the job once
+        if not await aupdate_job(job.job_id, expected_status=JobStatus.FAILED,
+                                 status=JobStatus.QUEUED.value, resumes=job.resumes + 1):
+            raise ValueError(f"Job {job.job_id} is already being resumed")
+        self._enqueue(job.job_id)
+        logger.info("⏯️ Job %s queued to resume", job.job_id)
+
+    def _enqueue(self, job_id: str) -> None:
+        if job_id not in self._waiting:
+            self._waiting.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def _requeue_unfinished(self) -> None:
+        """Enqueue queued jobs and take over running jobs whose heartbeat went stale."""
+        waiting = len(self._waiting)
+        for job_id in await arequeue_unfinished_jobs(datetime.now(timezone.utc), self.lease_seconds):
+            self._enqueue(job_id)
+        if len(self._waiting) > waiting:
+            logger.info("🔁 Re-enqueued %d unfinished job(s).", len(self._waiting) - waiting)
+
+    async def _sweep(self) -> None:
+        # Picks up the jobs of processes that died while this one keeps running
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                await self._requeue_unfinished()
+            except Exception as e:
+                logger.warning("⚠️ Sweep for unfinished jobs failed: %s", e)
+
+    @staticmethod
+    def _thread(job_id: str) -> dict:
+        return {"configurable": {"thread_id": job_id}}
+
+    async def _resume_config(self, job_id: str) -> Optional[dict]:
+        """
+        Checkpoint to continue job_id from, or None if there is none: the
+        interrupted step if the run raised or the process died, otherwise
+        the step before post_executor (publishing failed).
+        """
+        if getattr(self.graph, "checkpointer", None) is None:
+            return None
+        config = self._thread(job_id)
+        snapshot = await self.graph.aget_state(config)
+        if not snapshot.values:
+            return None
+        if snapshot.next:
+            return config
+        async for past in self.graph.aget_state_history(config):
+            if "post_executor" in past.next:
+                return past.config
+        return None
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._waiting.discard(job_id)
+            try:
+                with log_context(workflow_id=job_id):
+                    await self._execute(job_id)
+            except Exception as e:
+                logger.exception("❌ Worker %d failed to process job %s: %s", n, job_id, e)
+            finally:
+                self._queue.task_done()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 4)
+            try:
+                if not await aheartbeat_job(job_id, self.owner, datetime.now(timezone.utc)):
+                    logger.warning("⚠️ Job %s is no longer held by this worker", job_id)
+                    return
+            except Exception as e:
+                logger.warning("⚠️ Heartbeat of job %s failed: %s", job_id, e)
+
+    async def _execute(self, job_id: str) -> None:
+        job = await aget_job(job_id)
+        if job is None or job.status != JobStatus.QUEUED:
+            return
+
+        # Conditional on QUEUED: a job enqueued by several processes runs once
+        now = datetime.now(timezone.utc)
+        if not await aupdate_job(job_id, expected_status=JobStatus.QUEUED, status=JobStatus.RUNNING.value,
+                                 attempts=job.attempts + 1, started_at=now, worker=self.owner, heartbeat_at=now):
+            logger.info("⏭️ Job %s was started by another worker", job_id)
+            return
+        logger.info("🚀 Job %s started (niche: %s)", job_id, job.niche)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            resume_from = await self._resume_config(job_id)
+            if resume_from is not None:
+                logger.info("⏯️ Job %s continuing from its last checkpoint", job_id)
+                final_state = await self.graph.ainvoke(None, resume_from)
+            else:
+                # Re-runs of this job share one ledger entry, so it is published at most once
+                state = AgentState(niche=job.niche, user_email=job.user_email,
+                                   idempotency_key=job.idempotency_key or job.job_id)
+                final_state = await self.graph.ainvoke(state, self._thread(job_id))
+            result = summarize_final_state(final_state)
+            failed = result["outcome"] != "post_success"
+            await aupdate_job(
+                job_id,
+                status=(JobStatus.FAILED if failed else JobStatus.COMPLETED).value,
+                result=result,
+                error="Publishing failed" if failed else None,
+                finished_at=datetime.now(timezone.utc),
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("❌ Job %s failed: %s", job_id, e)
+            failed = True
+            await aupdate_job(
+                job_id,
+                status=JobStatus.FAILED.value,
+                error=str(e),
+                finished_at=datetime.now(timezone.utc),
+            )
+            # The graph never reached post_executor, which counts its own outcomes
+            await arecord_workflow_outcome(job.user_email, job.niche, succeeded=False)
+        finally:
+            heartbeat.cancel()
+
+        logger.info("🎯 Job %s %s", job_id, "failed" if failed else "completed")
+        if not failed:
+            await self._drop_checkpoints(job_id)
+
+    async def _drop_checkpoints(self, job_id: str) -> None:
+        """Completed jobs are never resumed, so their checkpoints are deleted right away."""
+        checkpointer = getattr(self.graph, "checkpointer", None)
+        if checkpointer is None:
+            return
+        try:
+            await checkpointer.adelete_thread(job_id)
+        except Exception as e:
+            logger.warning("⚠️ Could not delete checkpoints of job %s: %s", job_id, e)
+
+
+# === Process-wide queue used by the API ===
+job_queue = JobQueue()
@@ -0,0 +1,277 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.services.rate_limiter import Charges, linkedin_charges, acquire, aacquire, penalize, apenalize
+from app.utils.config import (
+    LINKEDIN_HTTP_POOL_SIZE,
+    LINKEDIN_MAX_RETRIES,
+    LINKEDIN_BACKOFF_BASE_SECONDS,
+    LINKEDIN_BACKOFF_MAX_SECONDS,
+    LINKEDIN_MAX_RETRY_AFTER_SECONDS,
+    LINKEDIN_TIMEOUT_SECONDS,
+)
+from app.utils.logger import get_logger
+from app.utils.metrics import observe_linkedin_call
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+# ------------------------------------------------------------
+# 📊 Per-endpoint latency statistics
+# ------------------------------------------------------------
+
+class EndpointStats:
+    """Rolling latency samples and counters for one logical LinkedIn endpoint."""
+
+    def __init__(self, window: int = 512):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self._samples: deque = deque(maxlen=window)
+
+    def as_dict(self) -> dict:
+        samples = sorted(self._samples)
+
+        def pct(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 1) if samples else 0.0
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(samples[-1], 1) if samples else 0.0,
+        }
+
+
+_stats: Dict[str, EndpointStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(endpoint: str, elapsed_ms: float, error: bool, retries: int) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(endpoint, EndpointStats())
+        stats.calls += 1
+        stats.errors += int(error)
+        stats.retries += retries
+        stats._samples.append(elapsed_ms)
+    observe_linkedin_call(endpoint, elapsed_ms / 1000, error, retries)
+
+
+def get_linkedin_http_stats() -> dict:
+    """Latency percentiles, error and retry counts per LinkedIn endpoint."""
+    with _stats_lock:
+        return {name: stats.as_dict() for name, stats in _stats.items()}
+
+
+# ------------------------------------------------------------
+# 🔁 Retry policy
+# ------------------------------------------------------------
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    ceiling = min(LINKEDIN_BACKOFF_MAX_SECONDS, LINKEDIN_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _retry_delay(status: int, retry_after: Optional[str], attempt: int, idempotent: bool) -> Optional[float]:
+    """
+    Seconds to wait before retrying a response, or None to give up.
+
+    429 is always safe to retry (the request was not processed); 5xx only
+    for idempotent calls, so a publish is never repeated blindly.
+    """
+    if attempt >= LINKEDIN_MAX_RETRIES or status not in RETRYABLE_STATUS:
+        return None
+    if status != 429 and not idempotent:
+        return None
+    delay = _retry_after_seconds(retry_after)
+    if delay is None:
+        return _backoff(attempt)
+    return delay if delay <= LINKEDIN_MAX_RETRY_AFTER_SECONDS else None
+
+
+def _throttle_pause(response, attempt: int) -> float:
+    """How long a 429 pauses the shared LinkedIn buckets: Retry-After, else a backoff step."""
+    delay = _retry_after_seconds(response.headers.get("Retry-After"))
+    return delay if delay is not None else _backoff(attempt)
+
+
+# ------------------------------------------------------------
+# 🌐 Clients
+# ------------------------------------------------------------
+
+class LinkedInHTTP:
+    """Pooled, retrying requests.Session for blocking callers."""
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=LINKEDIN_HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, endpoint: str, method: str, url: str, *, idempotent: bool = True,
+                timeout: float = LINKEDIN_TIMEOUT_SECONDS, account: Optional[str] = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request once the shared rate limits allow it, retrying 429/5xx
+        and connection failures. A 429 pauses the limits for every worker.
+
+        Args:
+            endpoint (str): Logical endpoint name used for stats.
+            idempotent (bool): Whether 5xx and connection errors may be retried.
+            timeout (float): Per-call timeout in seconds.
+            account (str | None): Member URN the call is made for (per-member limit).
+
+        Returns:
+            requests.Response: The final response (may still be an error status).
+
+        Raises:
+            RateLimited: If the rate limits stay exhausted for RATE_LIMIT_MAX_WAIT_SECONDS.
+        """
+        charges: Charges = linkedin_charges(account)
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            acquire(charges)
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not idempotent or attempt >= LINKEDIN_MAX_RETRIES:
+                    _record(endpoint, (time.perf_counter() - started) * 1000, True, attempt)
+                    raise
+                delay = _backoff(attempt)
+                logger.warning("🔁 LinkedIn %s failed (%s), retrying in %.2fs", endpoint, e, delay)
+            else:
+                if response.status_code == 429:
+                    penalize(charges, _throttle_pause(response, attempt))
+                delay = _retry_delay(response.status_code, response.headers.get("Retry-After"),
+                                     attempt, idempotent)
+                if delay is None:
+                    _record(endpoint, (time.perf_counter() - started) * 1000,
+                            response.status_code >= 400, attempt)
+                    return response
+                logger.warning("🔁 LinkedIn %s returned %d, retrying in %.2fs",
+                               endpoint, response.status_code, delay)
+            attempt += 1
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncLinkedInHTTP:
+    """Pooled, retrying httpx.AsyncClient (HTTP/2 when the h2 package is installed)."""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=LINKEDIN_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=LINKEDIN_HTTP_POOL_SIZE,
+                                max_keepalive_connections=LINKEDIN_HTTP_POOL_SIZE),
+        )
+
+    async def request(self, endpoint: str, method: str, url: str, *, idempotent: bool = True,
+                      timeout: float = LINKEDIN_TIMEOUT_SECONDS, account: Optional[str] = None,
+                      **kwargs) -> httpx.Response:
+        """Async counterpart of LinkedInHTTP.request()."""
+        charges: Charges = linkedin_charges(account)
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            await aacquire(charges)
+            try:
+                response = await self.client.request(method, url, timeout=timeout, **kwargs)
+            except httpx.TransportError as e:
+                if not idempotent or attempt >= LINKEDIN_MAX_RETRIES:
+                    _record(endpoint, (time.perf_counter() - started) * 1000, True, attempt)
+                    raise
+                delay = _backoff(attempt)
+                logger.warning("🔁 LinkedIn %s failed (%s), retrying in %.2fs", endpoint, e, delay)
+            else:
+                if response.status_code == 429:
+                    await apenalize(charges, _throttle_pause(response, attempt))
+                delay = _retry_delay(response.status_code, response.headers.get("Retry-After"),
+                                     attempt, idempotent)
+                if delay is None:
+                    _record(endpoint, (time.perf_counter() - started) * 1000,
+                            response.status_code >= 400, attempt)
+                    return response
+                logger.warning("🔁 LinkedIn %s returned %d, retrying in %.2fs",
+                               endpoint, response.status_code, delay)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+_http: Optional[LinkedInHTTP] = None
+_async_http: Optional[AsyncLinkedInHTTP] = None
+_client_lock = threading.Lock()
+
+
+def get_linkedin_http() -> LinkedInHTTP:
+    """Return the shared blocking LinkedIn client."""
+    global _http
+    if _http is None:
+        with _client_lock:
+            if _http is None:
+                _http = LinkedInHTTP()
+    return _http
+
+
+def get_async_linkedin_http() -> AsyncLinkedInHTTP:
+    """Return the shared async LinkedIn client."""
+    global _async_http
+    if _async_http is None:
+        with _client_lock:
+            if _async_http is None:
+                _async_http = AsyncLinkedInHTTP()
+                logger.info("✅ LinkedIn async HTTP client created (http2=%s)", HTTP2_AVAILABLE)
+    return _async_http
+
+
+async def aclose_linkedin_http() -> None:
+    """Close both shared clients; intended for application shutdown."""
+    global _http, _async_http
+    with _client_lock:
+        http, _http = _http, None
+        async_http, _async_http = _async_http, None
+    if http is not None:
+        http.close()
+    if async_http is not None:
+        await async_http.aclose()
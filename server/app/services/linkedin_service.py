@@ -1,6 +1,9 @@
 import json
+import httpx
 import requests
-from langchain.tools import tool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from typing import BinaryIO, Optional, Tuple, Union
+from langchain_core.tools import tool
 from app.utils.logger import get_logger
 from app.utils.constants import (
     LINKEDIN_MISSING_CREDENTIALS,
@@ -9,35 +12,52 @@ from app.utils.constants import (
     LINKEDIN_POST_SUCCESS,
     LINKEDIN_POST_FAIL,
     LINKEDIN_NETWORK_ERROR,
+    LINKEDIN_POST_UNCONFIRMED,
     REGISTER_UPLOAD_URL,
     LINKEDIN_POST_API_URL,
+    LINKEDIN_POST_URL,
 )
-from app.services.Linkedin_credentials import get_credentials
+from app.services.Linkedin_credentials import get_credentials, aget_credentials
+from app.services.linkedin_client import get_linkedin_http, get_async_linkedin_http
+from app.services.rate_limiter import RateLimited
+from app.utils.config import LINKEDIN_UPLOAD_TIMEOUT_SECONDS
 
 logger = get_logger(__name__)
 
-def upload_media_to_linkedin(file_path: str) -> str | None:
+# Image payloads travel in memory: raw bytes, a buffer view, or a readable stream
+ImageSource = Union[bytes, bytearray, memoryview, BinaryIO]
+
+
+class PublicationUnconfirmed(Exception):
+    """
+    A publish request may have reached LinkedIn but got no answer (timeout
+    or dropped connection), so the post may or may not be live.
     """
-    Upload an image to LinkedIn and return the asset URN.
 
-    Args:
-        file_path (str): Local path to the image file.
 
-    Returns:
-        str | None: LinkedIn asset URN if successful, else None.
+def _never_sent(error: requests.RequestException) -> bool:
     """
-    access_token, person_urn = get_credentials()
-    if not access_token or not person_urn:
-        logger.error("❌ LinkedIn credentials not set!")
-        return None
-    
-    headers = {
+    Whether a requests error failed while connecting (refused, unresolvable
+    host, connect timeout), so the request never left this process.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    # requests wraps urllib3's MaxRetryError, whose reason is the underlying failure
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def _auth_headers(access_token: str) -> dict:
+    return {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json",
         "X-Restli-Protocol-Version": "2.0.0"
     }
 
-    payload = {
+
+def _register_upload_payload(person_urn: str) -> dict:
+    return {
         "registerUploadRequest": {
             "recipes": ["urn:li:digitalmediaRecipe:feedshare-image"],
             "owner": person_urn,
@@ -45,23 +65,98 @@ def upload_media_to_linkedin(file_path: str) -> str | None:
         }
     }
 
+
+def _parse_register_response(reg_data: dict) -> tuple[str, str]:
+    """Return (asset_urn, upload_url) from a registerUpload response."""
+    asset_urn = reg_data["value"]["asset"]
+    upload_url = reg_data["value"]["uploadMechanism"][
+        "com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest"
+    ]["uploadUrl"]
+    return asset_urn, upload_url
+
+
+def _ugc_post_payload(person_urn: str, post_content: str, image_asset_urn: str | None) -> dict:
+    payload = {
+        "author": person_urn,
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {
+            "com.linkedin.ugc.ShareContent": {
+                "shareCommentary": {"text": post_content},
+                "shareMediaCategory": "IMAGE" if image_asset_urn else "NONE"
+            }
+        },
+        "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
+    }
+
+    if image_asset_urn:
+        payload["specificContent"]["com.linkedin.ugc.ShareContent"]["media"] = [
+            {"status": "READY", "media": image_asset_urn}
+        ]
+    return payload
+
+
+def _post_urn(response) -> Optional[str]:
+    """URN of the created post: the x-restli-id header, or the id in the body."""
+    urn = response.headers.get("x-restli-id")
+    if not urn:
+        try:
+            urn = response.json().get("id")
+        except ValueError:
+            urn = None
+    return urn
+
+
+def post_url(post_urn: Optional[str]) -> Optional[str]:
+    """Public URL of a LinkedIn post."""
+    return LINKEDIN_POST_URL.format(urn=post_urn) if post_urn else None
+
+
+def _upload_body(image: ImageSource) -> bytes:
+    """
+    Binary upload body. Bytes pass through untouched; buffers and streams
+    are materialized once so the body can be resent if the upload is retried.
+    """
+    if isinstance(image, bytes):
+        return image
+    if isinstance(image, (bytearray, memoryview)):
+        return bytes(image)
+    return image.read()
+
+
+def upload_media_to_linkedin(image: ImageSource, user_email: Optional[str] = None) -> str | None:
+    """
+    Upload an image to LinkedIn and return the asset URN.
+
+    Args:
+        image (ImageSource): Image bytes, a buffer (bytearray/memoryview)
+            or a binary stream opened for reading.
+        user_email (str | None): Member whose credentials to use.
+
+    Returns:
+        str | None: LinkedIn asset URN if successful, else None.
+    """
+    access_token, person_urn = get_credentials(user_email)
+    if not access_token or not person_urn:
+        logger.error("❌ LinkedIn credentials not set!")
+        return None
+
+    headers = _auth_headers(access_token)
+    payload = _register_upload_payload(person_urn)
+
     try:
         # Step 1: Register upload
-        reg_response = requests.post(REGISTER_UPLOAD_URL, headers=headers, json=payload, timeout=15)
+        http = get_linkedin_http()
+        reg_response = http.request("register_upload", "POST", REGISTER_UPLOAD_URL, account=person_urn,
+                                    headers=headers, json=payload)
         reg_response.raise_for_status()
-        reg_data = reg_response.json()
-
-        asset_urn = reg_data["value"]["asset"]
-        upload_url = reg_data["value"]["uploadMechanism"][
-            "com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest"
-        ]["uploadUrl"]
+        asset_urn, upload_url = _parse_register_response(reg_response.json())
 
         # Step 2: Upload image
-        with open(file_path, "rb") as f:
-            upload_response = requests.post(upload_url, data=f, headers={
-                "Authorization": f"Bearer {access_token}"
-            })
-            upload_response.raise_for_status()
+        upload_response = http.request("upload_image", "POST", upload_url, account=person_urn,
+                                       data=_upload_body(image), headers={
+            "Authorization": f"Bearer {access_token}"
+        }, timeout=LINKEDIN_UPLOAD_TIMEOUT_SECONDS)
+        upload_response.raise_for_status()
 
         logger.info(f"✅ Image uploaded successfully to LinkedIn Asset API. URN: {asset_urn}")
         return asset_urn
@@ -76,52 +171,171 @@ def upload_media_to_linkedin(file_path: str) -> str | None:
 
 # === Post to LinkedIn Tool ===
 @tool("post_to_linkedin")
-def post_to_linkedin(post_content: str, image_asset_urn: str | None = None) -> str:
+def post_to_linkedin(post_content: str, image_asset_urn: str | None = None,
+                     user_email: str | None = None) -> str:
     """
     💬 Publish a text or image post to LinkedIn.
 
     Args:
         post_content (str): The text content to publish.
         image_asset_urn (str | None): Optional LinkedIn asset URN for image.
+        user_email (str | None): Member to publish as.
 
     Returns:
         str: Status message of the operation.
     """
-    access_token, person_urn = get_credentials()
-    if not access_token or not person_urn:
-        return "Missing LinkedIn credentials"       
+    try:
+        return publish_to_linkedin(post_content, image_asset_urn, user_email)[0]
+    except PublicationUnconfirmed as e:
+        return str(e)
 
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-        "X-Restli-Protocol-Version": "2.0.0"
-    }
 
-    payload = {
-        "author": person_urn,
-        "lifecycleState": "PUBLISHED",
-        "specificContent": {
-            "com.linkedin.ugc.ShareContent": {
-                "shareCommentary": {"text": post_content},
-                "shareMediaCategory": "IMAGE" if image_asset_urn else "NONE"
-            }
-        },
-        "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
-    }
+def publish_to_linkedin(post_content: str, image_asset_urn: str | None = None,
+                        user_email: str | None = None) -> Tuple[str, Optional[str]]:
+    """
+    Publish a post to LinkedIn.
 
-    if image_asset_urn:
-        payload["specificContent"]["com.linkedin.ugc.ShareContent"]["media"] = [
-            {"status": "READY", "media": image_asset_urn}
-        ]
+    Returns:
+        (status, post_urn): LINKEDIN_POST_SUCCESS and the URN of the new post
+        (e.g. urn:li:share:123), or an error message and None.
+
+    Raises:
+        PublicationUnconfirmed: If the request may have been sent but got
+            no answer; the caller must not simply publish again.
+    """
+    access_token, person_urn = get_credentials(user_email)
+    if not access_token or not person_urn:
+        return "Missing LinkedIn credentials", None
+
+    headers = _auth_headers(access_token)
+    payload = _ugc_post_payload(person_urn, post_content, image_asset_urn)
 
     try:
-        response = requests.post(LINKEDIN_POST_API_URL, headers=headers, data=json.dumps(payload), timeout=15)
+        # Publishing is not idempotent: only 429s are retried
+        response = get_linkedin_http().request("ugc_posts", "POST", LINKEDIN_POST_API_URL, idempotent=False,
+                                               account=person_urn, headers=headers, data=json.dumps(payload))
         if response.status_code == 201:
             logger.info(LINKEDIN_POST_SUCCESS)
-            return LINKEDIN_POST_SUCCESS
+            return LINKEDIN_POST_SUCCESS, _post_urn(response)
         else:
             logger.error(LINKEDIN_POST_FAIL.format(status=response.status_code, error=response.text))
-            return LINKEDIN_POST_FAIL.format(status=response.status_code, error=response.text)
+            return LINKEDIN_POST_FAIL.format(status=response.status_code, error=response.text), None
+    except (requests.ConnectionError, requests.Timeout) as e:
+        if _never_sent(e):
+            # No connection, so nothing was sent
+            logger.error(LINKEDIN_NETWORK_ERROR.format(error=e))
+            return LINKEDIN_NETWORK_ERROR.format(error=e), None
+        logger.error(LINKEDIN_POST_UNCONFIRMED.format(error=e))
+        raise PublicationUnconfirmed(LINKEDIN_POST_UNCONFIRMED.format(error=e)) from e
     except requests.exceptions.RequestException as e:
         logger.error(LINKEDIN_NETWORK_ERROR.format(error=e))
-        return LINKEDIN_NETWORK_ERROR.format(error=e)
+        return LINKEDIN_NETWORK_ERROR.format(error=e), None
+    except RateLimited as e:
+        logger.error(f"🚦 {e}")
+        return str(e), None
+
+
+
+# ------------------------------------------------------------
+# ⚡ Async variants (used by the async graph nodes)
+# ------------------------------------------------------------
+
+async def aupload_media_to_linkedin(image: ImageSource, user_email: Optional[str] = None) -> str | None:
+    """
+    Async counterpart of upload_media_to_linkedin().
+
+    Args:
+        image (ImageSource): Image bytes, a buffer (bytearray/memoryview)
+            or an in-memory binary stream.
+        user_email (str | None): Member whose credentials to use.
+
+    Returns:
+        str | None: LinkedIn asset URN if successful, else None.
+    """
+    access_token, person_urn = await aget_credentials(user_email)
+    if not access_token or not person_urn:
+        logger.error("❌ LinkedIn credentials not set!")
+        return None
+
+    try:
+        http = get_async_linkedin_http()
+
+        # Step 1: Register upload
+        reg_response = await http.request(
+            "register_upload", "POST", REGISTER_UPLOAD_URL, account=person_urn,
+            headers=_auth_headers(access_token),
+            json=_register_upload_payload(person_urn),
+        )
+        reg_response.raise_for_status()
+        asset_urn, upload_url = _parse_register_response(reg_response.json())
+
+        # Step 2: Upload image
+        upload_response = await http.request("upload_image", "POST", upload_url, account=person_urn,
+                                             content=_upload_body(image), headers={
+            "Authorization": f"Bearer {access_token}"
+        }, timeout=LINKEDIN_UPLOAD_TIMEOUT_SECONDS)
+        upload_response.raise_for_status()
+
+        logger.info(f"✅ Image uploaded successfully to LinkedIn Asset API. URN: {asset_urn}")
+        return asset_urn
+
+    except httpx.HTTPError as e:
+        logger.error(LINKEDIN_ASSET_REGISTER_FAIL.format(error=e))
+        return None
+    except Exception as e:
+        logger.error(LINKEDIN_ASSET_UPLOAD_FAIL.format(error=e))
+        return None
+
+
+async def apost_to_linkedin(post_content: str, image_asset_urn: str | None = None,
+                            user_email: str | None = None) -> str:
+    """
+    Async counterpart of the post_to_linkedin tool.
+
+    Args:
+        post_content (str): The text content to publish.
+        image_asset_urn (str | None): Optional LinkedIn asset URN for image.
+        user_email (str | None): Member to publish as.
+
+    Returns:
+        str: Status message of the operation.
+    """
+    try:
+        return (await apublish_to_linkedin(post_content, image_asset_urn, user_email))[0]
+    except PublicationUnconfirmed as e:
+        return str(e)
+
+
+async def apublish_to_linkedin(post_content: str, image_asset_urn: str | None = None,
+                               user_email: str | None = None) -> Tuple[str, Optional[str]]:
+    """Async counterpart of publish_to_linkedin()."""
+    access_token, person_urn = await aget_credentials(user_email)
+    if not access_token or not person_urn:
+        return "Missing LinkedIn credentials", None
+
+    try:
+        # Publishing is not idempotent: only 429s are retried
+        response = await get_async_linkedin_http().request(
+            "ugc_posts", "POST", LINKEDIN_POST_API_URL, idempotent=False, account=person_urn,
+            headers=_auth_headers(access_token),
+            content=json.dumps(_ugc_post_payload(person_urn, post_content, image_asset_urn)),
+        )
+        if response.status_code == 201:
+            logger.info(LINKEDIN_POST_SUCCESS)
+            return LINKEDIN_POST_SUCCESS, _post_urn(response)
+        else:
+            logger.error(LINKEDIN_POST_FAIL.format(status=response.status_code, error=response.text))
+            return LINKEDIN_POST_FAIL.format(status=response.status_code, error=response.text), None
+    except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+        # No connection, so nothing was sent
+        logger.error(LINKEDIN_NETWORK_ERROR.format(error=e))
+        return LINKEDIN_NETWORK_ERROR.format(error=e), None
+    except httpx.TransportError as e:
+        logger.error(LINKEDIN_POST_UNCONFIRMED.format(error=e))
+        raise PublicationUnconfirmed(LINKEDIN_POST_UNCONFIRMED.format(error=e)) from e
+    except httpx.HTTPError as e:
+        logger.error(LINKEDIN_NETWORK_ERROR.format(error=e))
+        return LINKEDIN_NETWORK_ERROR.format(error=e), None
+    except RateLimited as e:
+        logger.error(f"🚦 {e}")
+        return str(e), None
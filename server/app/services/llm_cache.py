@@ -0,0 +1,183 @@
+import hashlib
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, Generation
+
+from app.utils.config import (
+    LLM_CACHE_BACKEND,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
+)
+from app.utils.logger import get_logger
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+# Only chat generations are ever cached; refuse to revive anything else
+_CACHED_TYPES = [Generation, ChatGeneration, ChatGenerationChunk, AIMessage, AIMessageChunk]
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Stable key over the model + parameters (llm_string) and the prompt."""
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {**asdict(self), "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0}
+
+
+class InMemoryLLMCache(BaseCache):
+    """Per-process LRU cache with a time-to-live on every entry."""
+
+    def __init__(self, maxsize: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self.stats = CacheStats()
+        self._entries = TTLCache(ttl_seconds, maxsize)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        value = self._entries.get(cache_key(prompt, llm_string))
+        self.stats.record(value is not None)
+        return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self._entries.set(cache_key(prompt, llm_string), return_val)
+        self.stats.writes += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        self._entries.clear()
+
+    # Lookups are in-memory, no need for the default thread-pool hop
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.update(prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        self.clear()
+
+
+class MongoLLMCache(BaseCache):
+    """
+    Cache shared by every worker through the `llm_cache` collection.
+
+    Entries expire through a TTL index on `created_at`.
+    """
+
+    COLLECTION = "llm_cache"
+
+    def __init__(self, ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._index_ready = False
+
+    def _collection(self):
+        from app.services.mongodb_service import APP_DB_NAME, get_client
+        collection = get_client()[APP_DB_NAME][self.COLLECTION]
+        if not self._index_ready:
+            collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+            self._index_ready = True
+        return collection
+
+    def _async_collection(self):
+        from app.services.mongodb_service import APP_DB_NAME, get_async_client
+        return get_async_client()[APP_DB_NAME][self.COLLECTION]
+
+    def _decode(self, doc: Optional[dict]) -> Optional[RETURN_VAL_TYPE]:
+        value = None
+        if doc:
+            try:
+                value = loads(doc["generations"], allowed_objects=_CACHED_TYPES)
+            except Exception as e:
+                logger.warning("⚠️ Discarding unreadable LLM cache entry: %s", e)
+        self.stats.record(value is not None)
+        return value
+
+    def _document(self, return_val: RETURN_VAL_TYPE) -> dict:
+        return {"generations": dumps(return_val), "created_at": datetime.now(timezone.utc)}
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        try:
+            return self._decode(self._collection().find_one({"_id": cache_key(prompt, llm_string)}))
+        except Exception as e:
+            logger.warning("⚠️ LLM cache lookup failed: %s", e)
+            self.stats.record(False)
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        try:
+            self._collection().replace_one(
+                {"_id": cache_key(prompt, llm_string)}, self._document(return_val), upsert=True
+            )
+            self.stats.writes += 1
+        except Exception as e:
+            logger.warning("⚠️ LLM cache update failed: %s", e)
+
+    def clear(self, **kwargs: Any) -> None:
+        self._collection().delete_many({})
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        try:
+            self._collection()  # make sure the TTL index exists
+            doc = await self._async_collection().find_one({"_id": cache_key(prompt, llm_string)})
+            return self._decode(doc)
+        except Exception as e:
+            logger.warning("⚠️ LLM cache lookup failed: %s", e)
+            self.stats.record(False)
+            return None
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        try:
+            await self._async_collection().replace_one(
+                {"_id": cache_key(prompt, llm_string)}, self._document(return_val), upsert=True
+            )
+            self.stats.writes += 1
+        except Exception as e:
+            logger.warning("⚠️ LLM cache update failed: %s", e)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        await self._async_collection().delete_many({})
+
+
+_BACKENDS = {"memory": InMemoryLLMCache, "mongo": MongoLLMCache}
+_cache: Optional[BaseCache] = None
+_cache_lock = threading.Lock()
+
+if LLM_CACHE_BACKEND not in _BACKENDS and LLM_CACHE_BACKEND != "none":
+    logger.error("❌ Unknown LLM_CACHE_BACKEND '%s', caching disabled.", LLM_CACHE_BACKEND)
+
+
+def get_llm_cache() -> Optional[BaseCache]:
+    """Return the configured cache backend, or None when caching is disabled."""
+    global _cache
+    if _cache is None and LLM_CACHE_BACKEND in _BACKENDS:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _BACKENDS[LLM_CACHE_BACKEND]()
+                logger.info("✅ LLM cache enabled (backend=%s)", LLM_CACHE_BACKEND)
+    return _cache
+
+
+def get_llm_cache_stats() -> dict:
+    """Hit/miss counters for the active backend."""
+    cache = get_llm_cache()
+    stats = cache.stats.as_dict() if cache is not None else CacheStats().as_dict()
+    return {"backend": LLM_CACHE_BACKEND, **stats}
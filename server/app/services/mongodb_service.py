@@ -1,30 +1,310 @@
-from pymongo import MongoClient
-from typing import List, Optional
-from app.utils.config import MONGO_URI, DB_NAME
+import base64
+import hashlib
+import threading
+from pymongo import (
+    ASCENDING,
+    DESCENDING,
+    AsyncMongoClient,
+    IndexModel,
+    MongoClient,
+    ReturnDocument,
+    UpdateOne,
+)
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from langgraph.checkpoint.mongodb import MongoDBSaver
+from typing import Dict, List, Optional, Tuple
+from app.utils.config import (
+    MONGO_URI,
+    DB_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    USER_CACHE_TTL_SECONDS,
+    CHECKPOINT_TTL_SECONDS,
+    PUBLISH_CLAIM_TIMEOUT_SECONDS,
+    TOPIC_INDEX_MAX_TOPICS,
+)
 from app.models.post import Post
+from app.models.job import Job, JobStatus
+from app.models.schedule import Schedule
+from app.models.credentials import LinkedInCredentials
 from app.utils.constants import POST_SAVE_ERROR
 from app.utils.logger import get_logger
-from langchain.tools import tool
-from datetime import datetime
+from app.utils.metrics import mongo_metrics
+from app.utils.ttl_cache import TTLCache
+from app.services.topic_index import remember_topic
+from langchain_core.tools import tool
+from datetime import datetime, timedelta, timezone
 
 logger = get_logger(__name__)
 
+# Posts and users have always lived in this database, independent of DB_NAME.
+APP_DB_NAME = "linkedin_automation"
+
+# summary_collection document holding the global counters
+GLOBAL_SUMMARY_ID = "global"
+
 # === MongoDB Connection ===
+# One pooled client per process (and one for async code). MongoClient is
+# thread-safe and manages its own pool, so it must be shared, not rebuilt.
+_client: Optional[MongoClient] = None
+_async_client: Optional[AsyncMongoClient] = None
+_checkpointer: Optional[MongoDBSaver] = None
+_client_lock = threading.Lock()
+
+
+def _client_options() -> dict:
+    return {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [mongo_metrics],
+    }
+
+
+def get_client() -> MongoClient:
+    """Return the shared MongoClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MongoClient(MONGO_URI, **_client_options())
+                logger.info("✅ MongoDB client created (maxPoolSize=%d)", MONGO_MAX_POOL_SIZE)
+    return _client
+
+
+def get_async_client() -> AsyncMongoClient:
+    """Return the shared AsyncMongoClient, creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncMongoClient(MONGO_URI, **_client_options())
+                logger.info("✅ Async MongoDB client created (maxPoolSize=%d)", MONGO_MAX_POOL_SIZE)
+    return _async_client
+
+
+def get_checkpointer() -> MongoDBSaver:
+    """
+    Return the shared LangGraph checkpointer for job workflows, creating it
+    (and its indexes) on first use. It runs on the pooled sync client; its
+    async methods hand the calls to a thread.
+    """
+    global _checkpointer
+    if _checkpointer is None:
+        saver = MongoDBSaver(
+            get_client(),
+            db_name=APP_DB_NAME,
+            checkpoint_collection_name="checkpoints",
+            writes_collection_name="checkpoint_writes",
+            ttl=CHECKPOINT_TTL_SECONDS or None,
+        )
+        with _client_lock:
+            if _checkpointer is None:
+                _checkpointer = saver
+    return _checkpointer
+
+
+def close_client() -> None:
+    """Close the shared sync client. A new one is created on next use."""
+    global _client, _checkpointer
+    with _client_lock:
+        _checkpointer = None
+        if _client is not None:
+            _client.close()
+            _client = None
+            logger.info("🔌 MongoDB client closed.")
+
+
+async def aclose_clients() -> None:
+    """Close both shared clients; intended for application shutdown."""
+    global _async_client
+    close_client()
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.close()
+        logger.info("🔌 Async MongoDB client closed.")
+
+
 def get_collection():
-    client = MongoClient(MONGO_URI)
-    db = client["linkedin_automation"]
-    return db["posts"]
+    return get_client()[APP_DB_NAME]["posts"]
 
 def get_user_collection():
     """Get the user collection from MongoDB."""
-    client = MongoClient(MONGO_URI)
-    db = client["linkedin_automation"]
-    return db["users"]
+    return get_client()[APP_DB_NAME]["users"]
+
+def get_summary_collection():
+    """Get the job summary collection from MongoDB."""
+    return get_client()[DB_NAME]["summary_collection"]
+
+def get_async_collection():
+    """Async counterpart of get_collection()."""
+    return get_async_client()[APP_DB_NAME]["posts"]
+
+def get_async_user_collection():
+    """Async counterpart of get_user_collection()."""
+    return get_async_client()[APP_DB_NAME]["users"]
+
+def get_async_summary_collection():
+    """Async counterpart of get_summary_collection()."""
+    return get_async_client()[DB_NAME]["summary_collection"]
+
+def get_credentials_collection():
+    """Get the per-user LinkedIn credentials collection."""
+    return get_client()[APP_DB_NAME]["linkedin_credentials"]
+
+def get_async_credentials_collection():
+    """Async counterpart of get_credentials_collection()."""
+    return get_async_client()[APP_DB_NAME]["linkedin_credentials"]
+
+def get_async_jobs_collection():
+    """Get the background job collection (async client)."""
+    return get_async_client()[APP_DB_NAME]["jobs"]
+
+def get_async_schedules_collection():
+    """Get the autopilot schedule collection (async client)."""
+    return get_async_client()[APP_DB_NAME]["schedules"]
+
+def get_token_usage_collection():
+    """Get the per-user, per-day LLM token usage collection."""
+    return get_client()[APP_DB_NAME]["token_usage"]
+
+def get_async_token_usage_collection():
+    """Async counterpart of get_token_usage_collection()."""
+    return get_async_client()[APP_DB_NAME]["token_usage"]
+
+def get_rate_limits_collection():
+    """Get the shared rate limit bucket collection."""
+    return get_client()[APP_DB_NAME]["rate_limits"]
+
+def get_async_rate_limits_collection():
+    """Async counterpart of get_rate_limits_collection()."""
+    return get_async_client()[APP_DB_NAME]["rate_limits"]
+
+
+# === Indexes ===
+# Collection name (in APP_DB_NAME) -> indexes the queries in this module rely on.
+INDEXES: Dict[str, List[IndexModel]] = {
+    # Post history: match user_email, sort and page on (posted_date, _id) desc
+    "posts": [
+        IndexModel(
+            [("user_email", ASCENDING), ("posted_date", DESCENDING), ("_id", DESCENDING)],
+            name="user_email_posted_date_id",
+        ),
+        # Publication ledger: one entry per user and content, and per workflow
+        IndexModel(
+            [("user_email", ASCENDING), ("content_hash", ASCENDING)],
+            name="user_email_content_hash_unique", unique=True,
+            partialFilterExpression={"content_hash": {"$type": "string"}},
+        ),
+        IndexModel(
+            [("user_email", ASCENDING), ("idempotency_key", ASCENDING)],
+            name="user_email_idempotency_key_unique", unique=True,
+            partialFilterExpression={"idempotency_key": {"$type": "string"}},
+        ),
+    ],
+    # get_or_create_user upserts on email; unique so concurrent logins cannot duplicate
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    # arequeue_unfinished_jobs: find({"status": {"$in": ...}}).sort("created_at", 1)
+    "jobs": [
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+        # A retried /agent/start with the same key returns the existing job
+        IndexModel(
+            [("user_email", ASCENDING), ("idempotency_key", ASCENDING)],
+            name="user_email_idempotency_key_unique", unique=True,
+            partialFilterExpression={"idempotency_key": {"$type": "string"}},
+        ),
+    ],
+    # Scheduler: due schedules in next_run_at order; listing a user's schedules
+    "schedules": [
+        IndexModel([("active", ASCENDING), ("next_run_at", ASCENDING)], name="active_next_run_at"),
+        IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING)], name="user_email_created_at"),
+    ],
+    # Daily usage documents are only needed for the current day
+    "token_usage": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+
+async def aensure_indexes(database=None) -> None:
+    """
+    Create the indexes in INDEXES. create_indexes is a no-op for indexes that
+    already exist, so this is safe to run on every startup.
+
+    Args:
+        database: Async database to index. Defaults to APP_DB_NAME.
+    """
+    if database is None:
+        database = get_async_client()[APP_DB_NAME]
+    for name, models in INDEXES.items():
+        try:
+            created = await database[name].create_indexes(models)
+            logger.info("🗂 Indexes ensured on %s: %s", name, ", ".join(created))
+        except DuplicateKeyError as e:
+            logger.error("❌ Unique index on %s blocked by duplicate documents; remove them and restart: %s", name, e)
+        except OperationFailure as e:
+            logger.error("❌ Failed to create indexes on %s: %s", name, e)
+
+
+# === User lookup cache ===
+# get_or_create_user results (user record + post count) keyed by email. Saving
+# a post invalidates the entry in this process; the short TTL bounds how stale
+# other workers can be.
+_user_cache = TTLCache(USER_CACHE_TTL_SECONDS)
+
+
+def _remember_user(user: dict) -> dict:
+    _user_cache.set(user["email"], {**user, "is_new_user": False})
+    return user
+
+
+def invalidate_user_cache(email: str) -> None:
+    """Drop the cached user record/post count for email."""
+    _user_cache.pop(email)
+
+
+def _user_upsert(user_id: str, email: str) -> dict:
+    """find_one_and_update arguments that fetch the user by email, inserting it if missing."""
+    return {
+        "filter": {"email": email},
+        "update": {"$setOnInsert": {"user_id": user_id, "email": email, "created_at": datetime.utcnow()}},
+        "projection": {"user_id": 1, "total_completed": 1},
+        "upsert": True,
+        # The pre-image is None exactly when this call inserted the user
+        "return_document": ReturnDocument.BEFORE,
+    }
+
+
+def _user_from_upsert(existing_user: Optional[dict], user_id: str, email: str) -> dict:
+    if existing_user:
+        logger.info(f"User already exists: {email}")
+        return {
+            "email": email,
+            "user_id": existing_user.get("user_id", user_id),
+            "total_posts": existing_user.get("total_completed", 0),
+            "is_new_user": False
+        }
+
+    logger.info(f"New user created: {email}")
+    return {
+        "email": email,
+        "user_id": user_id,
+        "total_posts": 0,
+        "is_new_user": True
+    }
 
 
 def get_or_create_user(user_id: str, email: str) -> dict:
     """
-    Check if user exists by email. If not, create new user.
+    Fetch the user by email, creating it if it does not exist, in a single
+    atomic upsert.
     
     Args:
         user_id (str): LinkedIn user ID
@@ -33,40 +313,19 @@ def get_or_create_user(user_id: str, email: str) -> dict:
     Returns:
         dict: User information with post count
     """
+    cached = _user_cache.get(email)
+    if cached is not None:
+        return dict(cached)
+
     collection = get_user_collection()
     
     try:
-        # Check if user already exists
-        existing_user = collection.find_one({"email": email})
-        
-        if existing_user:
-            logger.info(f"User already exists: {email}")
-            
-            # Get user's total post count
-            total_posts = get_user_post_count(email)
-            
-            return {
-                "email": email,
-                "user_id": existing_user["user_id"],
-                "total_posts": total_posts,
-                "is_new_user": False
-            }
-        else:
-            # Create new user
-            new_user = {
-                "user_id": user_id,
-                "email": email
-            }
-            
-            collection.insert_one(new_user)
-            logger.info(f"New user created: {email}")
-            
-            return {
-                "email": email,
-                "user_id": user_id,
-                "total_posts": 0,
-                "is_new_user": True
-            }
+        try:
+            existing_user = collection.find_one_and_update(**_user_upsert(user_id, email))
+        except DuplicateKeyError:
+            # A concurrent login inserted the same email first; it exists now
+            existing_user = collection.find_one_and_update(**_user_upsert(user_id, email))
+        return _remember_user(_user_from_upsert(existing_user, user_id, email))
             
     except Exception as e:
         logger.error(f"Error in get_or_create_user: {e}")
@@ -83,10 +342,11 @@ def get_user_post_count(email: str) -> int:
     Returns:
         int: Total number of posts
     """
-    collection = get_collection()
+    collection = get_user_collection()
     
     try:
-        count = collection.count_documents({"user_email": email})
+        user = collection.find_one({"email": email}, {"total_completed": 1}) or {}
+        count = user.get("total_completed", 0)
         logger.info(f"User {email} has {count} posts")
         return count
         
@@ -119,6 +379,8 @@ def save_post(user_email: str, niche: str, topic: str) -> Optional[str]:
         }
         
         result = collection.insert_one(post_data)
+        remember_topic(user_email, niche, topic)
+        record_workflow_outcome(user_email, niche, succeeded=True)
         logger.info(f"Post saved successfully with ID: {result.inserted_id} for user: {user_email}")
         return str(result.inserted_id)
     except Exception as e:
@@ -126,6 +388,94 @@ def save_post(user_email: str, niche: str, topic: str) -> Optional[str]:
         return None
 
 
+# ------------------------------------------------------------
+# 📰 Post history (keyset pagination)
+# ------------------------------------------------------------
+# Pages are ordered by (posted_date, _id) descending and continue from the
+# last post of the previous page, so every page is a bounded index range scan
+# however deep the history goes. Documents are shaped and serialized by the
+# server through the projection below.
+_POST_HISTORY_PROJECTION = {
+    "_id": {"$toString": "$_id"},
+    "user_email": 1,
+    "niche": 1,
+    "topic": 1,
+    "posted_date": {"$dateToString": {"date": "$posted_date", "format": "%Y-%m-%dT%H:%M:%S.%LZ"}},
+}
+
+
+def _encode_post_cursor(post: dict) -> str:
+    """Opaque continuation token pointing just past post."""
+    raw = f"{post['posted_date']}|{post['_id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_post_cursor(cursor: str) -> dict:
+    """
+    Turn a continuation token into the keyset filter for the next page.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        posted_date, post_id = raw.split("|")
+        posted_date, post_id = datetime.fromisoformat(posted_date), ObjectId(post_id)
+    except (ValueError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return {"$or": [
+        {"posted_date": {"$lt": posted_date}},
+        {"posted_date": posted_date, "_id": {"$lt": post_id}},
+    ]}
+
+
+def _post_history_pipeline(email: str, limit: int, cursor: Optional[str] = None) -> List[dict]:
+    match = {"user_email": email, **PUBLISHED_POSTS}
+    if cursor:
+        match.update(_decode_post_cursor(cursor))
+    return [
+        {"$match": match},
+        {"$sort": {"posted_date": -1, "_id": -1}},
+        # One extra post tells us whether there is a next page
+        {"$limit": limit + 1},
+        {"$project": _POST_HISTORY_PROJECTION},
+    ]
+
+
+def _post_history_page(posts: List[dict], limit: int) -> dict:
+    has_more = len(posts) > limit
+    posts = posts[:limit]
+    return {
+        "posts": posts,
+        "next_cursor": _encode_post_cursor(posts[-1]) if has_more else None,
+    }
+
+
+def get_user_posts_page(email: str, limit: int = 10, cursor: Optional[str] = None) -> dict:
+    """
+    Get one page of a user's posts, newest first.
+
+    Args:
+        email (str): User's email address.
+        limit (int): Page size. Default is 10.
+        cursor (Optional[str]): next_cursor from the previous page; None for the first page.
+
+    Returns:
+        dict: {"posts": [...], "next_cursor": str or None when there are no more posts}.
+
+    Raises:
+        ValueError: If cursor is malformed.
+    """
+    pipeline = _post_history_pipeline(email, limit, cursor)
+    try:
+        posts = list(get_collection().aggregate(pipeline))
+        logger.info(f"Retrieved {min(len(posts), limit)} posts for user: {email}")
+        return _post_history_page(posts, limit)
+    except Exception as e:
+        logger.error(f"Failed to get posts for user {email}: {e}")
+        return {"posts": [], "next_cursor": None}
+
+
 def get_user_posts(email: str, limit: int = 10) -> List[dict]:
     """
     Get posts for a specific user.
@@ -137,22 +487,29 @@ def get_user_posts(email: str, limit: int = 10) -> List[dict]:
     Returns:
         List[dict]: List of user's posts, sorted by newest first.
     """
-    collection = get_collection()
-    try:
-        posts = list(collection.find({"user_email": email}).sort("posted_date", -1).limit(limit))
-        
-        # Convert ObjectId to string for JSON serialization
-        for post in posts:
-            post["_id"] = str(post["_id"])
-            # Convert datetime to string
-            if "posted_date" in post:
-                post["posted_date"] = post["posted_date"].isoformat()
-        
-        logger.info(f"Retrieved {len(posts)} posts for user: {email}")
-        return posts
-    except Exception as e:
-        logger.error(f"Failed to get posts for user {email}: {e}")
-        return []
+    return get_user_posts_page(email, limit)["posts"]
+
+
+def _user_topics_query(email: str, niche: str, limit: int) -> dict:
+    return {
+        "filter": {"user_email": email, "niche": niche, **PUBLISHED_POSTS},
+        "projection": {"_id": 0, "topic": 1},
+        "sort": [("posted_date", DESCENDING)],
+        "limit": limit,
+    }
+
+
+def get_user_topics(email: str, niche: str, limit: int = TOPIC_INDEX_MAX_TOPICS) -> List[str]:
+    """
+    Topics a user already posted in a niche, newest first (see topic_index).
+
+    Args:
+        email (str): User's email address.
+        niche (str): Niche exactly as stored on the posts.
+        limit (int): Most recent topics to return.
+    """
+    cursor = get_collection().find(**_user_topics_query(email, niche, limit))
+    return [doc["topic"] for doc in cursor if doc.get("topic")]
 
 def get_total_posts() -> int:
     """
@@ -161,9 +518,10 @@ def get_total_posts() -> int:
     Returns:
         int: Total count of posts.
     """
-    collection = get_collection()
+    collection = get_summary_collection()
     try:
-        count = collection.count_documents({})
+        summary = collection.find_one({"_id": GLOBAL_SUMMARY_ID}, {"total_completed": 1}) or {}
+        count = summary.get("total_completed", 0)
         logger.info(f"Total posts in database: {count}")
         return count
     except Exception as e:
@@ -250,32 +608,151 @@ def get_posts_stats() -> dict:
         logger.error(f"Failed to get posts stats: {e}")
         return {"total_posts": 0, "posts_by_platform": {}}
 
+# ------------------------------------------------------------
+# 🔢 Incrementally maintained counters
+# ------------------------------------------------------------
+# Global totals (plus per-niche completed/failed) live in one
+# summary_collection document; per-user totals live on the user document.
+# Both are bumped with $inc next to the ledger write, so reads are a single
+# document fetch instead of a count_documents scan.
+
+def _niche_key(niche: Optional[str]) -> str:
+    """Niche name usable as a MongoDB field name."""
+    return (niche or "unknown").strip().replace(".", "_").replace("$", "_") or "unknown"
+
+
+def _outcome_updates(niche: Optional[str], succeeded: bool):
+    outcome = "completed" if succeeded else "failed"
+    total_field = f"total_{outcome}"
+    summary_inc = {total_field: 1, f"niches.{_niche_key(niche)}.{outcome}": 1}
+    user_inc = {total_field: 1}
+    if succeeded:
+        user_inc[f"niche_counts.{_niche_key(niche)}"] = 1
+    return summary_inc, user_inc
+
+
+def _summary_from_doc(doc: Optional[dict]) -> dict:
+    doc = doc or {}
+    return {
+        "total_completed": doc.get("total_completed", 0),
+        "total_failed": doc.get("total_failed", 0),
+        "niches": doc.get("niches", {}),
+    }
+
+
+def record_workflow_outcome(user_email: Optional[str], niche: Optional[str], succeeded: bool) -> None:
+    """
+    Atomically bump the global, per-niche and per-user counters for one
+    finished workflow. Failures are logged, never raised.
+    """
+    summary_inc, user_inc = _outcome_updates(niche, succeeded)
+    try:
+        get_summary_collection().update_one({"_id": GLOBAL_SUMMARY_ID}, {"$inc": summary_inc}, upsert=True)
+        if user_email:
+            get_user_collection().update_one({"email": user_email}, {"$inc": user_inc})
+            invalidate_user_cache(user_email)
+    except Exception as e:
+        logger.error("Failed to update counters for %s: %s", user_email, e)
+
+
+async def arecord_workflow_outcome(user_email: Optional[str], niche: Optional[str], succeeded: bool) -> None:
+    """Async counterpart of record_workflow_outcome()."""
+    summary_inc, user_inc = _outcome_updates(niche, succeeded)
+    try:
+        await get_async_summary_collection().update_one(
+            {"_id": GLOBAL_SUMMARY_ID}, {"$inc": summary_inc}, upsert=True
+        )
+        if user_email:
+            await get_async_user_collection().update_one({"email": user_email}, {"$inc": user_inc})
+            invalidate_user_cache(user_email)
+    except Exception as e:
+        logger.error("Failed to update counters for %s: %s", user_email, e)
+
+
+async def areconcile_counters() -> dict:
+    """
+    Recompute the completed counters from the posts ledger.
+
+    Global, per-niche and per-user completed counts are rebuilt from the
+    posts collection. Failed counts have no ledger of their own and are
+    carried over (from a legacy summary document on first run). Posts saved
+    while this runs may be counted twice or missed; run it at quiet times.
+
+    Returns:
+        dict: The rebuilt global summary.
+    """
+    posts = get_async_collection()
+    summary_collection = get_async_summary_collection()
+    users = get_async_user_collection()
+
+    per_user: Dict[str, Dict[str, int]] = {}
+    per_niche: Dict[str, int] = {}
+    total = 0
+    cursor = await posts.aggregate([
+        {"$match": PUBLISHED_POSTS},
+        {"$group": {"_id": {"user": "$user_email", "niche": "$niche"}, "count": {"$sum": 1}}},
+    ])
+    async for row in cursor:
+        count, niche = row["count"], _niche_key(row["_id"].get("niche"))
+        total += count
+        per_niche[niche] = per_niche.get(niche, 0) + count
+        if row["_id"].get("user"):
+            user_niches = per_user.setdefault(row["_id"]["user"], {})
+            user_niches[niche] = user_niches.get(niche, 0) + count
+
+    current = await summary_collection.find_one({"_id": GLOBAL_SUMMARY_ID})
+    if current is None:
+        current = await summary_collection.find_one({"_id": {"$ne": GLOBAL_SUMMARY_ID}}) or {}
+    old_niches = current.get("niches", {})
+    niches = {
+        name: {"completed": per_niche.get(name, 0), "failed": old_niches.get(name, {}).get("failed", 0)}
+        for name in set(per_niche) | set(old_niches)
+    }
+
+    summary = {
+        "total_completed": total,
+        "total_failed": current.get("total_failed", 0),
+        "niches": niches,
+        "reconciled_at": datetime.utcnow(),
+    }
+    await summary_collection.replace_one({"_id": GLOBAL_SUMMARY_ID}, summary, upsert=True)
+    await summary_collection.delete_many({"_id": {"$ne": GLOBAL_SUMMARY_ID}})
+
+    await users.update_many({}, {"$set": {"total_completed": 0, "niche_counts": {}}})
+    if per_user:
+        await users.bulk_write([
+            UpdateOne({"email": email}, {"$set": {"total_completed": sum(counts.values()), "niche_counts": counts}})
+            for email, counts in per_user.items()
+        ], ordered=False)
+    _user_cache.clear()
+
+    logger.info("🔢 Counters reconciled: %d posts across %d users", total, len(per_user))
+    return _summary_from_doc(summary)
+
+
+async def acounters_need_reconcile() -> bool:
+    """True until the counters have been rebuilt from the ledger at least once."""
+    doc = await get_async_summary_collection().find_one({"_id": GLOBAL_SUMMARY_ID}, {"reconciled_at": 1})
+    return not doc or "reconciled_at" not in doc
+
+
 def get_job_summary_from_summary_collection() -> dict:
     """
     Fetch total completed and failed counts from the summary_collection.
 
     Returns:
-        dict: { "total_completed": int, "total_failed": int }
+        dict: { "total_completed": int, "total_failed": int, "niches": dict }
     """
-    client = MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    collection = db["summary_collection"]
+    collection = get_summary_collection()
 
     try:
-        summary = collection.find_one()
-        if summary:
-            total_completed = summary.get("total_completed", 0)
-            total_failed = summary.get("total_failed", 0)
-        else:
-            total_completed = 0
-            total_failed = 0
-
-        logger.info("Fetched summary: completed=%d, failed=%d", total_completed, total_failed)
-        return {"total_completed": total_completed, "total_failed": total_failed}
+        summary = _summary_from_doc(collection.find_one({"_id": GLOBAL_SUMMARY_ID}))
+        logger.info("Fetched summary: completed=%d, failed=%d", summary["total_completed"], summary["total_failed"])
+        return summary
 
     except Exception as e:
         logger.error("Failed to fetch summary: %s", e)
-        return {"total_completed": 0, "total_failed": 0}
+        return _summary_from_doc(None)
 
 def update_job_summary(field: str, increment: int = 1) -> str:
     """
@@ -294,13 +771,11 @@ def update_job_summary(field: str, increment: int = 1) -> str:
         logger.error(msg)
         return msg
 
-    client = MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    collection = db["summary_collection"]
+    collection = get_summary_collection()
 
     try:
         result = collection.find_one_and_update(
-            {},
+            {"_id": GLOBAL_SUMMARY_ID},
             {"$inc": {field: increment}},
             upsert=True,
             return_document=True
@@ -316,13 +791,814 @@ def update_job_summary(field: str, increment: int = 1) -> str:
         logger.error(msg)
         return msg
 
+# ------------------------------------------------------------
+# ⚡ Async data layer (for use from async routes and graph nodes)
+# ------------------------------------------------------------
+
+async def aget_or_create_user(user_id: str, email: str) -> dict:
+    """Async counterpart of get_or_create_user()."""
+    cached = _user_cache.get(email)
+    if cached is not None:
+        return dict(cached)
+
+    collection = get_async_user_collection()
+
+    try:
+        try:
+            existing_user = await collection.find_one_and_update(**_user_upsert(user_id, email))
+        except DuplicateKeyError:
+            existing_user = await collection.find_one_and_update(**_user_upsert(user_id, email))
+        return _remember_user(_user_from_upsert(existing_user, user_id, email))
+
+    except Exception as e:
+        logger.error(f"Error in aget_or_create_user: {e}")
+        raise
+
+
+async def aget_user_post_count(email: str) -> int:
+    """Async counterpart of get_user_post_count()."""
+    collection = get_async_user_collection()
+    try:
+        user = await collection.find_one({"email": email}, {"total_completed": 1}) or {}
+        count = user.get("total_completed", 0)
+        logger.info(f"User {email} has {count} posts")
+        return count
+    except Exception as e:
+        logger.error(f"Failed to get user post count for {email}: {e}")
+        return 0
+
+
+async def asave_post(user_email: str, niche: str, topic: str) -> Optional[str]:
+    """Async counterpart of the save_post tool."""
+    collection = get_async_collection()
+    try:
+        post_data = {
+            "user_email": user_email,
+            "niche": niche,
+            "topic": topic,
+            "posted_date": datetime.utcnow()
+        }
+        result = await collection.insert_one(post_data)
+        remember_topic(user_email, niche, topic)
+        await arecord_workflow_outcome(user_email, niche, succeeded=True)
+        logger.info(f"Post saved successfully with ID: {result.inserted_id} for user: {user_email}")
+        return str(result.inserted_id)
+    except Exception as e:
+        logger.error(POST_SAVE_ERROR.format(error=e))
+        return None
+
+
+async def aget_user_posts_page(email: str, limit: int = 10, cursor: Optional[str] = None) -> dict:
+    """Async counterpart of get_user_posts_page()."""
+    pipeline = _post_history_pipeline(email, limit, cursor)
+    try:
+        posts = await (await get_async_collection().aggregate(pipeline)).to_list(length=limit + 1)
+        logger.info(f"Retrieved {min(len(posts), limit)} posts for user: {email}")
+        return _post_history_page(posts, limit)
+    except Exception as e:
+        logger.error(f"Failed to get posts for user {email}: {e}")
+        return {"posts": [], "next_cursor": None}
+
+
+async def aget_user_posts(email: str, limit: int = 10) -> List[dict]:
+    """Async counterpart of get_user_posts()."""
+    return (await aget_user_posts_page(email, limit))["posts"]
+
+
+async def aget_user_topics(email: str, niche: str, limit: int = TOPIC_INDEX_MAX_TOPICS) -> List[str]:
+    """Async counterpart of get_user_topics()."""
+    cursor = get_async_collection().find(**_user_topics_query(email, niche, limit))
+    return [doc["topic"] async for doc in cursor if doc.get("topic")]
+
+
+async def aget_total_posts() -> int:
+    """Async counterpart of get_total_posts()."""
+    collection = get_async_summary_collection()
+    try:
+        summary = await collection.find_one({"_id": GLOBAL_SUMMARY_ID}, {"total_completed": 1}) or {}
+        count = summary.get("total_completed", 0)
+        logger.info(f"Total posts in database: {count}")
+        return count
+    except Exception as e:
+        logger.error(f"Failed to get total posts: {e}")
+        return 0
+
+
+async def aget_job_summary_from_summary_collection() -> dict:
+    """Async counterpart of get_job_summary_from_summary_collection()."""
+    collection = get_async_summary_collection()
+    try:
+        summary = _summary_from_doc(await collection.find_one({"_id": GLOBAL_SUMMARY_ID}))
+        logger.info("Fetched summary: completed=%d, failed=%d", summary["total_completed"], summary["total_failed"])
+        return summary
+    except Exception as e:
+        logger.error("Failed to fetch summary: %s", e)
+        return _summary_from_doc(None)
+
+
+async def aupdate_job_summary(field: str, increment: int = 1) -> str:
+    """Async counterpart of update_job_summary()."""
+    if field not in ["total_completed", "total_failed"]:
+        msg = f"❌ Invalid field name: {field}. Must be 'total_completed' or 'total_failed'."
+        logger.error(msg)
+        return msg
+
+    collection = get_async_summary_collection()
+    try:
+        result = await collection.find_one_and_update(
+            {"_id": GLOBAL_SUMMARY_ID},
+            {"$inc": {field: increment}},
+            upsert=True,
+            return_document=True
+        )
+        new_value = result.get(field, 0)
+        msg = f"✅ Successfully updated '{field}' by {increment}. New value: {new_value}."
+        logger.info(msg)
+        return msg
+    except Exception as e:
+        msg = f"❌ Failed to update '{field}': {e}"
+        logger.error(msg)
+        return msg
+
+# ------------------------------------------------------------
+# 🪙 LLM token usage (per user, per UTC day)
+# ------------------------------------------------------------
+# One document per (user, day) holding the tokens spent or reserved. A
+# reservation only succeeds if it keeps the day's total within the budget;
+# the conditional upsert makes the check and the increment one atomic write.
+
+def _token_usage_id(email: str, day: str) -> str:
+    return f"{email}|{day}"
+
+
+def _token_reservation(email: str, day: str, tokens: int, budget: int):
+    """Filter and update that add tokens only while the total stays within budget."""
+    query = {"_id": _token_usage_id(email, day), "tokens": {"$lte": budget - tokens}}
+    update = {
+        "$inc": {"tokens": tokens},
+        "$setOnInsert": {
+            "user_email": email,
+            "day": day,
+            "expires_at": datetime.utcnow() + timedelta(days=2),
+        },
+    }
+    return query, update
+
+
+def reserve_token_usage(email: str, day: str, tokens: int, budget: int) -> bool:
+    """
+    Add tokens to the user's usage for day if that keeps it within budget.
+
+    Returns:
+        bool: False if the reservation would exceed the budget.
+    """
+    if tokens > budget:
+        return False
+    query, update = _token_reservation(email, day, tokens, budget)
+    try:
+        get_token_usage_collection().update_one(query, update, upsert=True)
+        return True
+    except DuplicateKeyError:
+        # The day's document exists but is over the limit, so the upsert tried to insert
+        return False
+
+
+def add_token_usage(email: str, day: str, tokens: int) -> None:
+    """Adjust the user's usage for day by tokens (may be negative)."""
+    get_token_usage_collection().update_one({"_id": _token_usage_id(email, day)}, {"$inc": {"tokens": tokens}})
+
+
+def get_token_usage(email: str, day: str) -> int:
+    """Tokens the user has spent or reserved on day."""
+    doc = get_token_usage_collection().find_one({"_id": _token_usage_id(email, day)}, {"tokens": 1})
+    return doc["tokens"] if doc else 0
+
+
+async def areserve_token_usage(email: str, day: str, tokens: int, budget: int) -> bool:
+    """Async counterpart of reserve_token_usage()."""
+    if tokens > budget:
+        return False
+    query, update = _token_reservation(email, day, tokens, budget)
+    try:
+        await get_async_token_usage_collection().update_one(query, update, upsert=True)
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+async def aadd_token_usage(email: str, day: str, tokens: int) -> None:
+    """Async counterpart of add_token_usage()."""
+    await get_async_token_usage_collection().update_one(
+        {"_id": _token_usage_id(email, day)}, {"$inc": {"tokens": tokens}}
+    )
+
+
+async def aget_token_usage(email: str, day: str) -> int:
+    """Async counterpart of get_token_usage()."""
+    doc = await get_async_token_usage_collection().find_one({"_id": _token_usage_id(email, day)}, {"tokens": 1})
+    return doc["tokens"] if doc else 0
+
+
+# ------------------------------------------------------------
+# 🚦 Rate limit buckets
+# ------------------------------------------------------------
+# One document per token bucket, shared by every worker: the tokens left at
+# updated_at (epoch seconds), refilled lazily on read, and blocked_until, set
+# when the provider answered 429. Takes are optimistic: the new state is
+# written only if the version read is still current, otherwise re-read.
+_BUCKET_ATTEMPTS = 5
+
+
+def _bucket_take(doc: Optional[dict], cost: float, capacity: float, per_second: float,
+                 now: float) -> Tuple[float, Optional[dict]]:
+    """Seconds to wait for cost tokens (0 if available now), and the state to write if taken."""
+    blocked_until = doc.get("blocked_until", 0.0) if doc else 0.0
+    if now < blocked_until:
+        return blocked_until - now, None
+    if per_second <= 0:
+        # No limit configured: the bucket only relays 429 blocks
+        return 0.0, None
+    tokens = capacity
+    if doc is not None:
+        tokens = min(capacity, doc["tokens"] + max(0.0, now - doc["updated_at"]) * per_second)
+    if tokens < cost:
+        return (cost - tokens) / per_second, None
+    return 0.0, {"tokens": tokens - cost, "updated_at": now}
+
+
+def take_bucket_tokens(key: str, cost: float, capacity: float, per_second: float, now: float) -> float:
+    """
+    Take cost tokens from a shared bucket holding up to capacity and
+    refilling at per_second.
+
+    Returns:
+        float: 0 if the tokens were taken, else seconds until they may be.
+    """
+    collection = get_rate_limits_collection()
+    for _ in range(_BUCKET_ATTEMPTS):
+        doc = collection.find_one({"_id": key})
+        wait, state = _bucket_take(doc, cost, capacity, per_second, now)
+        if state is None:
+            return wait
+        try:
+            if doc is None:
+                collection.insert_one({"_id": key, "version": 1, "blocked_until": 0.0, **state})
+                return 0.0
+            result = collection.update_one({"_id": key, "version": doc["version"]},
+                                           {"$set": state, "$inc": {"version": 1}})
+            if result.matched_count:
+                return 0.0
+        except DuplicateKeyError:
+            pass
+    # Every attempt lost a race: others are draining the bucket right now
+    return cost / per_second
+
+
+def block_bucket(key: str, until: float, now: float) -> None:
+    """Hold every take from a bucket until the given epoch time, and empty it."""
+    get_rate_limits_collection().update_one(
+        {"_id": key},
+        {"$max": {"blocked_until": until}, "$set": {"tokens": 0.0, "updated_at": now}, "$inc": {"version": 1}},
+        upsert=True,
+    )
+
+
+async def atake_bucket_tokens(key: str, cost: float, capacity: float, per_second: float, now: float) -> float:
+    """Async counterpart of take_bucket_tokens()."""
+    collection = get_async_rate_limits_collection()
+    for _ in range(_BUCKET_ATTEMPTS):
+        doc = await collection.find_one({"_id": key})
+        wait, state = _bucket_take(doc, cost, capacity, per_second, now)
+        if state is None:
+            return wait
+        try:
+            if doc is None:
+                await collection.insert_one({"_id": key, "version": 1, "blocked_until": 0.0, **state})
+                return 0.0
+            result = await collection.update_one({"_id": key, "version": doc["version"]},
+                                                 {"$set": state, "$inc": {"version": 1}})
+            if result.matched_count:
+                return 0.0
+        except DuplicateKeyError:
+            pass
+    return cost / per_second
+
+
+async def ablock_bucket(key: str, until: float, now: float) -> None:
+    """Async counterpart of block_bucket()."""
+    await get_async_rate_limits_collection().update_one(
+        {"_id": key},
+        {"$max": {"blocked_until": until}, "$set": {"tokens": 0.0, "updated_at": now}, "$inc": {"version": 1}},
+        upsert=True,
+    )
+
+
+# ------------------------------------------------------------
+# 🧾 Publication ledger (idempotent publishing)
+# ------------------------------------------------------------
+# Before publishing, post_executor claims a posts entry keyed by the
+# workflow's idempotency key and by a hash of the content (text + image).
+# A retry or re-run of a published workflow finds the entry and becomes a
+# no-op. Entries get their posted_date only once LinkedIn accepted the post,
+# so claims still publishing, or failed, never count as posts.
+#
+# A publish call that got no answer (a timeout or dropped connection) may
+# have created the post anyway, so its claim is held as 'unconfirmed'
+# rather than released: no attempt takes it over. Once the post is known
+# not to be on LinkedIn, deleting the entry or setting its status to
+# 'failed' lets the workflow be published again.
+
+PUBLICATION_CLAIMED = "claimed"
+PUBLICATION_PUBLISHED = "published"
+PUBLICATION_IN_PROGRESS = "in_progress"
+PUBLICATION_UNCONFIRMED = "unconfirmed"
+
+# Ledger status values
+_PUBLISHING = "publishing"
+_PUBLISH_FAILED = "failed"
+_PUBLISH_UNCONFIRMED = "unconfirmed"
+
+PUBLISHED_POSTS = {"posted_date": {"$type": "date"}}
+
+
+def content_hash(post_content: str, image_asset_urn: Optional[str] = None) -> str:
+    """Fingerprint of what gets published: the text plus the attached image."""
+    return hashlib.sha256(f"{post_content}\0{image_asset_urn or ''}".encode()).hexdigest()
+
+
+def _ledger_match(user_email: Optional[str], idempotency_key: Optional[str], digest: str) -> dict:
+    # This workflow, or the same content, for this user
+    matches = [{"content_hash": digest}]
+    if idempotency_key:
+        matches.append({"idempotency_key": idempotency_key})
+    return {"user_email": user_email, "$or": matches}
+
+
+def _ledger_claim(user_email, niche, topic, post_content, image_asset_urn, idempotency_key) -> dict:
+    claim = {
+        "user_email": user_email,
+        "niche": niche,
+        "topic": topic,
+        "content": post_content,
+        "image_asset_urn": image_asset_urn,
+        "content_hash": content_hash(post_content, image_asset_urn),
+        "status": _PUBLISHING,
+        "claimed_at": datetime.utcnow(),
+    }
+    if idempotency_key:
+        claim["idempotency_key"] = idempotency_key
+    return claim
+
+
+def _ledger_state(entry: dict) -> str:
+    """What an existing entry means for a new attempt; 'claimed' means it may be taken over."""
+    status = entry.get("status")
+    if status == _PUBLISHING:
+        abandoned = entry["claimed_at"] < datetime.utcnow() - timedelta(seconds=PUBLISH_CLAIM_TIMEOUT_SECONDS)
+        return PUBLICATION_CLAIMED if abandoned else PUBLICATION_IN_PROGRESS
+    if status == _PUBLISH_UNCONFIRMED:
+        return PUBLICATION_UNCONFIRMED
+    return PUBLICATION_CLAIMED if status == _PUBLISH_FAILED else PUBLICATION_PUBLISHED
+
+
+def _ledger_takeover(entry: dict, claim: dict) -> dict:
+    """find_one_and_update kwargs re-claiming entry, unless another attempt got there first."""
+    return {
+        "filter": {"_id": entry["_id"], "status": entry["status"], "claimed_at": entry["claimed_at"]},
+        "update": {"$set": claim},
+        "return_document": ReturnDocument.AFTER,
+    }
+
+
+def _ledger_published(linkedin_post_id: Optional[str], linkedin_post_url: Optional[str]) -> dict:
+    return {
+        "$set": {
+            "status": PUBLICATION_PUBLISHED,
+            "posted_date": datetime.utcnow(),
+            "linkedin_post_id": linkedin_post_id,
+            "linkedin_post_url": linkedin_post_url,
+        },
+        "$unset": {"error": ""},
+    }
+
+
+def claim_publication(user_email: Optional[str], niche: str, topic: Optional[str], post_content: str,
+                      image_asset_urn: Optional[str] = None,
+                      idempotency_key: Optional[str] = None) -> Tuple[str, dict]:
+    """
+    Claim the right to publish post_content for user_email.
+
+    Returns:
+        (state, entry): PUBLICATION_CLAIMED if the caller should publish and
+        then call finish_publication() or fail_publication() with entry;
+        PUBLICATION_PUBLISHED if this workflow or content is already live
+        (entry holds its LinkedIn id and URL); PUBLICATION_IN_PROGRESS if
+        another attempt is publishing it right now; PUBLICATION_UNCONFIRMED
+        if an earlier attempt got no answer from LinkedIn.
+    """
+    collection = get_collection()
+    claim = _ledger_claim(user_email, niche, topic, post_content, image_asset_urn, idempotency_key)
+    match = _ledger_match(user_email, idempotency_key, claim["content_hash"])
+    for _ in range(2):
+        entry = collection.find_one(match)
+        try:
+            if entry is None:
+                claim["_id"] = collection.insert_one(claim).inserted_id
+                return PUBLICATION_CLAIMED, claim
+            state = _ledger_state(entry)
+            if state != PUBLICATION_CLAIMED:
+                return state, entry
+            taken = collection.find_one_and_update(**_ledger_takeover(entry, claim))
+            if taken is not None:
+                return PUBLICATION_CLAIMED, taken
+        except DuplicateKeyError:
+            # A concurrent attempt claimed it first; look again
+            claim.pop("_id", None)
+    return PUBLICATION_IN_PROGRESS, entry or claim
+
+
+def finish_publication(entry: dict, linkedin_post_id: Optional[str] = None,
+                       linkedin_post_url: Optional[str] = None) -> None:
+    """Mark a claimed entry published and count the post."""
+    get_collection().update_one({"_id": entry["_id"]}, _ledger_published(linkedin_post_id, linkedin_post_url))
+    remember_topic(entry["user_email"], entry["niche"], entry.get("topic"))
+    record_workflow_outcome(entry["user_email"], entry["niche"], succeeded=True)
+    logger.info(f"Post {entry['_id']} published for user: {entry['user_email']}")
+
+
+def _ledger_release(entry: dict, status: str, error: str) -> dict:
+    """update_one kwargs ending the claim on entry with status."""
+    return {"filter": {"_id": entry["_id"], "status": _PUBLISHING},
+            "update": {"$set": {"status": status, "error": error}}}
+
+
+def fail_publication(entry: dict, error: str) -> None:
+    """Release a claimed entry so a later attempt can publish it."""
+    try:
+        get_collection().update_one(**_ledger_release(entry, _PUBLISH_FAILED, error))
+    except Exception as e:
+        logger.error(POST_SAVE_ERROR.format(error=e))
+
+
+def hold_publication(entry: dict, error: str) -> None:
+    """Mark a claimed entry unconfirmed: LinkedIn may have published it, so it is never claimed again."""
+    try:
+        get_collection().update_one(**_ledger_release(entry, _PUBLISH_UNCONFIRMED, error))
+    except Exception as e:
+        logger.error(POST_SAVE_ERROR.format(error=e))
+
+
+async def aclaim_publication(user_email: Optional[str], niche: str, topic: Optional[str], post_content: str,
+                             image_asset_urn: Optional[str] = None,
+                             idempotency_key: Optional[str] = None) -> Tuple[str, dict]:
+    """Async counterpart of claim_publication()."""
+    collection = get_async_collection()
+    claim = _ledger_claim(user_email, niche, topic, post_content, image_asset_urn, idempotency_key)
+    match = _ledger_match(user_email, idempotency_key, claim["content_hash"])
+    for _ in range(2):
+        entry = await collection.find_one(match)
+        try:
+            if entry is None:
+                claim["_id"] = (await collection.insert_one(claim)).inserted_id
+                return PUBLICATION_CLAIMED, claim
+            state = _ledger_state(entry)
+            if state != PUBLICATION_CLAIMED:
+                return state, entry
+            taken = await collection.find_one_and_update(**_ledger_takeover(entry, claim))
+            if taken is not None:
+                return PUBLICATION_CLAIMED, taken
+        except DuplicateKeyError:
+            claim.pop("_id", None)
+    return PUBLICATION_IN_PROGRESS, entry or claim
+
+
+async def afinish_publication(entry: dict, linkedin_post_id: Optional[str] = None,
+                              linkedin_post_url: Optional[str] = None) -> None:
+    """Async counterpart of finish_publication()."""
+    await get_async_collection().update_one(
+        {"_id": entry["_id"]}, _ledger_published(linkedin_post_id, linkedin_post_url)
+    )
+    remember_topic(entry["user_email"], entry["niche"], entry.get("topic"))
+    await arecord_workflow_outcome(entry["user_email"], entry["niche"], succeeded=True)
+    logger.info(f"Post {entry['_id']} published for user: {entry['user_email']}")
+
+
+async def afail_publication(entry: dict, error: str) -> None:
+    """Async counterpart of fail_publication()."""
+    try:
+        await get_async_collection().update_one(**_ledger_release(entry, _PUBLISH_FAILED, error))
+    except Exception as e:
+        logger.error(POST_SAVE_ERROR.format(error=e))
+
+
+async def ahold_publication(entry: dict, error: str) -> None:
+    """Async counterpart of hold_publication()."""
+    try:
+        await get_async_collection().update_one(**_ledger_release(entry, _PUBLISH_UNCONFIRMED, error))
+    except Exception as e:
+        logger.error(POST_SAVE_ERROR.format(error=e))
+
+
+# ------------------------------------------------------------
+# 📋 Background job records
+# ------------------------------------------------------------
+
+def _job_from_doc(doc: dict) -> Job:
+    doc["job_id"] = doc.pop("_id")
+    return Job(**doc)
+
+
+async def acreate_job(job: Job) -> None:
+    """Persist a new job record, keyed by its job_id."""
+    doc = job.model_dump(exclude={"job_id"})
+    doc["_id"] = job.job_id
+    doc["status"] = job.status.value
+    await get_async_jobs_collection().insert_one(doc)
+
+
+async def aget_job(job_id: str) -> Optional[Job]:
+    """Fetch a job record by id, or None if it does not exist."""
+    doc = await get_async_jobs_collection().find_one({"_id": job_id})
+    return _job_from_doc(doc) if doc else None
+
+
+async def aget_job_by_idempotency_key(user_email: Optional[str], idempotency_key: str) -> Optional[Job]:
+    """Fetch the job a user submitted with idempotency_key, or None."""
+    doc = await get_async_jobs_collection().find_one(
+        {"user_email": user_email, "idempotency_key": idempotency_key}
+    )
+    return _job_from_doc(doc) if doc else None
+
+
+async def aupdate_job(job_id: str, expected_status: Optional[JobStatus] = None, **fields) -> bool:
+    """
+    Set the given fields on a job record.
+
+    Args:
+        expected_status (JobStatus | None): Only update the job if it is
+            currently in this status (an atomic status transition).
+
+    Returns:
+        bool: Whether a job was updated.
+    """
+    query = {"_id": job_id}
+    if expected_status is not None:
+        query["status"] = expected_status.value
+    result = await get_async_jobs_collection().update_one(query, {"$set": fields})
+    return result.matched_count > 0
+
+
+async def aheartbeat_job(job_id: str, worker: str, now: datetime) -> bool:
+    """
+    Refresh the heartbeat of a job worker is running.
+
+    Returns:
+        bool: False if the job is no longer running on worker.
+    """
+    result = await get_async_jobs_collection().update_one(
+        {"_id": job_id, "status": JobStatus.RUNNING.value, "worker": worker},
+        {"$set": {"heartbeat_at": now}},
+    )
+    return result.matched_count > 0
+
+
+async def arelease_jobs(worker: str) -> int:
+    """Put the jobs worker is running back to 'queued' (it is shutting down). Returns how many."""
+    result = await get_async_jobs_collection().update_many(
+        {"status": JobStatus.RUNNING.value, "worker": worker},
+        {"$set": {"status": JobStatus.QUEUED.value}},
+    )
+    return result.modified_count
+
+
+async def arequeue_unfinished_jobs(now: datetime, lease_seconds: int) -> List[str]:
+    """
+    Return ids of jobs left to run, oldest first: queued jobs, and running
+    jobs whose worker stopped sending heartbeats lease_seconds before now
+    (those are reset to 'queued'). Jobs other processes are still running
+    are left alone.
+    """
+    collection = get_async_jobs_collection()
+    stale = now - timedelta(seconds=lease_seconds)
+    abandoned = {
+        "status": JobStatus.RUNNING.value,
+        "$or": [{"heartbeat_at": None}, {"heartbeat_at": {"$lte": stale}}],
+    }
+    cursor = collection.find(
+        {"$or": [{"status": JobStatus.QUEUED.value}, abandoned]}, {"_id": 1}
+    ).sort("created_at", 1)
+    job_ids = [doc["_id"] async for doc in cursor]
+    if job_ids:
+        await collection.update_many(
+            {"_id": {"$in": job_ids}, **abandoned}, {"$set": {"status": JobStatus.QUEUED.value}}
+        )
+    return job_ids
+
+# ------------------------------------------------------------
+# 🗓️ Autopilot schedules
+# ------------------------------------------------------------
+# Any number of processes poll the same schedules. A due schedule is claimed
+# by atomically setting a lease on it; the lease holder starts the run and
+# advances next_run_at, and only then releases the lease. A holder that dies
+# in between leaves the lease to expire, after which another process claims
+# the same run again (the run's idempotency key makes that safe).
+
+def _schedule_from_doc(doc: dict) -> Schedule:
+    doc["schedule_id"] = doc.pop("_id")
+    # Stored in UTC, but a naive run_at would be read as local to the schedule's timezone
+    if doc.get("run_at") is not None and doc["run_at"].tzinfo is None:
+        doc["run_at"] = doc["run_at"].replace(tzinfo=timezone.utc)
+    return Schedule(**doc)
+
+
+def _schedule_available(now: datetime) -> dict:
+    """Active schedules nobody holds an unexpired lease on."""
+    return {
+        "active": True,
+        "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lte": now}}],
+    }
+
+
+async def acreate_schedule(schedule: Schedule) -> None:
+    """Persist a new schedule, keyed by its schedule_id."""
+    doc = schedule.model_dump(exclude={"schedule_id"})
+    doc["_id"] = schedule.schedule_id
+    doc["cadence"] = schedule.cadence.value
+    await get_async_schedules_collection().insert_one(doc)
+
+
+async def aget_schedule(schedule_id: str) -> Optional[Schedule]:
+    """Fetch a schedule by id, or None if it does not exist."""
+    doc = await get_async_schedules_collection().find_one({"_id": schedule_id})
+    return _schedule_from_doc(doc) if doc else None
+
+
+async def alist_schedules(user_email: str) -> List[Schedule]:
+    """A user's schedules, newest first."""
+    cursor = get_async_schedules_collection().find({"user_email": user_email}).sort("created_at", DESCENDING)
+    return [_schedule_from_doc(doc) async for doc in cursor]
+
+
+async def adelete_schedule(schedule_id: str, user_email: str) -> bool:
+    """Delete one of a user's schedules. Returns whether it existed."""
+    result = await get_async_schedules_collection().delete_one({"_id": schedule_id, "user_email": user_email})
+    return result.deleted_count > 0
+
+
+async def aclaim_due_schedule(owner: str, now: datetime, lease_seconds: int) -> Optional[Schedule]:
+    """
+    Lease the most overdue schedule that is due at now to owner.
+
+    Returns:
+        Optional[Schedule]: The claimed schedule, or None if nothing is due.
+    """
+    doc = await get_async_schedules_collection().find_one_and_update(
+        {**_schedule_available(now), "next_run_at": {"$lte": now}},
+        {"$set": {"lease_owner": owner, "lease_expires_at": now + timedelta(seconds=lease_seconds)}},
+        sort=[("next_run_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+    return _schedule_from_doc(doc) if doc else None
+
+
+async def acomplete_schedule_run(schedule_id: str, owner: str, ran_at: datetime,
+                                 next_run_at: Optional[datetime], job_id: Optional[str]) -> bool:
+    """
+    Record a run started by the lease holder, advance the schedule to its
+    next run (deactivating it if there is none) and release the lease.
+
+    Returns:
+        bool: False if owner no longer held the lease.
+    """
+    result = await get_async_schedules_collection().update_one(
+        {"_id": schedule_id, "lease_owner": owner},
+        {
+            "$set": {
+                "next_run_at": next_run_at,
+                "active": next_run_at is not None,
+                "last_run_at": ran_at,
+                "last_job_id": job_id,
+                "lease_owner": None,
+                "lease_expires_at": None,
+            },
+            "$inc": {"runs": 1},
+        },
+    )
+    return result.matched_count > 0
+
+
+async def anext_schedule_due_at(now: datetime) -> Optional[datetime]:
+    """When the next unleased schedule is due (possibly already), or None."""
+    doc = await get_async_schedules_collection().find_one(
+        {**_schedule_available(now), "next_run_at": {"$ne": None}}, {"next_run_at": 1},
+        sort=[("next_run_at", ASCENDING)],
+    )
+    next_run_at = doc.get("next_run_at") if doc else None
+    if next_run_at is not None and next_run_at.tzinfo is None:
+        next_run_at = next_run_at.replace(tzinfo=timezone.utc)
+    return next_run_at
+
+# ------------------------------------------------------------
+# 🔑 LinkedIn credentials
+# ------------------------------------------------------------
+
+def _credentials_from_doc(doc: Optional[dict]) -> Optional[LinkedInCredentials]:
+    if not doc:
+        return None
+    doc["user"] = doc.pop("_id")
+    return LinkedInCredentials(**doc)
+
+
+def save_linkedin_credentials(credentials: LinkedInCredentials) -> None:
+    """Upsert a user's LinkedIn credentials, keyed by user."""
+    doc = credentials.model_dump(exclude={"user"})
+    doc["updated_at"] = datetime.utcnow()
+    get_credentials_collection().replace_one({"_id": credentials.user}, doc, upsert=True)
+
+
+def find_linkedin_credentials(user: str) -> Optional[LinkedInCredentials]:
+    """Load a user's stored LinkedIn credentials."""
+    doc = get_credentials_collection().find_one({"_id": user}, {"updated_at": 0})
+    return _credentials_from_doc(doc)
+
+
+async def afind_linkedin_credentials(user: str) -> Optional[LinkedInCredentials]:
+    """Async counterpart of find_linkedin_credentials()."""
+    doc = await get_async_credentials_collection().find_one({"_id": user}, {"updated_at": 0})
+    return _credentials_from_doc(doc)
+
 __all__ = [
+    'get_client',
+    'get_async_client',
+    'get_checkpointer',
+    'close_client',
+    'aclose_clients',
+    'INDEXES',
+    'aensure_indexes',
     'get_or_create_user',
+    'invalidate_user_cache',
+    'get_user_post_count',
     'save_post',
     'get_user_posts',
+    'get_user_posts_page',
+    'get_user_topics',
     'get_total_posts',
     'get_recent_posts',
     'get_posts_stats',
     'get_job_summary_from_summary_collection',
-    'update_job_summary'
+    'update_job_summary',
+    'record_workflow_outcome',
+    'arecord_workflow_outcome',
+    'areconcile_counters',
+    'acounters_need_reconcile',
+    'aget_or_create_user',
+    'aget_user_post_count',
+    'asave_post',
+    'aget_user_posts',
+    'aget_user_posts_page',
+    'aget_user_topics',
+    'aget_total_posts',
+    'aget_job_summary_from_summary_collection',
+    'aupdate_job_summary',
+    'reserve_token_usage',
+    'add_token_usage',
+    'get_token_usage',
+    'areserve_token_usage',
+    'aadd_token_usage',
+    'aget_token_usage',
+    'take_bucket_tokens',
+    'block_bucket',
+    'atake_bucket_tokens',
+    'ablock_bucket',
+    'PUBLICATION_CLAIMED',
+    'PUBLICATION_PUBLISHED',
+    'PUBLICATION_IN_PROGRESS',
+    'PUBLICATION_UNCONFIRMED',
+    'PUBLISHED_POSTS',
+    'content_hash',
+    'claim_publication',
+    'finish_publication',
+    'fail_publication',
+    'hold_publication',
+    'aclaim_publication',
+    'afinish_publication',
+    'afail_publication',
+    'ahold_publication',
+    'acreate_job',
+    'aget_job',
+    'aget_job_by_idempotency_key',
+    'aupdate_job',
+    'aheartbeat_job',
+    'arelease_jobs',
+    'arequeue_unfinished_jobs',
+    'acreate_schedule',
+    'aget_schedule',
+    'alist_schedules',
+    'adelete_schedule',
+    'aclaim_due_schedule',
+    'acomplete_schedule_run',
+    'anext_schedule_due_at',
+    'save_linkedin_credentials',
+    'find_linkedin_credentials',
+    'afind_linkedin_credentials',
 ]
\ No newline at end of file
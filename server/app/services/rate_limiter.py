@@ -0,0 +1,302 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from app.services.mongodb_service import (
+    take_bucket_tokens,
+    block_bucket,
+    atake_bucket_tokens,
+    ablock_bucket,
+)
+from app.utils.config import (
+    OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_TOKENS_PER_MINUTE,
+    LINKEDIN_REQUESTS_PER_MINUTE,
+    LINKEDIN_MEMBER_REQUESTS_PER_MINUTE,
+    RATE_LIMIT_MAX_WAIT_SECONDS,
+)
+from app.utils.logger import get_logger
+from app.utils.metrics import RATE_LIMIT_THROTTLED, RATE_LIMIT_WAIT
+
+if TYPE_CHECKING:
+    from openai import RateLimitError
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# 429 without a usable Retry-After: pause for this long, doubling per retry
+DEFAULT_RETRY_SECONDS = 1.0
+MAX_DEFAULT_RETRY_SECONDS = 30.0
+
+
+class RateLimited(Exception):
+    """A call could not get rate limit capacity within RATE_LIMIT_MAX_WAIT_SECONDS."""
+
+    def __init__(self, bucket: str, wait: float):
+        self.bucket = bucket
+        self.wait = wait
+        super().__init__(
+            f"Rate limit {bucket} needs {wait:.1f}s, more than the {RATE_LIMIT_MAX_WAIT_SECONDS:g}s "
+            f"a call may wait; try again later."
+        )
+
+
+class QuotaExhausted(RateLimited):
+    """The provider account is out of credit (OpenAI's insufficient_quota); waiting does not help."""
+
+    def __init__(self, provider: str, detail: str):
+        self.bucket = provider
+        self.wait = float("inf")
+        Exception.__init__(self, f"{provider} quota exhausted, add credit to continue: {detail}")
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """
+    A shared token bucket (see mongodb_service, Rate limit buckets) holding
+    at most one minute's worth of a per-minute limit. per_minute 0 enforces
+    no limit and is never read or written.
+    """
+    provider: str
+    key: str
+    per_minute: int
+
+    @property
+    def enforced(self) -> bool:
+        return self.per_minute > 0
+
+    def take(self, cost: float, now: float) -> float:
+        return take_bucket_tokens(self.key, min(cost, self.per_minute), self.per_minute, self.per_minute / 60, now)
+
+    async def atake(self, cost: float, now: float) -> float:
+        return await atake_bucket_tokens(
+            self.key, min(cost, self.per_minute), self.per_minute, self.per_minute / 60, now
+        )
+
+
+# (bucket, cost of this call)
+Charges = List[Tuple[Bucket, float]]
+
+
+def openai_charges(model: str, tokens: int) -> Charges:
+    """Buckets an OpenAI chat call draws from: requests and tokens per model."""
+    return [
+        (Bucket("openai", f"openai:{model}:requests", OPENAI_REQUESTS_PER_MINUTE), 1),
+        (Bucket("openai", f"openai:{model}:tokens", OPENAI_TOKENS_PER_MINUTE), tokens),
+    ]
+
+
+def linkedin_charges(member: Optional[str]) -> Charges:
+    """Buckets a LinkedIn API request draws from: the app's, and the member's if known."""
+    charges = [(Bucket("linkedin", "linkedin:requests", LINKEDIN_REQUESTS_PER_MINUTE), 1)]
+    if member:
+        charges.append((Bucket("linkedin", f"linkedin:member:{member}", LINKEDIN_MEMBER_REQUESTS_PER_MINUTE), 1))
+    return charges
+
+
+# ------------------------------------------------------------
+# ⏳ Waiting for capacity
+# ------------------------------------------------------------
+# The limiter fails open: if MongoDB cannot be reached, calls go ahead
+# unthrottled rather than failing with the database. Unlimited buckets are
+# skipped, so with no limits configured a call costs no round trip at all.
+
+def _enforced(charges: Charges) -> Charges:
+    return [(bucket, cost) for bucket, cost in charges if bucket.enforced]
+
+
+def _jittered(wait: float) -> float:
+    # Waiters released by the same refill should not all retry at once
+    return wait * random.uniform(1.0, 1.2)
+
+
+def _check_deadline(bucket: Bucket, wait: float, deadline: float) -> None:
+    if time.time() + wait > deadline:
+        raise RateLimited(bucket.key, wait)
+
+
+def acquire(charges: Charges, deadline: Optional[float] = None) -> None:
+    """
+    Block until every bucket granted its cost.
+
+    Raises:
+        RateLimited: If that would take past deadline (epoch seconds,
+            default RATE_LIMIT_MAX_WAIT_SECONDS from now).
+    """
+    charges = _enforced(charges)
+    if not charges:
+        return
+    started = time.time()
+    deadline = deadline or started + RATE_LIMIT_MAX_WAIT_SECONDS
+    for bucket, cost in charges:
+        while True:
+            try:
+                wait = bucket.take(cost, time.time())
+            except Exception as e:
+                logger.warning("⚠️ Rate limit %s unavailable, not throttling: %s", bucket.key, e)
+                break
+            if wait <= 0:
+                break
+            _check_deadline(bucket, wait, deadline)
+            time.sleep(_jittered(wait))
+    if charges:
+        RATE_LIMIT_WAIT.labels(charges[0][0].provider).observe(time.time() - started)
+
+
+async def aacquire(charges: Charges, deadline: Optional[float] = None) -> None:
+    """Async counterpart of acquire()."""
+    charges = _enforced(charges)
+    if not charges:
+        return
+    started = time.time()
+    deadline = deadline or started + RATE_LIMIT_MAX_WAIT_SECONDS
+    for bucket, cost in charges:
+        while True:
+            try:
+                wait = await bucket.atake(cost, time.time())
+            except Exception as e:
+                logger.warning("⚠️ Rate limit %s unavailable, not throttling: %s", bucket.key, e)
+                break
+            if wait <= 0:
+                break
+            _check_deadline(bucket, wait, deadline)
+            await asyncio.sleep(_jittered(wait))
+    if charges:
+        RATE_LIMIT_WAIT.labels(charges[0][0].provider).observe(time.time() - started)
+
+
+def penalize(charges: Charges, seconds: float) -> None:
+    """After a 429: hold the buckets in every worker for seconds (the provider's Retry-After)."""
+    now = time.time()
+    for bucket, _ in _enforced(charges):
+        try:
+            block_bucket(bucket.key, now + seconds, now)
+        except Exception as e:
+            logger.warning("⚠️ Could not pause rate limit %s: %s", bucket.key, e)
+    if charges:
+        RATE_LIMIT_THROTTLED.labels(charges[0][0].provider).inc()
+
+
+async def apenalize(charges: Charges, seconds: float) -> None:
+    """Async counterpart of penalize()."""
+    now = time.time()
+    for bucket, _ in _enforced(charges):
+        try:
+            await ablock_bucket(bucket.key, now + seconds, now)
+        except Exception as e:
+            logger.warning("⚠️ Could not pause rate limit %s: %s", bucket.key, e)
+    if charges:
+        RATE_LIMIT_THROTTLED.labels(charges[0][0].provider).inc()
+
+
+# ------------------------------------------------------------
+# 🧠 OpenAI calls
+# ------------------------------------------------------------
+# The openai SDK is imported on the first call rather than with the app: it
+# is slow to import, and the chat model loads it on first use anyway.
+
+def _openai_retry_after(error: "RateLimitError", attempt: int) -> float:
+    headers = getattr(error.response, "headers", None) or {}
+    for header, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        try:
+            return max(0.0, float(headers[header]) / scale)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return min(MAX_DEFAULT_RETRY_SECONDS, DEFAULT_RETRY_SECONDS * 2 ** attempt)
+
+
+def _openai_throttled(error: "RateLimitError", attempt: int, deadline: float) -> float:
+    """Seconds to pause after a 429, or raise if the call should not be retried."""
+    if getattr(error, "code", None) == "insufficient_quota":
+        raise QuotaExhausted("openai", str(error)) from error
+    delay = _openai_retry_after(error, attempt)
+    if time.time() + delay > deadline:
+        raise RateLimited("openai", delay) from error
+    logger.warning("🚦 OpenAI rate limit hit, pausing all workers for %.1fs", delay)
+    return delay
+
+
+class OpenAIGate(BaseRateLimiter):
+    """
+    Shared bucket capacity for one call_openai() call, handed to the chat
+    model as its rate_limiter. LangChain asks it only right before a request
+    goes out, after the response cache missed, so cache hits draw nothing.
+    """
+
+    def __init__(self, model: str, tokens: int):
+        self.charges = openai_charges(model, tokens)
+        self.deadline = time.time() + RATE_LIMIT_MAX_WAIT_SECONDS
+        # Requests actually sent; 0 after the call means it was answered from the cache
+        self.requests = 0
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        acquire(self.charges, self.deadline)
+        self.requests += 1
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        await aacquire(self.charges, self.deadline)
+        self.requests += 1
+        return True
+
+
+def call_openai(model: str, tokens: int, call: Callable[[], T], gate: Optional[OpenAIGate] = None) -> T:
+    """
+    Run an OpenAI call once the shared buckets have capacity for it. A 429
+    pauses the buckets for its Retry-After in every worker, and the call is
+    retried until RATE_LIMIT_MAX_WAIT_SECONDS have passed.
+
+    Args:
+        model (str): Model name (buckets are per model, like OpenAI's limits).
+        tokens (int): Tokens the call may use: prompt + max_tokens * n.
+        call: The call to make.
+        gate (OpenAIGate, optional): When given, call draws capacity itself
+            through it (a chat model using it as rate_limiter); otherwise
+            capacity is drawn before every attempt.
+
+    Raises:
+        RateLimited: Also as QuotaExhausted when the account is out of credit.
+    """
+    from openai import RateLimitError
+
+    draws_itself = gate is not None
+    gate = gate or OpenAIGate(model, tokens)
+    attempt = 0
+    while True:
+        if not draws_itself:
+            gate.acquire()
+        try:
+            return call()
+        except RateLimitError as e:
+            delay = _openai_throttled(e, attempt, gate.deadline)
+            attempt += 1
+            penalize(gate.charges, delay)
+            if not _enforced(gate.charges):
+                # No shared bucket holds the pause for this call
+                time.sleep(_jittered(delay))
+
+
+async def acall_openai(model: str, tokens: int, call: Callable[[], Awaitable[T]],
+                       gate: Optional[OpenAIGate] = None) -> T:
+    """Async counterpart of call_openai()."""
+    from openai import RateLimitError
+
+    draws_itself = gate is not None
+    gate = gate or OpenAIGate(model, tokens)
+    attempt = 0
+    while True:
+        if not draws_itself:
+            await gate.aacquire()
+        try:
+            return await call()
+        except RateLimitError as e:
+            delay = _openai_throttled(e, attempt, gate.deadline)
+            attempt += 1
+            await apenalize(gate.charges, delay)
+            if not _enforced(gate.charges):
+                await asyncio.sleep(_jittered(delay))
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import uuid4
+
+from app.models.schedule import Schedule
+from app.services.job_queue import JobQueue, job_queue
+from app.services.mongodb_service import (
+    aclaim_due_schedule,
+    acomplete_schedule_run,
+    anext_schedule_due_at,
+)
+from app.services.token_budget import TokenBudgetExceeded, aensure_token_budget
+from app.utils.config import SCHEDULER_POLL_SECONDS, SCHEDULER_LEASE_SECONDS
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def run_key(schedule: Schedule, due: datetime) -> str:
+    """Idempotency key of one run of a schedule: the same run always maps to the same job."""
+    return f"schedule:{schedule.schedule_id}:{due.strftime('%Y%m%dT%H%M%SZ')}"
+
+
+class Scheduler:
+    """
+    Starts due schedules (see mongodb_service, Autopilot schedules) as jobs
+    on a JobQueue.
+
+    Every process may run one: due schedules are claimed under a lease, so
+    each run is started by exactly one of them. Runs missed while no
+    scheduler was up are collapsed into a single run.
+    """
+
+    def __init__(self, queue: JobQueue = job_queue, poll_seconds: float = SCHEDULER_POLL_SECONDS,
+                 lease_seconds: int = SCHEDULER_LEASE_SECONDS):
+        self.queue = queue
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Spawn the polling task (a no-op if SCHEDULER_POLL_SECONDS is 0)."""
+        if self._task is not None or self.poll_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._loop(), name="scheduler")
+        logger.info("✅ Scheduler started as %s.", self.owner)
+
+    async def stop(self) -> None:
+        """Cancel the polling task. A run it had claimed is retried once the lease expires."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        logger.info("🛑 Scheduler stopped.")
+
+    def wake(self) -> None:
+        """Re-check due times now, e.g. after a schedule was created."""
+        self._wake.set()
+
+    async def run_due(self, now: Optional[datetime] = None) -> int:
+        """
+        Start every schedule due at now.
+
+        Returns:
+            int: Number of schedules claimed.
+        """
+        now = now or datetime.now(timezone.utc)
+        claimed = 0
+        while (schedule := await aclaim_due_schedule(self.owner, now, self.lease_seconds)) is not None:
+            claimed += 1
+            try:
+                await self._start_run(schedule, now)
+            except Exception as e:
+                # Left leased: another pass retries it when the lease expires
+                logger.exception("❌ Schedule %s could not be started: %s", schedule.schedule_id, e)
+        return claimed
+
+    async def _start_run(self, schedule: Schedule, now: datetime) -> None:
+        due = schedule.next_run_at
+        job_id = None
+        try:
+            await aensure_token_budget(schedule.user_email)
+            job = await self.queue.submit(schedule.niche, schedule.user_email, run_key(schedule, due))
+            job_id = job.job_id
+            logger.info("🗓️ Schedule %s started job %s (due %s)", schedule.schedule_id, job_id, due.isoformat())
+        except TokenBudgetExceeded as e:
+            logger.warning("⏭️ Schedule %s skipped this run: %s", schedule.schedule_id, e)
+
+        next_run_at = schedule.next_run_after(max(due, now))
+        if not await acomplete_schedule_run(schedule.schedule_id, self.owner, now, next_run_at, job_id):
+            logger.warning("⚠️ Lease on schedule %s expired before the run was recorded", schedule.schedule_id)
+
+    async def _loop(self) -> None:
+        while True:
+            self._wake.clear()
+            due_at = None
+            try:
+                await self.run_due()
+                due_at = await anext_schedule_due_at(datetime.now(timezone.utc))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("❌ Scheduler pass failed: %s", e)
+
+            delay = self.poll_seconds
+            if due_at is not None:
+                delay = min(delay, max(0.0, (due_at - datetime.now(timezone.utc)).total_seconds()))
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+# === Process-wide scheduler feeding the API's job queue ===
+scheduler = Scheduler()
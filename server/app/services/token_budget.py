@@ -0,0 +1,304 @@
+import functools
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+import tiktoken
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import LLMResult
+
+from app.services.mongodb_service import (
+    reserve_token_usage,
+    add_token_usage,
+    get_token_usage,
+    areserve_token_usage,
+    aadd_token_usage,
+    aget_token_usage,
+)
+from app.services.rate_limiter import OpenAIGate, call_openai, acall_openai
+from app.utils.config import (
+    LLM_MODEL,
+    LLM_MAX_TOKENS,
+    LLM_MAX_INPUT_TOKENS,
+    USER_DAILY_TOKEN_BUDGET,
+    DRAFT_CANDIDATES,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Chat format overhead: tokens around every message, and priming the reply
+TOKENS_PER_MESSAGE = 3
+REPLY_PRIMING_TOKENS = 3
+# Used only when the tiktoken encoding cannot be loaded (e.g. no network for the first download)
+CHARS_PER_TOKEN = 4
+
+
+class TokenBudgetExceeded(Exception):
+    """A user's daily LLM token budget would be exceeded by the next call."""
+
+    def __init__(self, user_email: str, used: int, requested: int, budget: int = USER_DAILY_TOKEN_BUDGET):
+        self.user_email = user_email
+        self.used = used
+        self.requested = requested
+        self.budget = budget
+        super().__init__(
+            f"Daily token budget exhausted for {user_email}: {used} of {budget} tokens used today, "
+            f"{requested} more needed. The budget resets at 00:00 UTC."
+        )
+
+
+# ------------------------------------------------------------
+# 🔢 Counting and trimming
+# ------------------------------------------------------------
+
+@functools.lru_cache(maxsize=1)
+def _encoding() -> Optional[tiktoken.Encoding]:
+    try:
+        return tiktoken.encoding_for_model(LLM_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("⚠️ tiktoken encoding unavailable (%s); estimating tokens from text length", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens text encodes to for LLM_MODEL."""
+    encoding = _encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Prompt tokens a chat request with these messages will be billed for."""
+    return REPLY_PRIMING_TOKENS + sum(TOKENS_PER_MESSAGE + count_tokens(str(m.content)) for m in messages)
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to at most max_tokens tokens."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+def fit_messages(node: str, messages: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    Trim the last message (the node's user input) so the prompt fits the
+    node's LLM_MAX_INPUT_TOKENS. The system prompt is never trimmed.
+    """
+    limit = LLM_MAX_INPUT_TOKENS.get(node)
+    if limit is None:
+        return messages
+    excess = count_message_tokens(messages) - limit
+    if excess <= 0:
+        return messages
+
+    last = messages[-1]
+    content = str(last.content)
+    trimmed = trim_to_tokens(content, count_tokens(content) - excess)
+    logger.warning("✂️ %s prompt trimmed by %d tokens to fit %d", node, excess, limit)
+    return messages[:-1] + [last.model_copy(update={"content": trimmed})]
+
+
+def _today() -> str:
+    return datetime.utcnow().date().isoformat()
+
+
+def _tokens_used(result: AIMessage, fallback: int) -> int:
+    usage = getattr(result, "usage_metadata", None) or {}
+    return usage.get("total_tokens", fallback)
+
+
+def _candidates_used(result: LLMResult, fallback: int) -> int:
+    # One request with n choices: usage is reported once for the whole response
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    if "total_tokens" in usage:
+        return usage["total_tokens"]
+    generations = result.generations[0]
+    return _tokens_used(generations[0].message, fallback) if generations else fallback
+
+
+# ------------------------------------------------------------
+# 🪙 Daily budgets
+# ------------------------------------------------------------
+
+def _budget_applies(user_email: Optional[str]) -> bool:
+    return bool(user_email) and USER_DAILY_TOKEN_BUDGET > 0
+
+
+def _minimum_headroom() -> int:
+    # No workflow can finish without reserving the largest single call at least once
+    drafting = LLM_MAX_TOKENS.get("content_creator", 0) * DRAFT_CANDIDATES
+    return max(drafting, *LLM_MAX_TOKENS.values(), 1)
+
+
+def ensure_token_budget(user_email: Optional[str]) -> None:
+    """
+    Raise TokenBudgetExceeded if the user cannot afford another workflow today,
+    so doomed runs are rejected before they spend anything.
+
+    Raises:
+        TokenBudgetExceeded
+    """
+    if not _budget_applies(user_email):
+        return
+    used = get_token_usage(user_email, _today())
+    if used + _minimum_headroom() > USER_DAILY_TOKEN_BUDGET:
+        raise TokenBudgetExceeded(user_email, used, _minimum_headroom())
+
+
+async def aensure_token_budget(user_email: Optional[str]) -> None:
+    """Async counterpart of ensure_token_budget()."""
+    if not _budget_applies(user_email):
+        return
+    used = await aget_token_usage(user_email, _today())
+    if used + _minimum_headroom() > USER_DAILY_TOKEN_BUDGET:
+        raise TokenBudgetExceeded(user_email, used, _minimum_headroom())
+
+
+# ------------------------------------------------------------
+# 🧠 Budgeted LLM calls
+# ------------------------------------------------------------
+# Before a call, the worst case (prompt + max_tokens for every requested
+# completion) is reserved against the user's budget; afterwards the
+# reservation is corrected to the provider-reported usage, or released if
+# the call failed or was answered from the LLM cache (cached replies keep
+# their original usage_metadata, but nothing was billed).
+
+def _prepare(node: str, messages: List[BaseMessage], n: int = 1) -> Tuple[List[BaseMessage], dict, int]:
+    """Trimmed messages, call kwargs and the tokens to reserve for a call from node."""
+    messages = fit_messages(node, messages)
+    max_tokens = LLM_MAX_TOKENS.get(node)
+    kwargs = {"max_tokens": max_tokens} if max_tokens else {}
+    if n > 1:
+        kwargs["n"] = n
+    return messages, kwargs, count_message_tokens(messages) + (max_tokens or 0) * n
+
+
+def _model_name(model) -> str:
+    return getattr(model, "model_name", None) or LLM_MODEL
+
+
+def _gated(model, reserved: int) -> Tuple[object, OpenAIGate]:
+    """The model drawing rate limit capacity only for requests it really sends, and its gate."""
+    gate = OpenAIGate(_model_name(model), reserved)
+    return model.model_copy(update={"rate_limiter": gate}), gate
+
+
+def _reserve(user_email: str, day: str, reserved: int) -> None:
+    if not reserve_token_usage(user_email, day, reserved, USER_DAILY_TOKEN_BUDGET):
+        raise TokenBudgetExceeded(user_email, get_token_usage(user_email, day), reserved)
+
+
+async def _areserve(user_email: str, day: str, reserved: int) -> None:
+    if not await areserve_token_usage(user_email, day, reserved, USER_DAILY_TOKEN_BUDGET):
+        raise TokenBudgetExceeded(user_email, await aget_token_usage(user_email, day), reserved)
+
+
+def invoke_llm(node: str, model, messages: List[BaseMessage], user_email: Optional[str]) -> AIMessage:
+    """
+    Trim the prompt for node, reserve its tokens and call the model with the
+    node's max_tokens once the shared OpenAI rate limits allow it. Answers
+    from the LLM cache draw no rate limit capacity.
+
+    Args:
+        node (str): Graph node making the call (selects the token limits).
+        model: Chat model, e.g. agent_graph._llm_for(node, state).
+        messages (List[BaseMessage]): Prompt.
+        user_email (str | None): User whose daily budget is charged.
+
+    Raises:
+        TokenBudgetExceeded: If the call could push the user over budget.
+        RateLimited: If the rate limits stay exhausted for RATE_LIMIT_MAX_WAIT_SECONDS, or as
+            QuotaExhausted if the OpenAI account is out of credit.
+    """
+    messages, kwargs, reserved = _prepare(node, messages)
+    model, gate = _gated(model, reserved)
+    def call() -> AIMessage:
+        return call_openai(_model_name(model), reserved, lambda: model.invoke(messages, **kwargs), gate)
+
+    if not _budget_applies(user_email):
+        return call()
+
+    day = _today()
+    _reserve(user_email, day, reserved)
+    used = 0
+    try:
+        result = call()
+        used = _tokens_used(result, reserved) if gate.requests else 0
+        return result
+    finally:
+        if used != reserved:
+            add_token_usage(user_email, day, used - reserved)
+
+
+async def ainvoke_llm(node: str, model, messages: List[BaseMessage], user_email: Optional[str]) -> AIMessage:
+    """Async counterpart of invoke_llm()."""
+    messages, kwargs, reserved = _prepare(node, messages)
+    model, gate = _gated(model, reserved)
+    async def call() -> AIMessage:
+        return await acall_openai(_model_name(model), reserved, lambda: model.ainvoke(messages, **kwargs), gate)
+
+    if not _budget_applies(user_email):
+        return await call()
+
+    day = _today()
+    await _areserve(user_email, day, reserved)
+    used = 0
+    try:
+        result = await call()
+        used = _tokens_used(result, reserved) if gate.requests else 0
+        return result
+    finally:
+        if used != reserved:
+            await aadd_token_usage(user_email, day, used - reserved)
+
+
+def generate_candidates(node: str, model, messages: List[BaseMessage], user_email: Optional[str],
+                        n: int) -> List[AIMessage]:
+    """
+    Like invoke_llm(), but asks for n completions of the same prompt in one
+    request (OpenAI's n parameter), so the prompt is sent and billed once.
+
+    Returns:
+        List[AIMessage]: The n completions.
+    """
+    messages, kwargs, reserved = _prepare(node, messages, n)
+    model, gate = _gated(model, reserved)
+    budgeted = _budget_applies(user_email)
+    day = _today()
+    if budgeted:
+        _reserve(user_email, day, reserved)
+    used = 0
+    try:
+        result = call_openai(_model_name(model), reserved, lambda: model.generate([messages], **kwargs), gate)
+        used = _candidates_used(result, reserved) if gate.requests else 0
+        return [generation.message for generation in result.generations[0]]
+    finally:
+        if budgeted and used != reserved:
+            add_token_usage(user_email, day, used - reserved)
+
+
+async def agenerate_candidates(node: str, model, messages: List[BaseMessage], user_email: Optional[str],
+                               n: int) -> List[AIMessage]:
+    """Async counterpart of generate_candidates()."""
+    messages, kwargs, reserved = _prepare(node, messages, n)
+    model, gate = _gated(model, reserved)
+    budgeted = _budget_applies(user_email)
+    day = _today()
+    if budgeted:
+        await _areserve(user_email, day, reserved)
+    used = 0
+    try:
+        result = await acall_openai(_model_name(model), reserved, lambda: model.agenerate([messages], **kwargs),
+                                    gate)
+        used = _candidates_used(result, reserved) if gate.requests else 0
+        return [generation.message for generation in result.generations[0]]
+    finally:
+        if budgeted and used != reserved:
+            await aadd_token_usage(user_email, day, used - reserved)
@@ -0,0 +1,172 @@
+import random
+import re
+import threading
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from app.utils.config import (
+    TOPIC_INDEX_TTL_SECONDS,
+    TOPIC_INDEX_MAX_INDEXES,
+)
+from app.utils.ttl_cache import TTLCache
+
+# ------------------------------------------------------------
+# 🔁 Near-duplicate topics (MinHash LSH)
+# ------------------------------------------------------------
+# Each (user, niche) gets an in-memory index over the topics already posted.
+# A topic is reduced to its character shingles; a MinHash signature over
+# those is cut into bands, and topics sharing any band bucket are
+# candidates. Candidates are confirmed with the exact Jaccard similarity of
+# their shingle sets, so the signature only has to find them, not score them.
+#
+# The signature uses one-permutation hashing: each shingle is hashed once and
+# kept as the minimum of one of NUM_BINS bins (empty bins borrow from the
+# next filled one), which costs one hash per shingle instead of one per
+# shingle and hash function.
+
+SHINGLE_SIZE = 4
+NUM_BINS = 32
+# 16 bands of 2 bins, and a candidate must share at least 2 band buckets: a
+# pair at Jaccard 0.6 does with probability 0.99, one at 0.2 with 0.13
+BANDS, ROWS = 16, 2
+MIN_BAND_MATCHES = 2
+
+_MASK = (1 << 64) - 1
+_BIN_SHIFT = 64 - (NUM_BINS.bit_length() - 1)
+_EMPTY = 1 << 64
+# Fixed seed: signatures must agree across processes and restarts
+_rng = random.Random(0x70F1C)
+_A, _B = _rng.getrandbits(64) | 1, _rng.getrandbits(64)
+
+
+def shingles(text: str) -> FrozenSet[int]:
+    """Hashed character shingles of text, ignoring case and punctuation."""
+    normalized = " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        return frozenset({zlib.crc32(normalized.encode())})
+    return frozenset(
+        zlib.crc32(normalized[i:i + SHINGLE_SIZE].encode())
+        for i in range(len(normalized) - SHINGLE_SIZE + 1)
+    )
+
+
+def signature(shingle_set: FrozenSet[int]) -> Tuple[int, ...]:
+    """One-permutation MinHash signature of a shingle set."""
+    bins = [_EMPTY] * NUM_BINS
+    for x in shingle_set:
+        h = (_A * x + _B) & _MASK
+        b = h >> _BIN_SHIFT
+        if h < bins[b]:
+            bins[b] = h
+    sig = [value << 5 for value in bins]
+    if _EMPTY in bins:
+        # Densify: an empty bin copies the next filled bin, tagged with the distance
+        for j, value in enumerate(bins):
+            if value == _EMPTY:
+                for distance in range(1, NUM_BINS):
+                    borrowed = bins[(j + distance) % NUM_BINS]
+                    if borrowed != _EMPTY:
+                        sig[j] = (borrowed << 5) | distance
+                        break
+    return tuple(sig)
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+class DuplicateTopic(Exception):
+    """Every generated topic repeated one the user already posted in the niche."""
+
+    def __init__(self, user_email: Optional[str], niche: Optional[str], topic: str, posted_topic: str):
+        self.user_email = user_email
+        self.niche = niche
+        self.topic = topic
+        self.posted_topic = posted_topic
+        super().__init__(
+            f"Generated topic '{topic}' repeats the already posted '{posted_topic}' "
+            f"for {user_email} in niche '{niche}'."
+        )
+
+
+class TopicIndex:
+    """MinHash LSH index over one user's topics in one niche."""
+
+    def __init__(self, topics: Iterable[str] = ()):
+        self._topics: List[str] = []
+        self._shingles: List[FrozenSet[int]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+        for topic in topics:
+            self.add(topic)
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    @staticmethod
+    def _bands(shingle_set: FrozenSet[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+        sig = signature(shingle_set)
+        return [(band, sig[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+    def add(self, topic: str) -> None:
+        """Index a posted topic."""
+        shingle_set = shingles(topic)
+        bands = self._bands(shingle_set)
+        with self._lock:
+            position = len(self._topics)
+            self._topics.append(topic)
+            self._shingles.append(shingle_set)
+            for key in bands:
+                self._buckets[key].append(position)
+
+    def similar(self, topic: str, threshold: float) -> List[Tuple[float, str]]:
+        """
+        Indexed topics at least threshold similar to topic (Jaccard over
+        shingles), most similar first.
+        """
+        shingle_set = shingles(topic)
+        with self._lock:
+            matches = Counter(
+                position for key in self._bands(shingle_set) for position in self._buckets.get(key, ())
+            )
+            scored = [
+                (jaccard(shingle_set, self._shingles[p]), self._topics[p])
+                for p, bands in matches.items() if bands >= MIN_BAND_MATCHES
+            ]
+        return sorted((match for match in scored if match[0] >= threshold), reverse=True)
+
+
+# === Per-user registry ===
+# Indexes are loaded from the posts ledger on first use and then updated on
+# every publish in this process. They expire after TOPIC_INDEX_TTL_SECONDS so
+# topics published by other workers are picked up.
+_indexes = TTLCache(TOPIC_INDEX_TTL_SECONDS, TOPIC_INDEX_MAX_INDEXES)
+
+
+def _key(user_email: Optional[str], niche: Optional[str]) -> Tuple[str, str]:
+    # Same niche string as stored on the posts, so reloads find the same topics
+    return user_email or "", niche or ""
+
+
+def get_topic_index(user_email: Optional[str], niche: Optional[str]) -> Optional[TopicIndex]:
+    """The loaded index for (user, niche), or None if it must be (re)loaded."""
+    return _indexes.get(_key(user_email, niche))
+
+
+def load_topic_index(user_email: Optional[str], niche: Optional[str], topics: Iterable[str]) -> TopicIndex:
+    """Build the index for (user, niche) from its posted topics."""
+    index = TopicIndex(topic for topic in topics if topic)
+    _indexes.set(_key(user_email, niche), index)
+    return index
+
+
+def remember_topic(user_email: Optional[str], niche: Optional[str], topic: Optional[str]) -> None:
+    """Add a just-published topic to its index, if that index is loaded."""
+    index = get_topic_index(user_email, niche)
+    if index is not None and topic:
+        index.add(topic)
@@ -14,8 +14,169 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("DB_NAME")
 
+# === MongoDB Connection Pool (optional, sensible defaults) ===
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+# === Background Job Workers ===
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# A running job refreshes its heartbeat every JOB_LEASE_SECONDS / 4. One whose
+# heartbeat is older than JOB_LEASE_SECONDS lost its process; running processes
+# sweep for such jobs every JOB_LEASE_SECONDS and run them again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+
+# === Scheduler ===
+# Seconds between scans for due schedules (sooner when one is due); 0
+# disables the scheduler in this process
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "30"))
+# How long a claimed schedule is reserved for the process that claimed it;
+# if that process dies before advancing it, another takes over afterwards
+SCHEDULER_LEASE_SECONDS = int(os.getenv("SCHEDULER_LEASE_SECONDS", "120"))
+
+# === Batch Workflow Runs ===
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "5"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+
+# === LLM Response Cache ===
+# Backend: "memory" (per process), "mongo" (shared) or "none".
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+# Graph nodes whose LLM calls go through the cache, e.g. "content_creator,reviewer";
+# none by default, so deployments opt in. Leave the topic generator out so
+# repeated runs for a niche still get fresh topics. Only first passes are
+# cached; rework after a rejected review always calls the model.
+LLM_CACHE_NODES = {
+    n.strip() for n in os.getenv("LLM_CACHE_NODES", "").split(",") if n.strip()
+}
+
+# === LLM Token Limits ===
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+
+
+def _node_limits(var: str, default: str) -> dict:
+    """Parse "node=tokens,node=tokens" into {node: tokens}."""
+    limits = {}
+    for item in os.getenv(var, default).split(","):
+        if "=" in item:
+            node, tokens = item.split("=", 1)
+            limits[node.strip()] = int(tokens)
+    return limits
+
+
+# Completion cap (max_tokens) per graph node
+LLM_MAX_TOKENS = _node_limits(
+    "LLM_MAX_TOKENS", "topic_generator=60,content_creator=600,reviewer=600,draft_selector=10"
+)
+# Prompt size per graph node; the node's user input is trimmed to fit
+LLM_MAX_INPUT_TOKENS = _node_limits(
+    "LLM_MAX_INPUT_TOKENS", "topic_generator=500,content_creator=1000,reviewer=2000,draft_selector=4000"
+)
+# Prompt + completion tokens each user may spend per UTC day; 0 (the default)
+# disables the limit
+USER_DAILY_TOKEN_BUDGET = int(os.getenv("USER_DAILY_TOKEN_BUDGET", "0"))
+
+# === Topic De-duplication ===
+# Generated topics at least this similar (Jaccard over character shingles)
+# to one the user already posted in the niche are regenerated
+TOPIC_SIMILARITY_THRESHOLD = float(os.getenv("TOPIC_SIMILARITY_THRESHOLD", "0.6"))
+# Regenerations before the workflow is rejected as a duplicate (0 = reject at once)
+TOPIC_MAX_REGENERATIONS = int(os.getenv("TOPIC_MAX_REGENERATIONS", "2"))
+# Most recent posted topics loaded into a (user, niche) index
+TOPIC_INDEX_MAX_TOPICS = int(os.getenv("TOPIC_INDEX_MAX_TOPICS", "2000"))
+# In-memory indexes kept, and how long before one is reloaded from MongoDB
+TOPIC_INDEX_MAX_INDEXES = int(os.getenv("TOPIC_INDEX_MAX_INDEXES", "1000"))
+TOPIC_INDEX_TTL_SECONDS = int(os.getenv("TOPIC_INDEX_TTL_SECONDS", "600"))
+
+# === Drafting and Review ===
+# Drafts written per workflow. 1: a single draft, revised in serial review
+# rounds. N > 1: N candidates from one request, and the reviewer picks the
+# best in a single call instead of looping.
+DRAFT_CANDIDATES = int(os.getenv("DRAFT_CANDIDATES", "1"))
+# Review rounds before a draft is approved regardless (serial mode)
+REVIEW_MAX_ITERATIONS = int(os.getenv("REVIEW_MAX_ITERATIONS", "1"))
+
+# === Image Generation ===
+# "final_post" (default): render the image from the approved post, after
+# review. "topic": render it from the topic instead, on a branch that runs
+# alongside drafting and review; faster, but the image no longer reflects
+# the post's text.
+IMAGE_PROMPT_SOURCE = os.getenv("IMAGE_PROMPT_SOURCE", "final_post").lower()
+
+# === LinkedIn HTTP Client ===
+LINKEDIN_HTTP_POOL_SIZE = int(os.getenv("LINKEDIN_HTTP_POOL_SIZE", "20"))
+LINKEDIN_MAX_RETRIES = int(os.getenv("LINKEDIN_MAX_RETRIES", "3"))
+LINKEDIN_BACKOFF_BASE_SECONDS = float(os.getenv("LINKEDIN_BACKOFF_BASE_SECONDS", "0.5"))
+LINKEDIN_BACKOFF_MAX_SECONDS = float(os.getenv("LINKEDIN_BACKOFF_MAX_SECONDS", "8"))
+LINKEDIN_MAX_RETRY_AFTER_SECONDS = float(os.getenv("LINKEDIN_MAX_RETRY_AFTER_SECONDS", "30"))
+LINKEDIN_TIMEOUT_SECONDS = float(os.getenv("LINKEDIN_TIMEOUT_SECONDS", "15"))
+LINKEDIN_UPLOAD_TIMEOUT_SECONDS = float(os.getenv("LINKEDIN_UPLOAD_TIMEOUT_SECONDS", "60"))
+
+# === Rate Limits ===
+# Per-minute limits enforced through token buckets shared by all workers in
+# MongoDB; calls wait for capacity instead of failing, and a 429 from the
+# provider pauses every worker for its Retry-After. 0 leaves a bucket
+# unlimited and out of MongoDB entirely: a 429 then only pauses the call
+# that got it. Set them to the limits of your OpenAI tier and LinkedIn app.
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "0"))
+# Counted as OpenAI does: prompt + max_tokens of every requested completion
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "0"))
+LINKEDIN_REQUESTS_PER_MINUTE = int(os.getenv("LINKEDIN_REQUESTS_PER_MINUTE", "0"))
+# Per LinkedIn member (person URN) publishing through the app
+LINKEDIN_MEMBER_REQUESTS_PER_MINUTE = int(os.getenv("LINKEDIN_MEMBER_REQUESTS_PER_MINUTE", "0"))
+# Longest a call waits for capacity before failing with RateLimited
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "120"))
+
+# === Publishing ===
+# A ledger claim still 'publishing' after this long belongs to a publisher
+# that died mid-call; another attempt may then take it over
+PUBLISH_CLAIM_TIMEOUT_SECONDS = int(os.getenv("PUBLISH_CLAIM_TIMEOUT_SECONDS", "300"))
+
+# === Auth / User Lookup Caches ===
+USERINFO_CACHE_TTL_SECONDS = int(os.getenv("USERINFO_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+# LinkedIn credentials are re-read from MongoDB this often, so a token
+# refreshed by a login served by another process is picked up
+CREDENTIALS_CACHE_TTL_SECONDS = int(os.getenv("CREDENTIALS_CACHE_TTL_SECONDS", "60"))
+
+# === Workflow Checkpoints ===
+# Background jobs save graph state to MongoDB after every node so a failed
+# job can resume; checkpoints expire after this many seconds (0 = never)
+CHECKPOINT_TTL_SECONDS = int(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+# === Logging ===
+# Records are queued and written to LOG_DIR/app.log by a background thread,
+# so logging never blocks a request on file I/O
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+# "json" (one object per line) or "text"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Per-logger overrides, "logger=LEVEL,logger=LEVEL" (e.g. app.services.job_queue=DEBUG)
+LOG_LEVELS = {
+    name.strip(): level.strip().upper()
+    for name, level in (
+        item.split("=", 1) for item in os.getenv("LOG_LEVELS", "httpx=WARNING").split(",") if "=" in item
+    )
+}
+# Rotate at this size (0 = never), keeping LOG_BACKUP_COUNT old files. A
+# LOG_ROTATE_WHEN interval (e.g. "midnight", "H") rotates by time instead.
+# Each process rotates on its own: with several workers sharing LOG_DIR,
+# set LOG_MAX_BYTES=0 and rotate externally.
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")
+# Records waiting for the writer; beyond this, new records are dropped
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Keep 1 in N DEBUG records per call site (1 keeps all)
+LOG_DEBUG_SAMPLE_EVERY = int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "10"))
+
 
 # === Check for missing environment variables ===
+# Checked by validate_config() when the app starts, not on import, so tools
+# and workers can import modules that need only part of the configuration.
 required_vars = [
     "OPENAI_API_KEY",
     "LINKEDIN_ACCESS_TOKEN",
@@ -24,12 +185,17 @@ required_vars = [
     "GEMINI_API_KEY",
     "MONGO_URI",
     "DB_NAME",
-   
 ]
 
-missing_vars = [var for var in required_vars if not os.getenv(var)]
 
-if missing_vars:
-    # Format the message from constant.py
-    error_message = MISSING_ENV_VARS_ERROR.format(vars=", ".join(missing_vars))
-    raise EnvironmentError(error_message)
+def validate_config() -> None:
+    """
+    Fail fast on missing configuration; called at application startup.
+
+    Raises:
+        EnvironmentError: If any required environment variable is unset.
+    """
+    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    if missing_vars:
+        # Format the message from constant.py
+        raise EnvironmentError(MISSING_ENV_VARS_ERROR.format(vars=", ".join(missing_vars)))
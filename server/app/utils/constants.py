@@ -22,8 +22,10 @@ LINKEDIN_ASSET_UPLOAD_FAIL = "❌ Failed to upload image to LinkedIn: {error}"
 LINKEDIN_POST_SUCCESS = "✅ Post published successfully on LinkedIn."
 LINKEDIN_POST_FAIL = "❌ LinkedIn post failed with status {status}: {error}"
 LINKEDIN_NETWORK_ERROR = "🌐 Network error during LinkedIn operation: {error}"
+LINKEDIN_POST_UNCONFIRMED = "❓ LinkedIn did not answer the post request ({error}); the post may have been published."
 REGISTER_UPLOAD_URL = "https://api.linkedin.com/v2/assets?action=registerUpload"
 LINKEDIN_POST_API_URL = "https://api.linkedin.com/v2/ugcPosts"
+LINKEDIN_POST_URL = "https://www.linkedin.com/feed/update/{urn}/"
 
 # --- Gemini Messages ---
 GEMINI_CLIENT_INIT_FAIL = "❌ Failed to initialize Gemini client: {error}"
@@ -42,6 +44,7 @@ TOPIC_GENERATOR_SYSTEM_PROMPT = (
     "Return ONLY the title, no additional explanation."
 )
 TOPIC_GENERATOR_USER_PROMPT = "Generate a unique, actionable topic for the niche: {niche}"
+TOPIC_GENERATOR_AVOID_PROMPT = "\n\nThese topics were already covered; pick a clearly different angle:\n{topics}"
 
 # Content creation
 CONTENT_CREATOR_SYSTEM_PROMPT = (
@@ -59,6 +62,13 @@ REVIEWER_SYSTEM_PROMPT = (
     "Otherwise, provide a concise critique with actionable improvements. "
     "Do not include the original post content in the critique."
 )
+DRAFT_SELECTOR_SYSTEM_PROMPT = (
+    "You are a strict LinkedIn post reviewer. "
+    "You will receive several numbered drafts of the same post. "
+    "Pick the most engaging, clear and actionable one. "
+    "Return ONLY its number."
+)
+DRAFT_SELECTOR_CANDIDATE = "Draft {index}:\n{draft}"
 
 # Image generation
 IMAGE_GENERATION_INSTRUCTION = (
@@ -68,6 +78,7 @@ IMAGE_GENERATION_INSTRUCTION = (
 
 # Post execution
 POST_EXECUTOR_FAILURE_MESSAGE = "No final_post available to publish or post failed."
+POST_LEDGER_ERROR = "🚨 Post {urn} is live but could not be recorded in the ledger: {error}"
 POST_EXECUTOR_SUCCESS_MESSAGE = "LinkedIn post succeeded and saved to MongoDB."
 
 GEMINI_MODEL = "gemini-2.0-flash"
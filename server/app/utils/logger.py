@@ -1,20 +1,175 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
 
-# === Ensure logs folder exists ===
-LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
+from app.utils.config import (
+    LOG_DIR,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    LOG_ROTATE_WHEN,
+    LOG_QUEUE_SIZE,
+    LOG_DEBUG_SAMPLE_EVERY,
+)
 
-# === Configure the root logger ===
+# === Ensure logs folder exists ===
+os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE_PATH = os.path.join(LOG_DIR, "app.log")
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    filemode="a",  # append mode
-    format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-    level=logging.INFO
-)
+TEXT_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
+
+# ------------------------------------------------------------
+# 🏷️ Workflow context
+# ------------------------------------------------------------
+# Fields such as workflow_id (the job id for queued jobs) and node are set
+# around a workflow run or graph node and added to every record logged
+# inside it, including from the tasks and threads it starts.
+
+_context: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("log_context", default={})
+
+
+@contextmanager
+def log_context(**fields: Optional[str]) -> Iterator[None]:
+    """Add fields (None values are skipped) to the records logged inside the block."""
+    token = _context.set({**_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+# ------------------------------------------------------------
+# 🧾 Record handling
+# ------------------------------------------------------------
+
+class DebugSampler(logging.Filter):
+    """Let through the first and then every Nth DEBUG record of each call site."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._seen: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG or self.every == 1:
+            return True
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            seen = self._seen.get(site, 0)
+            self._seen[site] = seen + 1
+        return seen % self.every == 0
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread without blocking: the caller only
+    renders the message and attaches the workflow context; formatting and
+    file I/O happen on the writer. Records arriving while the queue is full
+    are dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks must be rendered while the frames still exist
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.context = _context.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "context"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, workflow context and extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        entry.update((k, v) for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextTextFormatter(logging.Formatter):
+    """The classic text line, followed by the workflow context when there is one."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = getattr(record, "context", None)
+        if context:
+            line += " | " + " ".join(f"{k}={v}" for k, v in context.items())
+        return line
+
+
+def _file_handler() -> logging.Handler:
+    if LOG_ROTATE_WHEN:
+        handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE_PATH, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", utc=True,
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8",
+        )
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else ContextTextFormatter(TEXT_FORMAT))
+    return handler
+
+
+# ------------------------------------------------------------
+# 🚀 Configure the root logger
+# ------------------------------------------------------------
+
+def _configure() -> Tuple[ContextQueueHandler, logging.handlers.QueueListener]:
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    handler = ContextQueueHandler(log_queue)
+    handler.addFilter(DebugSampler(LOG_DEBUG_SAMPLE_EVERY))
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    for name, level in LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, _file_handler())
+    listener.start()
+    # Flushes whatever is still queued when the process exits
+    atexit.register(listener.stop)
+    return handler, listener
+
+
+queue_handler, _listener = _configure()
 
 # === Create module-level logger ===
 logger = logging.getLogger("app_logger")
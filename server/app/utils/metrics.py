@@ -0,0 +1,244 @@
+import functools
+import inspect
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from prometheus_client.core import CounterMetricFamily
+from pymongo import monitoring
+
+from app.utils.logger import log_context, queue_handler
+
+# Workflow stages range from milliseconds (Mongo) to tens of seconds (image generation)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+# === Graph ===
+NODE_DURATION = Histogram(
+    "postsync_node_duration_seconds", "Wall time of one graph node execution.", ["node"],
+    buckets=LATENCY_BUCKETS,
+)
+NODE_ERRORS = Counter("postsync_node_errors_total", "Graph node executions that raised.", ["node"])
+REVIEW_ITERATIONS = Histogram(
+    "postsync_review_iterations", "Reviewer iterations before a draft was approved.",
+    buckets=(0, 1, 2, 3, 4, 5),
+)
+
+# === LLM ===
+LLM_DURATION = Histogram(
+    "postsync_llm_request_duration_seconds", "Wall time of one chat model call.", ["node", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_ERRORS = Counter("postsync_llm_errors_total", "Chat model calls that failed.", ["node", "model"])
+LLM_TOKENS = Counter(
+    "postsync_llm_tokens_total", "Tokens billed by the model provider (cache hits excluded).",
+    ["node", "model", "kind"],
+)
+
+# === LinkedIn ===
+LINKEDIN_DURATION = Histogram(
+    "postsync_linkedin_request_duration_seconds", "Wall time of one LinkedIn call, retries included.",
+    ["endpoint"], buckets=LATENCY_BUCKETS,
+)
+LINKEDIN_ERRORS = Counter(
+    "postsync_linkedin_errors_total", "LinkedIn calls that ended in an error response or exception.", ["endpoint"],
+)
+LINKEDIN_RETRIES = Counter("postsync_linkedin_retries_total", "Retried LinkedIn attempts.", ["endpoint"])
+
+# === Rate limits ===
+RATE_LIMIT_WAIT = Histogram(
+    "postsync_rate_limit_wait_seconds", "Time calls waited for rate limit capacity.", ["provider"],
+    buckets=LATENCY_BUCKETS,
+)
+RATE_LIMIT_THROTTLED = Counter(
+    "postsync_rate_limit_throttled_total", "429 responses that paused a provider's buckets.", ["provider"],
+)
+
+# === MongoDB ===
+MONGO_DURATION = Histogram(
+    "postsync_mongo_command_duration_seconds", "Server round trip of one MongoDB command.",
+    ["command", "collection"], buckets=LATENCY_BUCKETS,
+)
+MONGO_ERRORS = Counter("postsync_mongo_errors_total", "MongoDB commands that failed.", ["command", "collection"])
+
+
+# === Logging ===
+class DroppedLogRecords:
+    """
+    Exposes the records app.utils.logger's queue handler dropped while its
+    queue was full. The handler keeps the count (logging cannot import this
+    module); this collector reads it on every scrape.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def collect(self):
+        yield CounterMetricFamily(
+            "postsync_log_records_dropped", "Log records dropped because the log queue was full.",
+            value=self.handler.dropped,
+        )
+
+
+REGISTRY.register(DroppedLogRecords(queue_handler))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Serialize all metrics in the Prometheus text format.
+
+    Under gunicorn, set PROMETHEUS_MULTIPROC_DIR so every worker's samples
+    are aggregated instead of only the worker that served the scrape. The
+    dropped log record count lives in each process and is only exposed
+    without it.
+
+    Returns:
+        (body, content_type)
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# ------------------------------------------------------------
+# ⏱️ Graph nodes
+# ------------------------------------------------------------
+
+def instrument_node(name: str, node):
+    """
+    Wrap a (sync or async) graph node so its duration and failures are
+    recorded, and its log records carry the node name.
+    """
+    duration = NODE_DURATION.labels(name)
+    errors = NODE_ERRORS.labels(name)
+
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def timed(state):
+            with log_context(node=name), errors.count_exceptions(), duration.time():
+                return await node(state)
+    else:
+        @functools.wraps(node)
+        def timed(state):
+            with log_context(node=name), errors.count_exceptions(), duration.time():
+                return node(state)
+    return timed
+
+
+# ------------------------------------------------------------
+# 🧠 LLM calls
+# ------------------------------------------------------------
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    Records duration, failures and token usage of chat model calls. The node
+    label comes from the model's metadata (see agent_graph._llm_for).
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._runs: Dict[UUID, Tuple[float, str, str]] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        self._runs[run_id] = (
+            time.perf_counter(),
+            metadata.get("node", "unknown"),
+            metadata.get("ls_model_name", "unknown"),
+        )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        started, node, model = run
+        LLM_DURATION.labels(node, model).observe(time.perf_counter() - started)
+        # Cache hits carry no llm_output, so only provider-billed tokens are counted
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        for kind in ("prompt", "completion"):
+            tokens = usage.get(f"{kind}_tokens")
+            if tokens:
+                LLM_TOKENS.labels(node, model, kind).inc(tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        started, node, model = run
+        LLM_DURATION.labels(node, model).observe(time.perf_counter() - started)
+        LLM_ERRORS.labels(node, model).inc()
+
+
+llm_metrics = LLMMetricsCallback()
+
+
+# ------------------------------------------------------------
+# 🌐 LinkedIn calls
+# ------------------------------------------------------------
+
+def observe_linkedin_call(endpoint: str, elapsed_seconds: float, error: bool, retries: int) -> None:
+    LINKEDIN_DURATION.labels(endpoint).observe(elapsed_seconds)
+    if error:
+        LINKEDIN_ERRORS.labels(endpoint).inc()
+    if retries:
+        LINKEDIN_RETRIES.labels(endpoint).inc(retries)
+
+
+# ------------------------------------------------------------
+# 🍃 MongoDB commands
+# ------------------------------------------------------------
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the MongoDB histograms; register via event_listeners."""
+
+    # Handshake and topology chatter, not application queries
+    IGNORED = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue"}
+
+    def __init__(self):
+        self._collections: Dict[Tuple[Any, int], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in self.IGNORED:
+            return
+        # getMore names its collection separately; the command value is the cursor id
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        collection = event.command.get(key)
+        self._collections[(event.connection_id, event.request_id)] = (
+            collection if isinstance(collection, str) else "-"
+        )
+
+    def _labels(self, event) -> Optional[Tuple[str, str]]:
+        collection = self._collections.pop((event.connection_id, event.request_id), None)
+        if collection is None:
+            return None
+        return event.command_name, collection
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        labels = self._labels(event)
+        if labels:
+            MONGO_DURATION.labels(*labels).observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        labels = self._labels(event)
+        if labels:
+            MONGO_DURATION.labels(*labels).observe(event.duration_micros / 1e6)
+            MONGO_ERRORS.labels(*labels).inc()
+
+
+mongo_metrics = MongoCommandMetrics()
@@ -0,0 +1,45 @@
+"""
+Throughput of the sync vs async graph nodes when many workflows share one
+event loop (as they do inside a single uvicorn worker).
+
+LangGraph offloads sync nodes to the default thread pool, so their
+throughput flattens once the pool is saturated; async nodes keep scaling
+with the number of in-flight workflows.
+
+Usage (from server/):
+    python -m benchmarks.bench_async_nodes --workflows 20 --llm-latency 0.2
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.fakes import install_fakes
+
+
+async def _run_batch(graph, workflows: int) -> float:
+    from app.models.agent import AgentState
+
+    states = [AgentState(niche=f"niche-{i}", user_email="bench@example.com") for i in range(workflows)]
+    started = time.perf_counter()
+    await asyncio.gather(*(graph.ainvoke(state) for state in states))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--io-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    install_fakes(args.llm_latency, args.io_latency)
+    from app.services.agent_graph import build_graph
+
+    print(f"{args.workflows} concurrent workflows, LLM latency {args.llm_latency}s, I/O latency {args.io_latency}s")
+    for label, use_async in (("sync nodes", False), ("async nodes", True)):
+        elapsed = asyncio.run(_run_batch(build_graph(use_async=use_async), args.workflows))
+        print(f"{label:<12} {elapsed:8.2f}s  {args.workflows / elapsed:8.2f} workflows/s")
+
+
+if __name__ == "__main__":
+    main()
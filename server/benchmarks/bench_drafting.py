@@ -0,0 +1,164 @@
+"""
+Drafting strategy benchmark: serial review loop vs multi-candidate selection.
+
+Runs the same workflows through the async graph once per strategy:
+  * serial: one draft per content_creator call, critiqued by the reviewer
+    and regenerated until approved or --max-iterations is reached;
+  * candidates-N: N drafts from one request (DRAFT_CANDIDATES=N) and a
+    single reviewer call picking the best.
+
+Reports per strategy the drafting-stage latency (content_creator + reviewer),
+sequential LLM round trips, tokens charged to the user's budget and the
+quality of the published draft.
+
+Offline (the default) the chat model is FakeChatModel: every draft gets a
+random simulated quality, the serial reviewer asks for a rework below
+--approve-threshold and the selector picks the best candidate. With --live
+the real OpenAI model drafts and reviews, and a separate judge call scores
+every published post; this spends real tokens and needs OPENAI_API_KEY.
+
+Usage (from server/):
+    python -m benchmarks.bench_drafting --workflows 50 --candidates 2,3,5 --max-iterations 3
+    python -m benchmarks.bench_drafting --live --workflows 10 --candidates 3
+"""
+import argparse
+import asyncio
+import os
+import re
+import time
+from collections import defaultdict
+from statistics import mean
+from typing import List, Optional
+
+from benchmarks import fakes
+from benchmarks.bench_e2e import build_timed_graph, _latency_summary
+
+DRAFTING_NODES = ("content_creator", "reviewer")
+JUDGE_PROMPT = (
+    "Rate this LinkedIn post from 1 to 10 for how engaging, clear and actionable it is. "
+    "Return ONLY the number."
+)
+
+
+class DraftingTimer:
+    """Drafting-stage wall time and node executions per workflow, keyed by user_email."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.round_trips = defaultdict(int)
+
+    def wrap(self, name: str, node):
+        if name not in DRAFTING_NODES:
+            return node
+
+        async def timed(state):
+            started = time.perf_counter()
+            try:
+                return await node(state)
+            finally:
+                self.seconds[state.user_email] += time.perf_counter() - started
+                self.round_trips[state.user_email] += 1
+        return timed
+
+
+async def _judge(model, post: Optional[str]) -> Optional[float]:
+    """Live quality: the judge's 1-10 score scaled to 0-1."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    if not post:
+        return None
+    result = await model.ainvoke([SystemMessage(JUDGE_PROMPT), HumanMessage(post)])
+    match = re.search(r"\d+", str(result.content))
+    return min(int(match.group()), 10) / 10 if match else None
+
+
+async def run_strategy(graph, timer: DraftingTimer, candidates: int, workflows: int,
+                       concurrency: int, judge=None) -> dict:
+    from app.models.agent import AgentState
+    from app.services import agent_graph
+    from app.services.mongodb_service import aget_token_usage
+    from app.services.token_budget import _today
+
+    agent_graph.DRAFT_CANDIDATES = candidates
+    label = "serial" if candidates == 1 else f"candidates-{candidates}"
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        email = f"{label}-{i}@bench.example.com"
+        async with semaphore:
+            final = await graph.ainvoke(AgentState(niche=f"niche-{i % 20}", user_email=email))
+        post = final.get("final_post")
+        quality = await _judge(judge, post) if judge else fakes.draft_quality(post)
+        return email, quality
+
+    outcomes = await asyncio.gather(*(one(i) for i in range(workflows)))
+    emails = [email for email, _ in outcomes]
+    qualities = [quality for _, quality in outcomes if quality is not None]
+    tokens = [await aget_token_usage(email, _today()) for email in emails]
+    round_trips = [timer.round_trips[email] for email in emails]
+    return {
+        "strategy": label,
+        "drafting": _latency_summary([timer.seconds[email] for email in emails]),
+        "round_trips": round(mean(round_trips), 2),
+        "reworked": sum(trips > 2 for trips in round_trips),
+        "tokens_per_workflow": round(mean(tokens)),
+        "quality": round(mean(qualities), 3) if qualities else None,
+    }
+
+
+def report(results: List[dict]) -> None:
+    print(f"\n{'strategy':<14} {'p50 ms':>9} {'p95 ms':>9} {'round trips':>12} {'reworked':>9} "
+          f"{'tokens/wf':>10} {'quality':>8}")
+    for r in results:
+        quality = "n/a" if r["quality"] is None else f"{r['quality']:.3f}"
+        print(f"{r['strategy']:<14} {r['drafting']['p50_ms']:>9} {r['drafting']['p95_ms']:>9} "
+              f"{r['round_trips']:>12} {r['reworked']:>9} {r['tokens_per_workflow']:>10} {quality:>8}")
+    print("\nround trips: sequential content_creator + reviewer calls; tokens/wf: all LLM calls of a workflow")
+
+
+async def _run(args, levels: List[int]) -> List[dict]:
+    timer = DraftingTimer()
+    graph = build_timed_graph(timer)
+    judge = None
+    if args.live:
+        from app.services import agent_graph
+        judge = agent_graph.get_llm()
+    return [
+        await run_strategy(graph, timer, candidates, args.workflows, args.concurrency, judge)
+        for candidates in levels
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=50)
+    parser.add_argument("--candidates", default="2,3,5", help="comma-separated candidate counts to compare")
+    parser.add_argument("--max-iterations", type=int, default=3, help="review rounds in serial mode")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--approve-threshold", type=float, default=0.6,
+                        help="simulated quality the fake serial reviewer approves")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--live", action="store_true", help="use the real OpenAI model and a judge call")
+    args = parser.parse_args()
+
+    levels = [1] + [int(n) for n in args.candidates.split(",") if int(n) > 1]
+    # Read by app.utils.config, so it must be set before the app is imported
+    os.environ["REVIEW_MAX_ITERATIONS"] = str(args.max_iterations)
+
+    from app.services import agent_graph
+
+    live_llm = agent_graph.get_llm() if args.live else None
+    fakes.install_fakes(args.llm_latency, io_latency=0.0)
+    if args.live:
+        agent_graph.llm = live_llm
+    else:
+        agent_graph.llm = fakes.FakeChatModel(
+            latency=args.llm_latency, approve_threshold=args.approve_threshold, seed=args.seed,
+        )
+
+    report(asyncio.run(_run(args, levels)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Offline end-to-end load and latency benchmark.
+
+Runs the compiled agent graph and the FastAPI app against local stand-ins:
+a fake chat model and image generator with configurable latency, the local
+LinkedIn mock server (benchmarks/linkedin_mock.py) reached through the real
+pooled HTTP clients, and mongomock (or a local mongod via --mongo-uri).
+
+Reports:
+  * per-node latency percentiles;
+  * end-to-end workflow throughput and latency at each concurrency level;
+  * Python heap per in-flight workflow (tracemalloc);
+  * through the API: /agent/start -> job completion throughput and latency,
+    and latency of the read endpoints.
+
+Save a run with --save and gate later runs on it with --compare; the
+process exits with status 1 when any metric regresses by more than
+--max-regression.
+
+Usage (from server/):
+    python -m benchmarks.bench_e2e --concurrency 1,5,10,25 --workflows 50
+    python -m benchmarks.bench_e2e --save baseline.json
+    python -m benchmarks.bench_e2e --compare baseline.json --max-regression 0.2
+
+--mongo-uri writes into the app's databases on that server; only point it
+at a throwaway local mongod.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+from benchmarks import fakes
+
+BENCH_EMAIL = "bench@example.com"
+FINISHED = ("completed", "failed")
+
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * q))]
+
+
+def _latency_summary(samples: List[float]) -> dict:
+    """Percentiles in milliseconds for samples given in seconds."""
+    ms = sorted(s * 1000 for s in samples)
+    if not ms:
+        return {"count": 0}
+    return {
+        "count": len(ms),
+        "p50_ms": round(_percentile(ms, 0.50), 2),
+        "p95_ms": round(_percentile(ms, 0.95), 2),
+        "p99_ms": round(_percentile(ms, 0.99), 2),
+    }
+
+
+class NodeTimer:
+    """Collects wall time per graph node."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap(self, name: str, node):
+        async def timed(state):
+            started = time.perf_counter()
+            try:
+                return await node(state)
+            finally:
+                self.samples[name].append(time.perf_counter() - started)
+        return timed
+
+
+def build_timed_graph(timer: NodeTimer):
+    """Compile the async graph with every node wrapped by timer."""
+    from app.services import agent_graph
+
+    original = dict(agent_graph.ASYNC_NODES)
+    agent_graph.ASYNC_NODES.update({name: timer.wrap(name, node) for name, node in original.items()})
+    try:
+        return agent_graph.build_graph(use_async=True)
+    finally:
+        agent_graph.ASYNC_NODES.update(original)
+
+
+def _items(workflows: int) -> List[Tuple[str, str]]:
+    return [(f"niche-{i % 20}", BENCH_EMAIL) for i in range(workflows)]
+
+
+# ------------------------------------------------------------
+# ⚙️ Graph
+# ------------------------------------------------------------
+
+async def bench_graph(levels: List[int], workflows: int) -> dict:
+    from app.services.batch_runner import run_batch
+
+    timer = NodeTimer()
+    graph = build_timed_graph(timer)
+    throughput = []
+    for concurrency in levels:
+        batch = await run_batch(graph, _items(workflows), concurrency)
+        throughput.append({
+            "concurrency": concurrency,
+            "workflows": batch["total"],
+            "failed": batch["failed"],
+            "workflows_per_second": round(batch["total"] / batch["duration_seconds"], 2),
+            **_latency_summary([r["duration_seconds"] for r in batch["results"]]),
+        })
+    return {
+        "nodes": {name: _latency_summary(samples) for name, samples in timer.samples.items()},
+        "throughput": throughput,
+    }
+
+
+async def bench_memory(in_flight: int) -> dict:
+    from app.services.agent_graph import build_graph
+    from app.services.batch_runner import run_batch
+
+    graph = build_graph()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        await run_batch(graph, _items(in_flight), in_flight)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "in_flight": in_flight,
+        "peak_kib": round((peak - baseline) / 1024, 1),
+        "kib_per_workflow": round((peak - baseline) / 1024 / in_flight, 1),
+    }
+
+
+# ------------------------------------------------------------
+# 🌐 FastAPI app
+# ------------------------------------------------------------
+
+async def _timed_get(client, path: str, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = await client.get(path)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return _latency_summary(samples)
+
+
+async def bench_api(workflows: int, read_runs: int, include_post_history: bool) -> dict:
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            submit, job_ids = [], []
+            for niche, email in _items(workflows):
+                t0 = time.perf_counter()
+                response = await client.post("/agent/start", json={"niche": niche, "email": email})
+                submit.append(time.perf_counter() - t0)
+                response.raise_for_status()
+                job_ids.append(response.json()["job_id"])
+
+            jobs = {}
+            while len(jobs) < len(job_ids):
+                await asyncio.sleep(0.02)
+                for job_id in job_ids:
+                    if job_id not in jobs:
+                        job = (await client.get(f"/agent/jobs/{job_id}")).json()
+                        if job["status"] in FINISHED:
+                            jobs[job_id] = job
+            elapsed = time.perf_counter() - started
+
+            job_latency = [
+                (datetime.fromisoformat(j["finished_at"]) - datetime.fromisoformat(j["created_at"])).total_seconds()
+                for j in jobs.values()
+            ]
+            reads = {
+                "summary": await _timed_get(client, "/agent/summary", read_runs),
+                "post_count": await _timed_get(client, f"/agent/user/post-count/{BENCH_EMAIL}", read_runs),
+            }
+            if include_post_history:
+                reads["user_posts"] = await _timed_get(client, f"/agent/user-posts/{BENCH_EMAIL}", read_runs)
+
+    return {
+        "jobs": {
+            "workflows": len(jobs),
+            "failed": sum(1 for j in jobs.values() if j["status"] == "failed"),
+            "workflows_per_second": round(len(jobs) / elapsed, 2),
+            "submit": _latency_summary(submit),
+            **_latency_summary(job_latency),
+        },
+        "reads": reads,
+    }
+
+
+# ------------------------------------------------------------
+# 📊 Reporting and regression gate
+# ------------------------------------------------------------
+
+def _metrics(results: dict) -> Iterator[Tuple[str, float, bool]]:
+    """Yield (name, value, higher_is_better) for every gated metric."""
+    for name, summary in results["graph"]["nodes"].items():
+        yield f"node {name} p95_ms", summary["p95_ms"], False
+    for level in results["graph"]["throughput"]:
+        prefix = f"graph c={level['concurrency']}"
+        yield f"{prefix} workflows_per_second", level["workflows_per_second"], True
+        yield f"{prefix} p95_ms", level["p95_ms"], False
+    yield "memory kib_per_workflow", results["memory"]["kib_per_workflow"], False
+    if "api" in results:
+        yield "api jobs workflows_per_second", results["api"]["jobs"]["workflows_per_second"], True
+        yield "api jobs p95_ms", results["api"]["jobs"]["p95_ms"], False
+        for name, summary in results["api"]["reads"].items():
+            yield f"api {name} p95_ms", summary["p95_ms"], False
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Describe every metric that is worse than baseline by more than max_regression."""
+    if results["settings"] != baseline.get("settings"):
+        print("⚠️ Settings differ from the baseline; the comparison may not be meaningful.")
+    previous = {name: value for name, value, _ in _metrics(baseline)}
+    regressions = []
+    for name, value, higher_is_better in _metrics(results):
+        base = previous.get(name)
+        if not base:
+            continue
+        change = (base - value) / base if higher_is_better else (value - base) / base
+        if change > max_regression:
+            regressions.append(f"{name}: {base} -> {value} ({change:+.0%} worse)")
+    return regressions
+
+
+def report(results: dict) -> None:
+    print("\nPer-node latency (ms)")
+    for name, s in results["graph"]["nodes"].items():
+        print(f"  {name:<18} n={s['count']:<5} p50 {s['p50_ms']:8.2f}  p95 {s['p95_ms']:8.2f}  p99 {s['p99_ms']:8.2f}")
+
+    print("\nWorkflow throughput")
+    for level in results["graph"]["throughput"]:
+        print(f"  concurrency {level['concurrency']:<4} {level['workflows_per_second']:8.2f} workflows/s  "
+              f"p50 {level['p50_ms']:8.2f}ms  p95 {level['p95_ms']:8.2f}ms  failed {level['failed']}")
+
+    memory = results["memory"]
+    print(f"\nMemory: {memory['kib_per_workflow']} KiB per in-flight workflow "
+          f"({memory['peak_kib']} KiB peak for {memory['in_flight']})")
+
+    if "api" in results:
+        jobs = results["api"]["jobs"]
+        print(f"\nAPI /agent/start -> job finished: {jobs['workflows_per_second']} workflows/s  "
+              f"p50 {jobs['p50_ms']}ms  p95 {jobs['p95_ms']}ms  failed {jobs['failed']}  "
+              f"(submit p95 {jobs['submit']['p95_ms']}ms)")
+        for name, s in results["api"]["reads"].items():
+            print(f"  GET {name:<12} p50 {s['p50_ms']:8.2f}ms  p95 {s['p95_ms']:8.2f}ms")
+
+
+# ------------------------------------------------------------
+# 🚀 Entry point
+# ------------------------------------------------------------
+
+async def _run(args, levels: List[int]) -> dict:
+    from app.services.Linkedin_credentials import set_credentials
+    from app.services.mongodb_service import aensure_indexes, get_or_create_user
+
+    # As in production, indexes exist before the first write
+    await aensure_indexes()
+    get_or_create_user("bench", BENCH_EMAIL)
+    set_credentials("bench-token", "urn:li:person:bench", user=BENCH_EMAIL, expires_in=86400)
+
+    # Warm up imports, connection pools and the credentials cache
+    await bench_graph([1], 1)
+
+    results = {
+        "graph": await bench_graph(levels, args.workflows),
+        "memory": await bench_memory(max(levels)),
+    }
+    if not args.skip_api:
+        results["api"] = await bench_api(args.workflows, args.read_runs, include_post_history=bool(args.mongo_uri))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,5,10,25", help="comma-separated concurrency levels")
+    parser.add_argument("--workflows", type=int, default=50, help="workflows per concurrency level")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--image-latency", type=float, default=0.5)
+    parser.add_argument("--linkedin-latency", type=float, default=0.05)
+    parser.add_argument("--linkedin-throttle-rate", type=float, default=0.0,
+                        help="fraction of LinkedIn calls answered with 429")
+    parser.add_argument("--job-workers", type=int, default=4)
+    parser.add_argument("--image-prompt-source", choices=("topic", "final_post"), default="final_post",
+                        help="topic: image branch runs in parallel with drafting; final_post: after review")
+    parser.add_argument("--read-runs", type=int, default=100)
+    parser.add_argument("--mongo-uri", help="use this (throwaway) MongoDB instead of mongomock")
+    parser.add_argument("--skip-api", action="store_true", help="benchmark the graph only")
+    parser.add_argument("--save", help="write the results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --save")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    # Read by app.utils.config, so they must be set before the app is imported
+    os.environ["JOB_WORKERS"] = str(args.job_workers)
+    os.environ["BATCH_MAX_CONCURRENCY"] = str(max(levels))
+    os.environ["IMAGE_PROMPT_SOURCE"] = args.image_prompt_source
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+
+    from benchmarks.linkedin_mock import point_linkedin_at, serve
+    from benchmarks.mongomock_backend import install_mongomock
+
+    fakes.install_fake_models(args.llm_latency, args.image_latency)
+    if not args.mongo_uri:
+        install_mongomock()
+
+    with serve(args.linkedin_latency, args.linkedin_throttle_rate) as base_url:
+        point_linkedin_at(base_url)
+        results = asyncio.run(_run(args, levels))
+
+    results["settings"] = {
+        key: getattr(args, key) for key in (
+            "concurrency", "workflows", "llm_latency", "image_latency", "linkedin_latency",
+            "linkedin_throttle_rate", "job_workers", "image_prompt_source", "mongo_uri", "skip_api",
+        )
+    }
+    report(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n❌ {len(regressions)} metric(s) regressed by more than {args.max_regression:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.max_regression:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
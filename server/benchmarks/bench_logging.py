@@ -0,0 +1,121 @@
+"""
+Logging cost on the calling thread: synchronous file handler vs the queue.
+
+--threads threads each log --records INFO records carrying a workflow
+context, through either
+
+    file    a FileHandler writing each record before the call returns
+            (the previous logging.basicConfig setup)
+    queue   app.utils.logger's pipeline: the caller enqueues, a background
+            thread formats JSON and writes the rotating file
+
+and reports the per-call latency seen by the callers and the wall time
+until every record is on disk. --fsync makes both flush to disk per
+record, approximating a slow or network-backed log volume.
+
+Usage (from server/):
+    python -m benchmarks.bench_logging --threads 8 --records 20000
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import List
+
+from benchmarks import fakes  # noqa: F401 (populates the environment before app is imported)
+
+
+class FsyncMixin:
+    """Flush every record through to disk."""
+
+    def flush(self) -> None:
+        super().flush()
+        if self.stream:
+            os.fsync(self.stream.fileno())
+
+
+class FsyncFileHandler(FsyncMixin, logging.FileHandler):
+    pass
+
+
+class FsyncRotatingFileHandler(FsyncMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+def _hammer(logger: logging.Logger, records: int, samples: List[float]) -> None:
+    from app.utils.logger import log_context
+
+    with log_context(workflow_id=f"job-{threading.get_ident()}", node="content_creator"):
+        for i in range(records):
+            started = time.perf_counter()
+            logger.info("📝 Draft %d ready (%d chars)", i, 1200)
+            samples.append(time.perf_counter() - started)
+
+
+def _percentiles_us(samples: List[float]) -> dict:
+    us = sorted(s * 1e6 for s in samples)
+    return {f"p{p}": us[min(len(us) - 1, int(p / 100 * len(us)))] for p in (50, 95, 99)}
+
+
+def _run(logger: logging.Logger, args) -> dict:
+    samples: List[float] = []
+    threads = [threading.Thread(target=_hammer, args=(logger, args.records, samples)) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"callers": time.perf_counter() - started, **_percentiles_us(samples)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--records", type=int, default=20000, help="records per thread")
+    parser.add_argument("--fsync", action="store_true", help="fsync the log file after every record")
+    args = parser.parse_args()
+
+    from app.utils.logger import TEXT_FORMAT, ContextQueueHandler, JsonFormatter
+
+    directory = tempfile.mkdtemp(prefix="bench-logging-")
+    results = {}
+
+    file_handler = (FsyncFileHandler if args.fsync else logging.FileHandler)(os.path.join(directory, "file.log"))
+    file_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    logger = logging.getLogger("bench.file")
+    logger.propagate = False
+    logger.addHandler(file_handler)
+    results["file"] = _run(logger, args)
+    results["file"]["written"] = results["file"]["callers"]
+    file_handler.close()
+
+    log_queue: queue.Queue = queue.Queue(args.threads * args.records)
+    writer_class = FsyncRotatingFileHandler if args.fsync else logging.handlers.RotatingFileHandler
+    writer = writer_class(os.path.join(directory, "queue.log"), maxBytes=0)
+    writer.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, writer)
+    listener.start()
+    logger = logging.getLogger("bench.queue")
+    logger.propagate = False
+    handler = ContextQueueHandler(log_queue)
+    logger.addHandler(handler)
+    started = time.perf_counter()
+    results["queue"] = _run(logger, args)
+    listener.stop()
+    results["queue"]["written"] = time.perf_counter() - started
+    writer.close()
+
+    print(f"{args.threads} threads x {args.records} records, fsync={args.fsync}")
+    print(f"\n{'handler':<8} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8} {'callers s':>10} {'written s':>10}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} "
+              f"{r['callers']:>10.2f} {r['written']:>10.2f}")
+    print(f"\ndropped by the queue handler: {handler.dropped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compares a seeded scratch database without and then with the INDEXES from
+mongodb_service. No results from a real MongoDB server are recorded yet.
+
+Measures, in both configurations:
+  * the per-user post listing (find by user_email, newest first), with the
+    winning plan stage and documents examined from explain();
+  * a burst of logins, using the old find_one-then-insert_one lookup versus the
+    single atomic upsert that get_or_create_user now does.
+
+Needs a running MongoDB; the scratch database is dropped afterwards.
+
+Usage (from server/):
+    python -m benchmarks.bench_mongo_indexes --mongo-uri mongodb://localhost:27017 --posts 200000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+import benchmarks.fakes  # noqa: F401  (dummy env vars for app imports)
+
+
+def _seed(db, users: int, posts: int) -> None:
+    db.users.insert_many({"user_id": f"id-{i}", "email": f"user{i}@example.com"} for i in range(users))
+    start = datetime.utcnow() - timedelta(days=365)
+    batch = []
+    for i in range(posts):
+        batch.append({
+            "user_email": f"user{random.randrange(users)}@example.com",
+            "niche": f"niche-{i % 20}",
+            "topic": f"topic {i}",
+            "posted_date": start + timedelta(seconds=random.randrange(365 * 86400)),
+        })
+        if len(batch) == 10_000:
+            db.posts.insert_many(batch)
+            batch = []
+    if batch:
+        db.posts.insert_many(batch)
+
+
+def _percentiles(samples) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    return f"p50 {statistics.median(ms):7.2f}ms  p95 {p95:7.2f}ms"
+
+
+def _time(fn, runs: int):
+    samples = []
+    for i in range(runs):
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _bench_user_posts(db, users: int, runs: int) -> None:
+    def query(i):
+        list(db.posts.find({"user_email": f"user{i % users}@example.com"}).sort("posted_date", -1).limit(10))
+
+    plan = db.posts.find({"user_email": "user0@example.com"}).sort("posted_date", -1).limit(10).explain()
+    stats = plan["executionStats"]
+    stage = plan["queryPlanner"]["winningPlan"]
+    while "inputStage" in stage and stage["stage"] not in ("COLLSCAN", "IXSCAN"):
+        stage = stage["inputStage"]
+    print(f"  user posts     {_percentiles(_time(query, runs))}  "
+          f"[{stage['stage']}, {stats['totalDocsExamined']} docs examined]")
+
+
+def _bench_logins(db, users: int, runs: int) -> None:
+    from app.services.mongodb_service import _user_upsert
+
+    # Half the logins are returning users, half are new
+    def email(i):
+        return f"user{i % users}@example.com" if i % 2 else f"new{i}-{time.perf_counter_ns()}@example.com"
+
+    def find_then_insert(i):
+        address = email(i)
+        if not db.users.find_one({"email": address}):
+            db.users.insert_one({"user_id": f"id-{i}", "email": address})
+
+    def upsert(i):
+        db.users.find_one_and_update(**_user_upsert(f"id-{i}", email(i)))
+
+    print(f"  login (2 trips) {_percentiles(_time(find_then_insert, runs))}")
+    print(f"  login (upsert)  {_percentiles(_time(upsert, runs))}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="linkedin_automation_bench")
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--posts", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    from app.services.mongodb_service import INDEXES
+
+    client = MongoClient(args.mongo_uri)
+    client.drop_database(args.database)
+    db = client[args.database]
+    try:
+        print(f"Seeding {args.users} users and {args.posts} posts into {args.database}...")
+        _seed(db, args.users, args.posts)
+
+        print("Without indexes:")
+        _bench_user_posts(db, args.users, args.runs)
+        _bench_logins(db, args.users, args.runs)
+
+        for name, models in INDEXES.items():
+            db[name].create_indexes(models)
+
+        print("With indexes:")
+        _bench_user_posts(db, args.users, args.runs)
+        _bench_logins(db, args.users, args.runs)
+    finally:
+        client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Shared rate limiting against a provider that answers 429 with Retry-After.
+
+A simulated OpenAI endpoint enforces --rpm requests per minute (a token
+bucket holding one minute's worth, as OpenAI documents its limits) and
+rejects calls over it with a 429 carrying retry-after-ms. --calls requests
+are sent by --concurrency concurrent callers in three modes:
+
+    off    the raw call: a 429 is a failed LLM call
+    retry  limits unset (0): a 429 pauses the caller that got it for its
+           Retry-After; MongoDB is not used
+    limit  OPENAI_REQUESTS_PER_MINUTE = --rpm: callers wait for capacity
+
+All callers share one in-memory MongoDB with a simulated --mongo-latency
+per call, as workers in separate processes would share the database.
+Reports completed and failed calls, 429s the provider returned, and the
+wall time.
+
+Usage (from server/):
+    python -m benchmarks.bench_rate_limiter --rpm 3000 --calls 4000 --concurrency 100
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+import openai
+
+from benchmarks import fakes  # noqa: F401 (populates the environment before app is imported)
+from benchmarks.mongomock_backend import install_mongomock
+
+
+class SimulatedProvider:
+    """Token bucket of rpm requests per minute; over the limit, raise a 429 with Retry-After."""
+
+    def __init__(self, rpm: int, latency: float):
+        self.capacity = rpm
+        self.per_second = rpm / 60
+        self.latency = latency
+        self.tokens = float(rpm)
+        self.updated_at = time.monotonic()
+        self.throttled = 0
+
+    async def call(self) -> str:
+        await asyncio.sleep(self.latency)
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.per_second)
+        self.updated_at = now
+        if self.tokens < 1:
+            self.throttled += 1
+            retry_ms = (1 - self.tokens) / self.per_second * 1000
+            response = httpx.Response(429, headers={"retry-after-ms": f"{retry_ms:.0f}"},
+                                      request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+            raise openai.RateLimitError("Rate limit reached for requests", response=response, body=None)
+        self.tokens -= 1
+        return "ok"
+
+
+async def _run_mode(mode: str, args) -> dict:
+    from app.services import rate_limiter
+    from app.services.rate_limiter import RateLimited, acall_openai
+
+    rate_limiter.OPENAI_REQUESTS_PER_MINUTE = args.rpm if mode == "limit" else 0
+    rate_limiter.OPENAI_TOKENS_PER_MINUTE = 0
+    provider = SimulatedProvider(args.rpm, args.provider_latency)
+    model = f"bench-{mode}"  # fresh buckets per mode
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failed = 0
+
+    async def one() -> None:
+        nonlocal failed
+        async with semaphore:
+            try:
+                if mode == "off":
+                    await provider.call()
+                else:
+                    await acall_openai(model, 1, provider.call)
+            except (openai.RateLimitError, RateLimited):
+                failed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.calls)))
+    return {"completed": args.calls - failed, "failed": failed, "throttled": provider.throttled,
+            "seconds": time.perf_counter() - started}
+
+
+async def _run(args) -> None:
+    print(f"{args.calls} calls, {args.concurrency} concurrent, provider limit {args.rpm} rpm, "
+          f"MongoDB latency {args.mongo_latency * 1000:g} ms")
+    print(f"\n{'mode':<7} {'completed':>10} {'failed':>8} {'429s':>8} {'seconds':>8}")
+    for mode in ("off", "retry", "limit"):
+        result = await _run_mode(mode, args)
+        print(f"{mode:<7} {result['completed']:>10} {result['failed']:>8} {result['throttled']:>8} "
+              f"{result['seconds']:>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpm", type=int, default=3000, help="provider limit, requests per minute")
+    parser.add_argument("--calls", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--provider-latency", type=float, default=0.02, help="seconds per provider call")
+    parser.add_argument("--mongo-latency", type=float, default=0.001, help="seconds per MongoDB call")
+    args = parser.parse_args()
+
+    install_mongomock(args.mongo_latency)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Scheduler claiming: several processes sharing one schedules collection.
+
+Creates --schedules daily schedules that are all due, then lets --schedulers
+Scheduler instances (each with its own lease owner, as separate processes
+would have) drain them concurrently against one in-memory MongoDB with a
+simulated --mongo-latency per call. Jobs
+are submitted to a JobQueue whose workers are not started, so only the
+scheduling path is measured.
+
+Reports the claim throughput, how the runs were spread over the
+schedulers, and checks that every due run started exactly one job. With
+--crash, every scheduler dies after submitting its first run but before
+recording it; the runs are taken over once their leases expire and must
+still map to one job each.
+
+Usage (from server/):
+    python -m benchmarks.bench_scheduler --schedules 500 --schedulers 4 --crash
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from benchmarks import fakes  # noqa: F401 (populates the environment before app is imported)
+from benchmarks.mongomock_backend import install_mongomock
+
+
+def _crash_first_record(module) -> set:
+    """Make each scheduler fail to record its first run, as if it died right after submitting it."""
+    complete, crashed = module.acomplete_schedule_run, set()
+
+    async def complete_or_crash(schedule_id, owner, *args):
+        if owner not in crashed:
+            crashed.add(owner)
+            raise ConnectionError("simulated crash before the run was recorded")
+        return await complete(schedule_id, owner, *args)
+
+    module.acomplete_schedule_run = complete_or_crash
+    return crashed
+
+
+async def _drain(schedulers, now: datetime) -> Counter:
+    claims = await asyncio.gather(*(s.run_due(now) for s in schedulers))
+    return Counter({s.owner: n for s, n in zip(schedulers, claims)})
+
+
+async def _run(args) -> None:
+    from app.models.schedule import Schedule, ScheduleCadence
+    from app.services.job_queue import JobQueue
+    from app.services.mongodb_service import acreate_schedule, aensure_indexes, get_async_jobs_collection
+
+    from app.services import scheduler as module
+
+    await aensure_indexes()
+    now = datetime.now(timezone.utc)
+    for i in range(args.schedules):
+        schedule = Schedule(user_email=f"user-{i}@bench.example.com", niche=f"niche-{i % 20}",
+                            cadence=ScheduleCadence.DAILY, time_of_day="09:00")
+        schedule.next_run_at = now - timedelta(seconds=i % 60)
+        await acreate_schedule(schedule)
+
+    queue = JobQueue(graph=object())
+    schedulers = [module.Scheduler(queue, lease_seconds=args.lease_seconds) for _ in range(args.schedulers)]
+    crashed = _crash_first_record(module) if args.crash else set()
+
+    started = time.perf_counter()
+    per_owner = await _drain(schedulers, now)
+    elapsed = time.perf_counter() - started
+    taken_over = Counter()
+    if args.crash:
+        # The crashed runs stay leased until the lease expires, then anyone may take them over
+        taken_over = await _drain(schedulers, now + timedelta(seconds=args.lease_seconds + 1))
+
+    jobs = [doc async for doc in get_async_jobs_collection().find({}, {"idempotency_key": 1})]
+    runs = Counter(doc["idempotency_key"] for doc in jobs)
+    duplicates = sum(n - 1 for n in runs.values() if n > 1)
+
+    print(f"{args.schedules} due schedules, {args.schedulers} schedulers, "
+          f"MongoDB latency {args.mongo_latency * 1000:g} ms, crash={args.crash}")
+    print(f"  claimed in {elapsed * 1000:.1f} ms ({args.schedules / elapsed:.0f} schedules/s)")
+    print(f"  claims per scheduler: {sorted(per_owner.values(), reverse=True)}")
+    if args.crash:
+        print(f"  crashed runs: {len(crashed)}, taken over after lease expiry: {sum(taken_over.values())}")
+    print(f"  jobs started: {len(jobs)}  distinct runs: {len(runs)}  duplicate jobs: {duplicates}")
+    print("  OK" if len(runs) == args.schedules and not duplicates else "  MISMATCH")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schedules", type=int, default=500)
+    parser.add_argument("--schedulers", type=int, default=4)
+    parser.add_argument("--lease-seconds", type=int, default=120)
+    parser.add_argument("--mongo-latency", type=float, default=0.002, help="seconds per MongoDB call")
+    parser.add_argument("--crash", action="store_true", help="each scheduler dies after its first submit")
+    args = parser.parse_args()
+
+    install_mongomock(args.mongo_latency)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
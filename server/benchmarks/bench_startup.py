@@ -0,0 +1,103 @@
+"""
+Cold start: importing the app, starting it, and serving its first requests.
+
+Every run is a fresh interpreter, as a newly scaled-out instance would be,
+and measures in order:
+
+    import          `import app.main`
+    startup         the FastAPI lifespan (indexes, job queue, scheduler)
+    llm client      creating the OpenAI chat model on first use
+    first request   GET /agent/stream, the first workflow run in the process
+    second request  the same request again, warm
+
+Workflows run on the fake LLM, LinkedIn and in-memory MongoDB of
+benchmarks.fakes with no simulated latency, so the requests measure only
+the app's own work, including anything deferred to first use.
+
+Usage (from server/):
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ("import", "startup", "llm client", "first request", "second request")
+
+
+async def _serve(app, timings: dict) -> None:
+    import httpx
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup"] = time.perf_counter() - started
+
+        from app.services import agent_graph
+        from benchmarks import fakes
+
+        agent_graph.llm = None
+        started = time.perf_counter()
+        agent_graph.get_llm()
+        timings["llm client"] = time.perf_counter() - started
+        fakes.install_fake_models(llm_latency=0.0)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for phase in ("first request", "second request"):
+                started = time.perf_counter()
+                response = await client.get("/agent/stream",
+                                            params={"niche": "AI", "email": "startup@bench.example.com"})
+                timings[phase] = time.perf_counter() - started
+                if "event: done" not in response.text:
+                    raise RuntimeError(f"workflow did not finish: {response.text[-300:]}")
+
+
+def _child() -> None:
+    """One cold start; prints its timings as JSON."""
+    timings = {}
+    started = time.perf_counter()
+    import app.main
+    timings["import"] = time.perf_counter() - started
+
+    from benchmarks import fakes
+
+    fakes.install_fakes(llm_latency=0.0, io_latency=0.0)
+    asyncio.run(_serve(app.main.app, timings))
+    print(json.dumps(timings))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="cold starts to measure")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child()
+        return
+
+    # The child reads the fake environment, but must not import fakes (and
+    # the libraries it loads) before timing the app's import
+    from benchmarks import fakes  # noqa: F401 (populates the environment)
+
+    env = {**os.environ, "SCHEDULER_POLL_SECONDS": "0"}
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child"], env=env,
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{args.runs} cold starts")
+    print(f"\n{'phase':<16} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for phase in PHASES:
+        samples = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<16} {statistics.median(samples):>10.1f} {min(samples):>8.1f} {max(samples):>8.1f}")
+    total = [sum(run[phase] for phase in PHASES[:4]) * 1000 for run in runs]
+    print(f"{'to first reply':<16} {statistics.median(total):>10.1f} {min(total):>8.1f} {max(total):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Near-duplicate topic check: MinHash LSH index vs a linear scan.
+
+Builds one (user, niche) index of --topics posted topics and times the
+check topic_generator runs on every generated topic, for fresh topics and
+for reworded repeats of posted ones. The linear scan computes the exact
+Jaccard similarity against every posted topic; it is the ground truth the
+index's recall is measured against.
+
+Usage (from server/):
+    python -m benchmarks.bench_topic_index --topics 2000 --queries 2000
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from benchmarks.fakes import TOPIC_WORDS
+from benchmarks.bench_e2e import _latency_summary
+
+FILLER = "how why what the a to for your in with and of".split()
+
+
+def _topic(rng: random.Random) -> str:
+    words = rng.sample(TOPIC_WORDS, 5) + rng.sample(FILLER, 3)
+    rng.shuffle(words)
+    return " ".join(words).capitalize()
+
+
+def _reworded(rng: random.Random, topic: str) -> str:
+    """A repeat of topic with one word replaced, as an LLM might rephrase it."""
+    words = topic.split()
+    words[rng.randrange(len(words))] = rng.choice(FILLER)
+    return " ".join(words)
+
+
+def _timed(check: Callable[[str], List], queries: List[str]) -> tuple:
+    seconds, found = [], []
+    for query in queries:
+        started = time.perf_counter()
+        found.append(bool(check(query)))
+        seconds.append(time.perf_counter() - started)
+    return _latency_summary(seconds), found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=2000, help="posted topics in the index")
+    parser.add_argument("--queries", type=int, default=2000, help="checks per query kind")
+    parser.add_argument("--threshold", type=float, default=None, help="default: TOPIC_SIMILARITY_THRESHOLD")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    from app.services.topic_index import TopicIndex, jaccard, shingles
+    from app.utils.config import TOPIC_SIMILARITY_THRESHOLD
+
+    threshold = TOPIC_SIMILARITY_THRESHOLD if args.threshold is None else args.threshold
+    rng = random.Random(args.seed)
+    posted = [_topic(rng) for _ in range(args.topics)]
+
+    started = time.perf_counter()
+    index = TopicIndex(posted)
+    build_ms = (time.perf_counter() - started) * 1000
+    posted_shingles = [shingles(topic) for topic in posted]
+
+    def linear_scan(topic: str) -> List[str]:
+        query = shingles(topic)
+        return [p for p, s in zip(posted, posted_shingles) if jaccard(query, s) >= threshold]
+
+    kinds = {
+        "fresh": [_topic(rng) for _ in range(args.queries)],
+        "reworded": [_reworded(rng, rng.choice(posted)) for _ in range(args.queries)],
+    }
+    print(f"{args.topics} posted topics, threshold {threshold}, index built in {build_ms:.1f} ms")
+    print(f"\n{'queries':<10} {'method':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'flagged':>8} {'recall':>7}")
+    for kind, queries in kinds.items():
+        scan_latency, expected = _timed(linear_scan, queries)
+        index_latency, found = _timed(lambda topic: index.similar(topic, threshold), queries)
+        duplicates = sum(expected)
+        recall = sum(f and e for f, e in zip(found, expected)) / duplicates if duplicates else 1.0
+        for method, latency, flagged, shown in (("linear scan", scan_latency, expected, "-"),
+                                                ("lsh index", index_latency, found, f"{recall:.3f}")):
+            print(f"{kind:<10} {method:<12} {latency['p50_ms']:>8} {latency['p95_ms']:>8} "
+                  f"{latency['p99_ms']:>8} {sum(flagged):>8} {shown:>7}")
+    print("\nflagged: queries with a posted topic at or above the threshold; recall vs the linear scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Local stand-ins for the external services used by the agent graph.
+
+Benchmarks import this module *before* anything under ``app`` so that the
+required environment variables are populated with dummy values.
+"""
+import asyncio
+import os
+import random
+import re
+import time
+from typing import Any, List, Optional
+
+for _var, _value in {
+    "OPENAI_API_KEY": "sk-benchmark",
+    "LINKEDIN_ACCESS_TOKEN": "benchmark-token",
+    "LINKEDIN_PERSON_URN": "urn:li:person:benchmark",
+    "POST_NICHE": "AI",
+    "GEMINI_API_KEY": "benchmark",
+    "MONGO_URI": "mongodb://localhost:27017",
+    "DB_NAME": "linkedin_automation_bench",
+    # Identical fake prompts would otherwise be answered from the cache
+    "LLM_CACHE_BACKEND": "none",
+    # Keep the budget bookkeeping in the measured path without ever rejecting a run
+    "USER_DAILY_TOKEN_BUDGET": "1000000000",
+}.items():
+    os.environ.setdefault(_var, _value)
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+_QUALITY = re.compile(r"\[quality (\d\.\d+)\]")
+# Fake topics are drawn from these, so topics of one user rarely look like repeats
+TOPIC_WORDS = (
+    "hiring remote teams leadership burnout pricing onboarding churn roadmap security compliance "
+    "automation agents retrieval evaluation latency costs observability mentoring feedback culture "
+    "negotiation fundraising partnerships branding storytelling analytics experiments retention "
+    "interviews promotions meetings documentation migrations outages incidents budgets forecasting"
+).split()
+
+
+def draft_quality(text: Optional[str]) -> Optional[float]:
+    """Simulated quality (0-1) FakeChatModel attached to a draft, if any."""
+    match = _QUALITY.search(text or "")
+    return float(match.group(1)) if match else None
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers instantly after a fixed, simulated latency.
+
+    Every draft carries a random simulated quality. The serial reviewer
+    approves drafts scoring at least approve_threshold (0 approves all), and
+    the draft selector picks the best candidate, so the drafting modes can be
+    compared on quality as well as latency. Honours OpenAI's n parameter.
+    """
+
+    latency: float = 0.2
+    reply: str = "A concise LinkedIn post about the topic. #AI #Automation"
+    approve_threshold: float = 0.0
+    seed: Optional[int] = None
+    _rng: random.Random = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        system = str(messages[0].content).lower() if messages else ""
+        prompt = str(messages[-1].content) if messages else ""
+        if "content strategist" in system:
+            return " ".join(self._rng.sample(TOPIC_WORDS, 5)).capitalize()
+        if "numbered drafts" in system:
+            scores = [draft_quality(draft) or 0.0 for draft in prompt.split("Draft ")[1:]]
+            return str(scores.index(max(scores)) + 1) if scores else "1"
+        if "reviewer" in system:
+            quality = draft_quality(prompt)
+            if quality is None or quality >= self.approve_threshold:
+                return "APPROVED"
+            return "Sharpen the opening hook and end with a clear call to action."
+        # Distinct drafts, so the publication ledger never dedupes two workflows
+        return f"{self.reply} (draft {self._rng.getrandbits(48):012x}) [quality {self._rng.random():.2f}]"
+
+    def _answer(self, messages: List[BaseMessage], n: int = 1) -> ChatResult:
+        texts = [self._reply(messages) for _ in range(n)]
+        # Shaped like ChatOpenAI's output so token metrics and budgets have something to count;
+        # with n > 1 the prompt is billed once for all choices
+        prompt_tokens = sum(len(str(m.content).split()) for m in messages)
+        completion_tokens = sum(len(text.split()) for text in texts)
+        usage = {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage)) for text in texts],
+            llm_output={"token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                        "total_tokens": prompt_tokens + completion_tokens}},
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return self._answer(messages, kwargs.get("n", 1))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._answer(messages, kwargs.get("n", 1))
+
+
+class FakeTool:
+    """Minimal object exposing the ``.invoke`` surface of a LangChain tool."""
+
+    def __init__(self, result: Any, latency: float = 0.0):
+        self.result = result
+        self.latency = latency
+
+    def invoke(self, *args: Any, **kwargs: Any) -> Any:
+        time.sleep(self.latency)
+        return self.result
+
+
+def fake_sync(result: Any, latency: float):
+    def _call(*args: Any, **kwargs: Any) -> Any:
+        time.sleep(latency)
+        return result
+    return _call
+
+
+def fake_async(result: Any, latency: float):
+    async def _call(*args: Any, **kwargs: Any) -> Any:
+        await asyncio.sleep(latency)
+        return result
+    return _call
+
+
+def install_fake_models(llm_latency: float = 0.2, image_latency: float = 0.0) -> None:
+    """Swap the OpenAI chat model and the Gemini image generator used by agent_graph for fakes."""
+    from app.services import agent_graph
+
+    agent_graph.llm = FakeChatModel(latency=llm_latency)
+    agent_graph.generate_gemini_image = FakeTool(b"\x89PNG fake image bytes", image_latency)
+
+
+def install_fakes(llm_latency: float = 0.2, io_latency: float = 0.05) -> None:
+    """Swap the LLM, LinkedIn, Gemini and MongoDB calls used by agent_graph for fakes."""
+    from app.services import agent_graph
+    from app.utils.constants import LINKEDIN_POST_SUCCESS
+    from benchmarks.mongomock_backend import install_mongomock
+
+    # Token budget bookkeeping still reaches MongoDB
+    install_mongomock()
+
+    asset_urn = "urn:li:asset:benchmark"
+    install_fake_models(llm_latency)
+
+    published = (LINKEDIN_POST_SUCCESS, "urn:li:share:benchmark")
+
+    # The publication ledger runs on mongomock
+    agent_graph.upload_media_to_linkedin = fake_sync(asset_urn, io_latency)
+    agent_graph.publish_to_linkedin = fake_sync(published, io_latency)
+    agent_graph.record_workflow_outcome = fake_sync(None, io_latency)
+
+    agent_graph.aupload_media_to_linkedin = fake_async(asset_urn, io_latency)
+    agent_graph.apublish_to_linkedin = fake_async(published, io_latency)
+    agent_graph.arecord_workflow_outcome = fake_async(None, io_latency)
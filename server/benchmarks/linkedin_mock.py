@@ -0,0 +1,115 @@
+"""
+Local stand-in for the LinkedIn REST endpoints the app calls.
+
+The server runs in a background thread on a free localhost port, so requests
+go through the real pooled HTTP clients (connection reuse, retries, stats)
+exactly as they would against api.linkedin.com.
+"""
+import asyncio
+import hashlib
+import itertools
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+
+def create_mock_app(latency: float = 0.05, throttle_rate: float = 0.0) -> FastAPI:
+    """
+    Args:
+        latency (float): Seconds every endpoint waits before answering.
+        throttle_rate (float): Fraction of calls answered with 429 and
+            Retry-After: 0, to exercise the client's retry path. Throttling
+            is deterministic: calls are throttled evenly spaced, and never
+            the same request twice, so every retry gets through.
+    """
+    mock = FastAPI()
+    ids = itertools.count(1)
+    throttle_due = 0.0
+    throttled = set()
+
+    async def _respond(request: Request) -> bool:
+        nonlocal throttle_due
+        body = await request.body()
+        await asyncio.sleep(latency)
+        throttle_due += throttle_rate
+        if throttle_due < 1:
+            return True
+        key = (request.method, request.url.path, hashlib.sha256(body).hexdigest())
+        if key in throttled:
+            return True
+        throttle_due -= 1
+        throttled.add(key)
+        return False
+
+    def _throttled() -> Response:
+        return Response(status_code=429, headers={"Retry-After": "0"})
+
+    @mock.post("/v2/assets")
+    async def register_upload(request: Request):
+        if not await _respond(request):
+            return _throttled()
+        asset_id = next(ids)
+        return {"value": {
+            "asset": f"urn:li:digitalmediaAsset:bench-{asset_id}",
+            "uploadMechanism": {"com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest": {
+                "uploadUrl": f"{request.base_url}upload/{asset_id}",
+            }},
+        }}
+
+    @mock.post("/upload/{asset_id}")
+    async def upload(asset_id: str, request: Request):
+        if not await _respond(request):
+            return _throttled()
+        return Response(status_code=201)
+
+    @mock.post("/v2/ugcPosts")
+    async def ugc_posts(request: Request):
+        if not await _respond(request):
+            return _throttled()
+        post_id = f"urn:li:share:{next(ids)}"
+        return Response(status_code=201, headers={"x-restli-id": post_id}, content=f'{{"id": "{post_id}"}}',
+                        media_type="application/json")
+
+    @mock.get("/v2/userinfo")
+    async def userinfo(request: Request):
+        if not await _respond(request):
+            return _throttled()
+        return {"sub": "bench", "email": "bench@example.com", "name": "Benchmark User"}
+
+    return mock
+
+
+@contextmanager
+def serve(latency: float = 0.05, throttle_rate: float = 0.0) -> Iterator[str]:
+    """Run the mock server for the duration of the block; yields its base URL."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    host, port = sock.getsockname()
+
+    config = uvicorn.Config(create_mock_app(latency, throttle_rate), log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+        sock.close()
+
+
+def point_linkedin_at(base_url: str) -> None:
+    """Send the app's LinkedIn API calls to base_url instead of api.linkedin.com."""
+    from app.routes import authRoute
+    from app.services import linkedin_service
+
+    linkedin_service.REGISTER_UPLOAD_URL = f"{base_url}/v2/assets?action=registerUpload"
+    linkedin_service.LINKEDIN_POST_API_URL = f"{base_url}/v2/ugcPosts"
+    authRoute.USERINFO_URL = f"{base_url}/v2/userinfo"
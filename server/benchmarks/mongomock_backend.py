@@ -0,0 +1,130 @@
+"""
+In-memory MongoDB for benchmarks, backed by mongomock.
+
+mongomock only has a synchronous API, so the async data layer gets a thin
+adapter exposing the AsyncMongoClient surface that mongodb_service uses
+(awaitable collection methods, async cursors, awaitable aggregate). Both
+clients share one in-memory store.
+
+mongomock's own bulk_write rejects the operation objects of current pymongo,
+so both clients get a replacement covering the UpdateOne batches issued by
+mongodb_service and the LangGraph checkpointer. Its create_indexes drops
+partialFilterExpression, so it is routed through create_index, which keeps it.
+
+The async adapter can add a simulated round-trip latency to every call;
+any latency, even 0, yields to the event loop the way a real client does.
+"""
+import asyncio
+from typing import Any, List, Optional
+
+import mongomock
+from pymongo import UpdateOne
+
+
+def _bulk_write(collection, requests: List[Any], ordered: bool = True, **kwargs: Any) -> None:
+    for request in requests:
+        if not isinstance(request, UpdateOne):
+            raise NotImplementedError(f"bulk_write does not support {type(request).__name__}")
+        collection.update_one(request._filter, request._doc, upsert=request._upsert)
+
+
+def _create_indexes(collection, indexes: List[Any], **kwargs: Any) -> List[str]:
+    names = []
+    for index in indexes:
+        options = dict(index.document)
+        names.append(collection.create_index(list(options.pop("key").items()), **options))
+    return names
+
+
+class _AsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args: Any, **kwargs: Any) -> "_AsyncCursor":
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, limit: int) -> "_AsyncCursor":
+        self._cursor = self._cursor.limit(limit)
+        return self
+
+    def skip(self, skip: int) -> "_AsyncCursor":
+        self._cursor = self._cursor.skip(skip)
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        docs = list(self._cursor)
+        return docs[:length] if length else docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._cursor:
+            yield doc
+
+
+class _AsyncCollection:
+    def __init__(self, collection, latency: Optional[float] = None):
+        self._collection = collection
+        self._latency = latency
+
+    def find(self, *args: Any, **kwargs: Any) -> _AsyncCursor:
+        return _AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, *args: Any, **kwargs: Any) -> _AsyncCursor:
+        return _AsyncCursor(self._collection.aggregate(*args, **kwargs))
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True, **kwargs: Any) -> None:
+        _bulk_write(self._collection, requests, ordered)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._collection, name)
+        if not callable(attr):
+            return attr
+
+        async def _call(*args: Any, **kwargs: Any) -> Any:
+            if self._latency is not None:
+                await asyncio.sleep(self._latency)
+            return attr(*args, **kwargs)
+        return _call
+
+
+class _AsyncDatabase:
+    def __init__(self, database, latency: Optional[float] = None):
+        self._database = database
+        self._latency = latency
+
+    def __getitem__(self, name: str) -> _AsyncCollection:
+        return _AsyncCollection(self._database[name], self._latency)
+
+
+class AsyncMongomockClient:
+    def __init__(self, client: mongomock.MongoClient, latency: Optional[float] = None):
+        self._client = client
+        self._latency = latency
+
+    def __getitem__(self, name: str) -> _AsyncDatabase:
+        return _AsyncDatabase(self._client[name], self._latency)
+
+    async def close(self) -> None:
+        pass
+
+
+def install_mongomock(latency: Optional[float] = None) -> mongomock.MongoClient:
+    """
+    Point mongodb_service's sync and async clients at one in-memory store.
+
+    Args:
+        latency (float | None): Seconds each async call waits before running;
+            None runs calls without yielding to the event loop.
+    """
+    from app.services import mongodb_service
+
+    mongomock.Collection.bulk_write = _bulk_write
+    mongomock.Collection.create_indexes = _create_indexes
+    client = mongomock.MongoClient()
+    async_client = AsyncMongomockClient(client, latency)
+    mongodb_service.get_client = lambda: client
+    mongodb_service.get_async_client = lambda: async_client
+    return client
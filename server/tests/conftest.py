@@ -0,0 +1,76 @@
+"""
+Shared fixtures: every test runs against a fresh in-memory MongoDB
+(benchmarks.mongomock_backend) with the process-wide caches emptied, and
+the fake chat model and image generator from benchmarks.fakes.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="postsync-test-logs-"))
+os.environ.setdefault("SCHEDULER_POLL_SECONDS", "0")
+
+from benchmarks import fakes  # noqa: E402 (populates the environment before app is imported)
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def mongo():
+    """A fresh in-memory store behind mongodb_service's sync and async clients."""
+    from app.services import agent_graph, llm_cache, mongodb_service, topic_index
+    from app.services import Linkedin_credentials
+    from app.routes import authRoute
+    from benchmarks.mongomock_backend import install_mongomock
+
+    client = install_mongomock()
+    mongodb_service._checkpointer = None
+    mongodb_service._user_cache.clear()
+    Linkedin_credentials._cache.clear()
+    authRoute._userinfo_cache.clear()
+    topic_index._indexes.clear()
+    llm_cache._cache = None
+    agent_graph._graph = None
+    yield client
+
+
+@pytest.fixture
+def millisecond_free_projection(monkeypatch):
+    """Post history dated to the second: mongomock's $dateToString has no %L."""
+    from app.services import mongodb_service
+
+    projection = {**mongodb_service._POST_HISTORY_PROJECTION,
+                  "posted_date": {"$dateToString": {"date": "$posted_date", "format": "%Y-%m-%dT%H:%M:%S.000Z"}}}
+    monkeypatch.setattr(mongodb_service, "_POST_HISTORY_PROJECTION", projection)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """The fake chat model, answering without latency; returns it."""
+    from app.services import agent_graph
+
+    model = fakes.FakeChatModel(latency=0.0, seed=7)
+    monkeypatch.setattr(agent_graph, "llm", model)
+    monkeypatch.setattr(agent_graph, "generate_gemini_image", fakes.FakeTool(b"\x89PNG fake image bytes"))
+    return model
+
+
+@pytest.fixture
+def fake_linkedin(monkeypatch):
+    """Successful fake LinkedIn uploads and posts; returns the texts published."""
+    from app.services import agent_graph
+    from app.utils.constants import LINKEDIN_POST_SUCCESS
+
+    published = []
+
+    def publish(text, image_asset_urn=None, user_email=None):
+        published.append(text)
+        return LINKEDIN_POST_SUCCESS, f"urn:li:share:{len(published)}"
+
+    async def apublish(text, image_asset_urn=None, user_email=None):
+        return publish(text, image_asset_urn, user_email)
+
+    monkeypatch.setattr(agent_graph, "upload_media_to_linkedin", fakes.fake_sync("urn:li:asset:test", 0.0))
+    monkeypatch.setattr(agent_graph, "aupload_media_to_linkedin", fakes.fake_async("urn:li:asset:test", 0.0))
+    monkeypatch.setattr(agent_graph, "publish_to_linkedin", publish)
+    monkeypatch.setattr(agent_graph, "apublish_to_linkedin", apublish)
+    return published
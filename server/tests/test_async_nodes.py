@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from app.models.agent import AgentState
+from app.services import agent_graph
+from app.services.agent_graph import build_graph
+from benchmarks.fakes import FakeChatModel
+
+LLM_LATENCY = 0.1
+
+
+def test_concurrent_workflows_share_one_event_loop(fake_llm, fake_linkedin, monkeypatch):
+    monkeypatch.setattr(agent_graph, "llm", FakeChatModel(latency=LLM_LATENCY, seed=7))
+    graph = build_graph()
+    gaps = []
+
+    async def ticker(done: asyncio.Event):
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    async def scenario():
+        # Loads the tokenizer and other first-use state outside the measurement
+        await graph.ainvoke(AgentState(niche="AI", user_email="warmup@example.com"))
+        done = asyncio.Event()
+        ticks = asyncio.create_task(ticker(done))
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            graph.ainvoke(AgentState(niche="AI", user_email=f"user{i}@example.com")) for i in range(8)
+        ))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await ticks
+        return elapsed
+
+    elapsed = asyncio.run(scenario())
+    # Each workflow makes three sequential LLM calls; run one after another they would take 8x as long
+    assert elapsed < 8 * 3 * LLM_LATENCY / 2
+    # No node held the loop for as long as an LLM call
+    assert max(gaps) < LLM_LATENCY
+    assert len(fake_linkedin) == 9
+
+
+def test_sync_and_async_nodes_cover_the_same_graph():
+    assert agent_graph.SYNC_NODES.keys() == agent_graph.ASYNC_NODES.keys()
+    assert all(asyncio.iscoroutinefunction(node) for node in agent_graph.ASYNC_NODES.values())
@@ -0,0 +1,54 @@
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import authRoute
+from app.services.mongodb_service import record_workflow_outcome
+
+USERINFO = {"sub": "member-1", "email": "me@example.com", "name": "Test Member"}
+
+
+class StubLinkedInHTTP:
+    """Answers /userinfo, counting the calls."""
+
+    def __init__(self, status: int = 200):
+        self.status = status
+        self.calls = 0
+
+    def request(self, endpoint, method, url, **kwargs):
+        self.calls += 1
+        return httpx.Response(self.status, json=USERINFO)
+
+
+def _me(token: str = "token-1"):
+    return TestClient(app).get("/auth/linkedin/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_userinfo_is_cached_per_token(monkeypatch):
+    linkedin = StubLinkedInHTTP()
+    monkeypatch.setattr(authRoute, "get_linkedin_http", lambda: linkedin)
+
+    first, second, other = _me(), _me(), _me("token-2")
+
+    assert first.json()["is_new_user"] is True
+    assert second.json()["is_new_user"] is False
+    assert other.status_code == 200
+    assert linkedin.calls == 2  # token-1 once, token-2 once
+
+
+def test_cached_post_count_is_refreshed_after_a_publish(monkeypatch):
+    monkeypatch.setattr(authRoute, "get_linkedin_http", lambda: StubLinkedInHTTP())
+    assert _me().json()["total_posts"] == 0
+
+    record_workflow_outcome("me@example.com", "AI", succeeded=True)
+
+    assert _me().json()["total_posts"] == 1
+
+
+def test_rejected_token_is_not_cached(monkeypatch):
+    linkedin = StubLinkedInHTTP(status=401)
+    monkeypatch.setattr(authRoute, "get_linkedin_http", lambda: linkedin)
+
+    assert _me().status_code == 401
+    assert _me().status_code == 401
+    assert linkedin.calls == 2
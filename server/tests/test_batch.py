@@ -0,0 +1,52 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import route
+from app.utils.config import BATCH_MAX_ITEMS
+
+
+class CountingGraph:
+    """Publishes every workflow after a short delay, tracking how many run at once."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def ainvoke(self, state, config=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return {"topic": state.niche, "messages": [{"role": "system", "content": "post_success"}]}
+
+
+def _items(n: int) -> list:
+    return [{"niche": f"niche {i}", "email": f"user{i}@example.com"} for i in range(n)]
+
+
+def test_batch_runs_items_concurrently_up_to_the_cap(monkeypatch):
+    graph = CountingGraph()
+    monkeypatch.setattr(route, "get_graph", lambda: graph)
+
+    response = TestClient(app).post("/agent/batch", json={"items": _items(6), "max_concurrency": 2})
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["succeeded"], body["failed"]) == (6, 0)
+    assert [item["niche"] for item in body["results"]] == [f"niche {i}" for i in range(6)]
+    assert graph.peak == 2
+
+
+def test_batch_publishes_every_item(fake_llm, fake_linkedin):
+    response = TestClient(app).post("/agent/batch", json={"items": _items(3)})
+
+    assert response.json()["succeeded"] == 3
+    assert len(fake_linkedin) == 3
+
+
+def test_oversized_batch_is_rejected():
+    response = TestClient(app).post("/agent/batch", json={"items": _items(BATCH_MAX_ITEMS + 1)})
+
+    assert response.status_code == 422
@@ -0,0 +1,66 @@
+import asyncio
+
+from app.models.agent import AgentState
+from app.routes import authRoute
+from app.services import linkedin_client, linkedin_service
+from app.services.agent_graph import build_graph
+from app.services.linkedin_client import get_linkedin_http_stats
+from app.services.Linkedin_credentials import set_credentials
+from app.services.mongodb_service import get_collection
+from benchmarks import linkedin_mock
+from benchmarks.bench_e2e import compare
+
+EMAIL = "harness@example.com"
+
+
+def test_workflows_publish_through_the_linkedin_mock(fake_llm, monkeypatch):
+    for module, name in ((linkedin_service, "REGISTER_UPLOAD_URL"), (linkedin_service, "LINKEDIN_POST_API_URL"),
+                         (authRoute, "USERINFO_URL")):
+        monkeypatch.setattr(module, name, getattr(module, name))  # restored after the test
+    monkeypatch.setattr(linkedin_client, "_async_http", None)
+    set_credentials("harness-token", "urn:li:person:harness", user=EMAIL)
+    graph = build_graph()
+
+    async def workflows():
+        try:
+            return await asyncio.gather(*(graph.ainvoke(AgentState(niche=f"niche {i}", user_email=EMAIL))
+                                          for i in range(4)))
+        finally:
+            await linkedin_client.aclose_linkedin_http()
+
+    retries_before = _retries()
+    # Every third call or so is throttled once, exercising the client's retries
+    with linkedin_mock.serve(latency=0.0, throttle_rate=0.3) as base_url:
+        linkedin_mock.point_linkedin_at(base_url)
+        finals = asyncio.run(workflows())
+
+    assert all(final["image_asset_urn"].startswith("urn:li:digitalmediaAsset:bench-") for final in finals)
+    posts = list(get_collection().find({"user_email": EMAIL, "status": "published"}))
+    assert len(posts) == 4
+    assert all(post["linkedin_post_id"].startswith("urn:li:share:") for post in posts)
+    assert _retries() > retries_before
+
+
+def _retries() -> int:
+    return sum(stats["retries"] for stats in get_linkedin_http_stats().values())
+
+
+def _results(p95_ms: float, workflows_per_second: float) -> dict:
+    return {
+        "settings": {"workflows": 10},
+        "graph": {
+            "nodes": {"reviewer": {"p95_ms": p95_ms}},
+            "throughput": [{"concurrency": 4, "workflows_per_second": workflows_per_second, "p95_ms": p95_ms}],
+        },
+        "memory": {"kib_per_workflow": 100},
+    }
+
+
+def test_regression_gate_flags_only_changes_past_the_threshold():
+    baseline = _results(p95_ms=100, workflows_per_second=10)
+
+    assert compare(_results(p95_ms=110, workflows_per_second=9), baseline, 0.2) == []
+    regressions = compare(_results(p95_ms=150, workflows_per_second=5), baseline, 0.2)
+    assert [line.split(":")[0] for line in regressions] == [
+        "node reviewer p95_ms", "graph c=4 workflows_per_second", "graph c=4 p95_ms",
+    ]
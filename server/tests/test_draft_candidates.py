@@ -0,0 +1,34 @@
+import asyncio
+
+from app.models.agent import AgentState
+from app.services import agent_graph
+from app.services.agent_graph import build_graph
+from benchmarks.fakes import FakeChatModel, draft_quality
+
+
+def test_best_of_several_candidates_is_published(fake_llm, fake_linkedin, monkeypatch):
+    monkeypatch.setattr(agent_graph, "DRAFT_CANDIDATES", 3)
+    requests = []
+    generate = FakeChatModel._agenerate
+
+    async def counted(self, messages, *args, **kwargs):
+        requests.append(kwargs.get("n", 1))
+        return await generate(self, messages, *args, **kwargs)
+
+    monkeypatch.setattr(FakeChatModel, "_agenerate", counted)
+
+    final = asyncio.run(build_graph().ainvoke(AgentState(niche="AI", user_email="drafts@example.com")))
+
+    candidates = final["draft_candidates"]
+    assert len(candidates) == 3
+    assert fake_linkedin == [max(candidates, key=draft_quality)]
+    # Topic, one request for all three candidates, and the selection; no critique loop
+    assert requests == [1, 3, 1]
+
+
+def test_unusable_selection_keeps_the_first_candidate():
+    state = AgentState(niche="AI", draft_candidates=["first", "second"])
+
+    assert agent_graph._selection_outcome(state, "none of them")["final_post"] == "first"
+    assert agent_graph._selection_outcome(state, "Draft 7")["final_post"] == "first"
+    assert agent_graph._selection_outcome(state, "2")["final_post"] == "second"
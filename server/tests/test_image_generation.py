@@ -0,0 +1,48 @@
+import asyncio
+
+from app.models.agent import AgentState
+from app.services import agent_graph
+from benchmarks.fakes import FakeTool
+
+
+class RecordingImageTool(FakeTool):
+    def __init__(self):
+        super().__init__(b"\x89PNG fake image bytes")
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return super().invoke(prompt)
+
+
+def _run(monkeypatch, graph):
+    image_tool = RecordingImageTool()
+    monkeypatch.setattr(agent_graph, "generate_gemini_image", image_tool)
+
+    async def run():
+        order, final = [], {}
+        async for chunk in graph.astream(AgentState(niche="AI", user_email="image@example.com")):
+            for node, update in chunk.items():
+                order.append(node)
+                final.update(update or {})
+        return order, final
+
+    order, final = asyncio.run(run())
+    return image_tool.prompts, order, final
+
+
+def test_default_renders_the_image_from_the_approved_post_after_review(fake_llm, fake_linkedin, monkeypatch):
+    prompts, order, final = _run(monkeypatch, agent_graph.build_graph())
+
+    assert order == ["topic_generator", "content_creator", "reviewer", "image_generation", "post_executor"]
+    assert prompts == [final["final_post"]]
+    assert final["image_asset_urn"] == "urn:li:asset:test"
+
+
+def test_topic_source_runs_the_image_branch_alongside_drafting(fake_llm, fake_linkedin, monkeypatch):
+    prompts, order, final = _run(monkeypatch, agent_graph.build_graph(image_prompt_source="topic"))
+
+    assert order.index("image_generation") < order.index("reviewer")
+    assert order[-1] == "post_executor" and order.count("post_executor") == 1
+    assert prompts == [final["topic"]]
+    assert fake_linkedin == [final["final_post"]]
@@ -0,0 +1,51 @@
+import asyncio
+import io
+import json
+
+import httpx
+import pytest
+
+from app.services import linkedin_service
+from app.services.gemini_service import generate_gemini_image
+from app.services.Linkedin_credentials import set_credentials
+from app.services.linkedin_client import AsyncLinkedInHTTP
+from app.utils.constants import REGISTER_UPLOAD_URL
+
+EMAIL = "images@example.com"
+UPLOAD_URL = "https://upload.linkedin.test/image"
+REGISTERED = {"value": {
+    "asset": "urn:li:digitalmediaAsset:1",
+    "uploadMechanism": {"com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest": {"uploadUrl": UPLOAD_URL}},
+}}
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    """LinkedIn's register and upload endpoints; returns the uploaded bodies."""
+    bodies = []
+
+    def handler(request):
+        if str(request.url) == REGISTER_UPLOAD_URL:
+            assert json.loads(request.content)["registerUploadRequest"]["owner"] == "urn:li:person:img"
+            return httpx.Response(200, json=REGISTERED)
+        bodies.append(request.content)
+        return httpx.Response(201)
+
+    http = AsyncLinkedInHTTP()
+    http.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(linkedin_service, "get_async_linkedin_http", lambda: http)
+    set_credentials("img-token", "urn:li:person:img", user=EMAIL)
+    return bodies
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview, io.BytesIO], ids=lambda wrap: wrap.__name__)
+def test_image_is_uploaded_from_memory(uploads, wrap, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    image = generate_gemini_image.invoke("Remote hiring")
+
+    asset = asyncio.run(linkedin_service.aupload_media_to_linkedin(wrap(image), EMAIL))
+
+    assert asset == "urn:li:digitalmediaAsset:1"
+    assert uploads == [image]
+    assert image.startswith(b"\x89PNG")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.models.job import Job, JobStatus
+from app.services.job_queue import JobQueue
+from app.services.mongodb_service import acreate_job, aget_job, arequeue_unfinished_jobs
+from benchmarks.mongomock_backend import install_mongomock
+
+
+class StubGraph:
+    """Stands in for the compiled graph: every run publishes after delay seconds."""
+
+    checkpointer = None
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.runs = []
+
+    async def ainvoke(self, state, config):
+        self.runs.append(config["configurable"]["thread_id"])
+        await asyncio.sleep(self.delay)
+        return {"topic": state.topic, "messages": [{"role": "system", "content": "post_success"}]}
+
+
+def test_job_enqueued_by_two_processes_runs_once():
+    install_mongomock(latency=0)  # every call yields, so both workers read the job as queued
+    graph = StubGraph()
+    first, second = JobQueue(graph=graph), JobQueue(graph=graph)
+
+    async def scenario():
+        job = Job(niche="AI")
+        await acreate_job(job)
+        await asyncio.gather(first._execute(job.job_id), second._execute(job.job_id))
+        return await aget_job(job.job_id)
+
+    job = asyncio.run(scenario())
+    assert graph.runs == [job.job_id]
+    assert job.status == JobStatus.COMPLETED
+    assert job.attempts == 1
+
+
+def test_requeue_leaves_jobs_with_a_live_heartbeat_alone():
+    now = datetime.now(timezone.utc)
+    jobs = {
+        "queued": Job(niche="AI"),
+        "live": Job(niche="AI", status=JobStatus.RUNNING, heartbeat_at=now - timedelta(seconds=10)),
+        "stale": Job(niche="AI", status=JobStatus.RUNNING, heartbeat_at=now - timedelta(seconds=300)),
+        "legacy": Job(niche="AI", status=JobStatus.RUNNING),
+        "done": Job(niche="AI", status=JobStatus.COMPLETED),
+    }
+
+    async def scenario():
+        for job in jobs.values():
+            await acreate_job(job)
+        requeued = await arequeue_unfinished_jobs(now, lease_seconds=120)
+        return requeued, {name: (await aget_job(job.job_id)).status for name, job in jobs.items()}
+
+    requeued, statuses = asyncio.run(scenario())
+    assert set(requeued) == {jobs[name].job_id for name in ("queued", "stale", "legacy")}
+    assert statuses == {
+        "queued": JobStatus.QUEUED,
+        "live": JobStatus.RUNNING,
+        "stale": JobStatus.QUEUED,
+        "legacy": JobStatus.QUEUED,
+        "done": JobStatus.COMPLETED,
+    }
+
+
+def test_running_job_keeps_its_heartbeat_fresh():
+    queue = JobQueue(graph=StubGraph(delay=0.2), lease_seconds=0.08)
+
+    async def scenario():
+        job = Job(niche="AI")
+        await acreate_job(job)
+        task = asyncio.create_task(queue._execute(job.job_id))
+        await asyncio.sleep(0.15)
+        running = await aget_job(job.job_id)
+        await task
+        return running
+
+    running = asyncio.run(scenario())
+    assert running.status == JobStatus.RUNNING
+    assert running.worker == queue.owner
+    assert running.heartbeat_at > running.started_at
+
+
+def test_stop_releases_in_flight_jobs():
+    queue = JobQueue(graph=StubGraph(delay=60), workers=1)
+
+    async def scenario():
+        await queue.start()
+        job = await queue.submit("AI")
+        await asyncio.sleep(0.05)
+        running = (await aget_job(job.job_id)).status
+        await queue.stop()
+        return running, (await aget_job(job.job_id)).status
+
+    assert asyncio.run(scenario()) == (JobStatus.RUNNING, JobStatus.QUEUED)
+
+
+def test_running_queue_takes_over_jobs_with_a_stale_heartbeat():
+    graph = StubGraph()
+    queue = JobQueue(graph=graph, workers=1, lease_seconds=0.1)
+
+    async def scenario():
+        await queue.start()
+        # Another process died while running this job after the queue started
+        job = Job(niche="AI", status=JobStatus.RUNNING, heartbeat_at=datetime.now(timezone.utc))
+        await acreate_job(job)
+        await asyncio.sleep(0.35)
+        await queue.stop()
+        return await aget_job(job.job_id)
+
+    job = asyncio.run(scenario())
+    assert graph.runs == [job.job_id]
+    assert job.status == JobStatus.COMPLETED
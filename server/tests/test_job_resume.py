@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.models.job import JobStatus
+from app.services import agent_graph
+from app.services.agent_graph import build_graph
+from app.services.job_queue import JobQueue
+from app.services.mongodb_service import aget_job, get_checkpointer
+from app.utils.constants import LINKEDIN_POST_SUCCESS
+from benchmarks.fakes import FakeChatModel
+
+
+def test_resume_after_failed_publish_only_reruns_post_executor(fake_llm, fake_linkedin, monkeypatch):
+    llm_calls = []
+    generate = FakeChatModel._agenerate
+
+    async def counted(self, *args, **kwargs):
+        llm_calls.append(1)
+        return await generate(self, *args, **kwargs)
+
+    monkeypatch.setattr(FakeChatModel, "_agenerate", counted)
+
+    attempts = []
+
+    async def apublish(text, image_asset_urn=None, user_email=None):
+        attempts.append(text)
+        if len(attempts) == 1:
+            return "LinkedIn API error: 500", None
+        return LINKEDIN_POST_SUCCESS, "urn:li:share:1"
+
+    monkeypatch.setattr(agent_graph, "apublish_to_linkedin", apublish)
+
+    queue = JobQueue(graph=build_graph(checkpointer=get_checkpointer()))
+
+    async def scenario():
+        job = await queue.submit("AI", "resume@example.com")
+        await queue._execute(job.job_id)
+        failed = await aget_job(job.job_id)
+        calls_before_resume = len(llm_calls)
+
+        await queue.resume(failed)
+        await queue._execute(job.job_id)
+        return failed, calls_before_resume, await aget_job(job.job_id)
+
+    failed, calls_before_resume, resumed = asyncio.run(scenario())
+
+    assert failed.status == JobStatus.FAILED
+    assert calls_before_resume > 0
+    assert resumed.status == JobStatus.COMPLETED
+    assert resumed.resumes == 1
+    assert len(llm_calls) == calls_before_resume
+    assert len(attempts) == 2 and attempts[0] == attempts[1]
+
+
+def test_only_failed_jobs_can_be_resumed(fake_llm, fake_linkedin):
+    queue = JobQueue(graph=build_graph(checkpointer=get_checkpointer()))
+
+    async def scenario():
+        job = await queue.submit("AI", "resume@example.com")
+        await queue._execute(job.job_id)
+        completed = await aget_job(job.job_id)
+        with pytest.raises(ValueError, match="only failed jobs"):
+            await queue.resume(completed)
+        return completed
+
+    assert asyncio.run(scenario()).status == JobStatus.COMPLETED
@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+
+from app.services import linkedin_client
+from app.services.linkedin_client import AsyncLinkedInHTTP
+
+URL = "https://api.linkedin.com/v2/test"
+
+
+def _client(monkeypatch, *statuses, headers=None):
+    """An AsyncLinkedInHTTP answering with statuses in turn; returns it and the requests it saw."""
+    seen = []
+
+    def handler(request):
+        seen.append(request.method)
+        return httpx.Response(statuses[min(len(seen), len(statuses)) - 1], headers=headers or {})
+
+    monkeypatch.setattr(linkedin_client, "_backoff", lambda attempt: 0.0)
+    http = AsyncLinkedInHTTP()
+    http.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return http, seen
+
+
+def test_idempotent_call_is_retried_on_5xx(monkeypatch):
+    http, seen = _client(monkeypatch, 503, 502, 200)
+
+    response = asyncio.run(http.request("test", "GET", URL))
+
+    assert response.status_code == 200
+    assert seen == ["GET"] * 3
+
+
+def test_publish_is_not_retried_on_5xx(monkeypatch):
+    http, seen = _client(monkeypatch, 503, 200)
+
+    response = asyncio.run(http.request("test", "POST", URL, idempotent=False))
+
+    assert response.status_code == 503
+    assert seen == ["POST"]
+
+
+def test_429_pauses_the_shared_limits_and_is_retried(monkeypatch):
+    paused = []
+
+    async def apenalize(charges, seconds):
+        paused.append(seconds)
+
+    monkeypatch.setattr(linkedin_client, "apenalize", apenalize)
+    http, seen = _client(monkeypatch, 429, 201, headers={"Retry-After": "0"})
+
+    response = asyncio.run(http.request("test", "POST", URL, idempotent=False))
+
+    assert response.status_code == 201
+    assert seen == ["POST", "POST"]
+    assert paused == [0.0]
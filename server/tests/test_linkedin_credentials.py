@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.models.credentials import LinkedInCredentials
+from app.services import Linkedin_credentials
+from app.services.Linkedin_credentials import aget_credentials, get_credentials, set_credentials
+from app.services.mongodb_service import save_linkedin_credentials
+from app.utils.ttl_cache import TTLCache
+
+USER = "member@example.com"
+
+
+def _stored_elsewhere(token: str, expires_in: float = 3600) -> None:
+    """A login served by another process stores a new token."""
+    save_linkedin_credentials(LinkedInCredentials(
+        user=USER, access_token=token, person_urn="urn:li:person:1",
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+    ))
+
+
+def test_users_only_ever_get_their_own_token():
+    set_credentials("token-a", "urn:li:person:a", user="a@example.com", expires_in=3600)
+
+    assert get_credentials("a@example.com") == ("token-a", "urn:li:person:a")
+    assert get_credentials("b@example.com") == (None, None)
+
+
+def test_cached_token_is_refreshed_from_mongo_after_the_ttl(monkeypatch):
+    set_credentials("token-1", "urn:li:person:1", user=USER, expires_in=3600)
+    _stored_elsewhere("token-2")
+    assert get_credentials(USER)[0] == "token-1"
+
+    monkeypatch.setattr(Linkedin_credentials, "_cache", TTLCache(0))
+    assert get_credentials(USER)[0] == "token-2"
+    assert asyncio.run(aget_credentials(USER))[0] == "token-2"
+
+
+def test_expired_cached_token_is_reread_at_once():
+    set_credentials("token-1", "urn:li:person:1", user=USER, expires_in=30)  # inside the expiry skew
+    _stored_elsewhere("token-2")
+
+    assert get_credentials(USER)[0] == "token-2"
+
+
+def test_expired_token_everywhere_yields_no_credentials():
+    set_credentials("token-1", "urn:li:person:1", user=USER, expires_in=30)
+
+    assert get_credentials(USER) == (None, None)
+    assert asyncio.run(aget_credentials(USER)) == (None, None)
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.models.agent import AgentState
+from app.services import agent_graph, llm_cache
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(agent_graph, "LLM_CACHE_NODES", {"content_creator", "reviewer"})
+    return llm_cache.get_llm_cache()
+
+
+def _draft(state: AgentState) -> str:
+    return asyncio.run(agent_graph.acontent_creator_node(state))["post_draft"]
+
+
+def test_first_pass_is_answered_from_the_cache(fake_llm, memory_cache):
+    state = AgentState(niche="AI", topic="Remote hiring", user_email="cache@example.com")
+
+    assert _draft(state) == _draft(state)
+    assert memory_cache.stats.hits == 1
+
+
+def test_rework_pass_skips_the_cache(fake_llm, memory_cache):
+    state = AgentState(niche="AI", topic="Remote hiring", user_email="cache@example.com")
+    first = _draft(state)
+
+    rework = state.model_copy(update={"iteration_count": 1})
+    assert len({first, _draft(rework), _draft(rework)}) == 3
+    assert memory_cache.stats.hits == 0
+
+
+def test_rejected_drafts_are_rewritten_with_the_cache_on(fake_llm, fake_linkedin, memory_cache, monkeypatch):
+    fake_llm.approve_threshold = 2.0  # the reviewer rejects every draft
+    monkeypatch.setattr(agent_graph, "MAX_ITERATIONS", 3)
+    reviewed = []
+    review_outcome = agent_graph._review_outcome
+
+    def spy(state, content, current_iter):
+        reviewed.append(state.post_draft)
+        return review_outcome(state, content, current_iter)
+
+    monkeypatch.setattr(agent_graph, "_review_outcome", spy)
+    graph = agent_graph.build_graph(image_prompt_source="final_post")
+    asyncio.run(graph.ainvoke(AgentState(niche="AI", user_email="cache@example.com")))
+
+    assert len(reviewed) == 3
+    assert len(set(reviewed)) == len(reviewed)
+    assert memory_cache.stats.hits == 0
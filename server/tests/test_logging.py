@@ -0,0 +1,83 @@
+import asyncio
+import json
+import logging
+import queue
+
+from prometheus_client import REGISTRY
+
+from app.utils import logger as app_logger
+from app.utils.logger import ContextQueueHandler, JsonFormatter, log_context
+
+
+def _json_lines(log_calls) -> list:
+    """Run log_calls(logger) through a ContextQueueHandler and return the records as JSON objects."""
+    handler = ContextQueueHandler(queue.Queue())
+    log = logging.getLogger("tests.json")
+    log.propagate = False
+    log.addHandler(handler)
+    try:
+        log_calls(log)
+    finally:
+        log.removeHandler(handler)
+    formatter = JsonFormatter()
+    return [json.loads(formatter.format(handler.queue.get_nowait())) for _ in range(handler.queue.qsize())]
+
+
+def _dropped_metric() -> float:
+    return REGISTRY.get_sample_value("postsync_log_records_dropped_total")
+
+
+def test_full_queue_drops_records_without_blocking():
+    handler = ContextQueueHandler(queue.Queue(2))
+    log = logging.getLogger("tests.full_queue")
+    log.propagate = False
+    log.addHandler(handler)
+    try:
+        for i in range(5):
+            log.warning("record %d", i)
+    finally:
+        log.removeHandler(handler)
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_dropped_records_are_exported(monkeypatch):
+    before = _dropped_metric()
+    monkeypatch.setattr(app_logger.queue_handler, "dropped", app_logger.queue_handler.dropped + 4)
+
+    assert _dropped_metric() == before + 4
+
+
+def test_records_carry_the_workflow_context_and_extras():
+    def log_calls(log):
+        with log_context(workflow_id="job-1", node=None):
+            with log_context(node="reviewer"):
+                log.info("reviewed %s", "draft", extra={"iteration": 2})
+            log.warning("outside the node")
+        log.info("no workflow")
+
+    inner, outer, bare = _json_lines(log_calls)
+    assert inner["message"] == "reviewed draft"
+    assert (inner["workflow_id"], inner["node"], inner["iteration"]) == ("job-1", "reviewer", 2)
+    assert (outer["level"], outer["workflow_id"], "node" in outer) == ("WARNING", "job-1", False)
+    assert "workflow_id" not in bare
+
+
+def test_context_follows_tasks_and_tracebacks_are_rendered():
+    def log_calls(log):
+        async def node():
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                log.exception("node failed")
+
+        async def workflow():
+            with log_context(workflow_id="job-2"):
+                await asyncio.create_task(node())
+
+        asyncio.run(workflow())
+
+    (record,) = _json_lines(log_calls)
+    assert record["workflow_id"] == "job-2"
+    assert "ValueError: boom" in record["exc"]
@@ -0,0 +1,37 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.main import app
+from app.models.agent import AgentState
+from app.services.agent_graph import build_graph
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_workflow_nodes_and_llm_calls_are_measured(fake_llm, fake_linkedin):
+    before = {
+        "nodes": _sample("postsync_node_duration_seconds_count", node="post_executor"),
+        "llm": _sample("postsync_llm_request_duration_seconds_count", node="topic_generator", model="unknown"),
+        "tokens": _sample("postsync_llm_tokens_total", node="content_creator", model="unknown", kind="completion"),
+    }
+
+    asyncio.run(build_graph().ainvoke(AgentState(niche="AI", user_email="metrics@example.com")))
+
+    assert _sample("postsync_node_duration_seconds_count", node="post_executor") == before["nodes"] + 1
+    assert _sample("postsync_llm_request_duration_seconds_count", node="topic_generator",
+                   model="unknown") == before["llm"] + 1
+    assert _sample("postsync_llm_tokens_total", node="content_creator", model="unknown",
+                   kind="completion") > before["tokens"]
+
+
+def test_metrics_endpoint_serves_the_prometheus_text_format():
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE postsync_node_duration_seconds histogram" in response.text
+    assert "postsync_log_records_dropped_total" in response.text
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+from app.services import mongodb_service
+from app.services.mongodb_service import (
+    APP_DB_NAME,
+    INDEXES,
+    aensure_indexes,
+    aget_or_create_user,
+    aget_user_post_count,
+    aget_user_posts,
+    asave_post,
+)
+from app.utils.config import MONGO_MAX_POOL_SIZE
+from benchmarks.mongomock_backend import install_mongomock
+
+# Taken at import, before the mongo fixture points get_client at mongomock
+get_real_client = mongodb_service.get_client
+
+EMAIL = "data@example.com"
+
+
+def test_one_pooled_client_is_shared_across_threads(monkeypatch):
+    created = []
+
+    class CountingClient:
+        def __init__(self, uri, **options):
+            created.append(options)
+
+    monkeypatch.setattr(mongodb_service, "MongoClient", CountingClient)
+    monkeypatch.setattr(mongodb_service, "_client", None)
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(get_real_client())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert created[0]["maxPoolSize"] == MONGO_MAX_POOL_SIZE
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_async_layer_saves_posts_and_counts_them(millisecond_free_projection):
+    async def scenario():
+        user = await aget_or_create_user("data-id", EMAIL)
+        await asave_post(EMAIL, "AI", "Agents in production")
+        await asave_post(EMAIL, "AI", "Evaluating agents")
+        return user, await aget_user_posts(EMAIL), await aget_user_post_count(EMAIL)
+
+    user, posts, count = asyncio.run(scenario())
+    assert user["is_new_user"] is True
+    assert [post["topic"] for post in posts] == ["Evaluating agents", "Agents in production"]
+    assert count == 2
+
+
+def test_indexes_are_created_and_safe_to_ensure_again(mongo):
+    asyncio.run(aensure_indexes())
+    asyncio.run(aensure_indexes())
+
+    database = mongo[APP_DB_NAME]
+    for name, models in INDEXES.items():
+        assert {model.document["name"] for model in models} <= set(database[name].index_information())
+    assert database["users"].index_information()["email_unique"]["unique"] is True
+
+
+def test_concurrent_logins_create_one_user():
+    client = install_mongomock(latency=0)  # every call yields, so the logins interleave
+    asyncio.run(aensure_indexes())
+
+    async def logins():
+        return await asyncio.gather(*(aget_or_create_user(f"id-{i}", EMAIL) for i in range(5)))
+
+    users = asyncio.run(logins())
+    assert sum(user["is_new_user"] for user in users) == 1
+    assert len({user["user_id"] for user in users}) == 1
+    assert client[APP_DB_NAME]["users"].count_documents({"email": EMAIL}) == 1
@@ -0,0 +1,57 @@
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import mongodb_service
+
+EMAIL = "history@example.com"
+
+# The posts below are on whole seconds
+pytestmark = pytest.mark.usefixtures("millisecond_free_projection")
+
+
+def _seed(dates) -> None:
+    mongodb_service.get_collection().insert_many(
+        [{"user_email": EMAIL, "niche": "AI", "topic": f"topic {i}", "posted_date": date} for i, date in enumerate(dates)]
+        # Claims that were never published are not part of the history
+        + [{"user_email": EMAIL, "niche": "AI", "topic": "unpublished", "status": "failed"}]
+    )
+
+
+def _all_pages(limit: int) -> list:
+    pages, cursor = [], None
+    while True:
+        page = mongodb_service.get_user_posts_page(EMAIL, limit, cursor)
+        pages.append([post["topic"] for post in page["posts"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_pages_are_newest_first_without_gaps_or_repeats():
+    start = datetime(2026, 1, 1)
+    _seed([start + timedelta(hours=i) for i in range(7)])
+
+    assert _all_pages(3) == [["topic 6", "topic 5", "topic 4"], ["topic 3", "topic 2", "topic 1"], ["topic 0"]]
+
+
+def test_posts_with_the_same_date_are_paged_by_id():
+    same = datetime(2026, 1, 1, 12)
+    _seed([datetime(2026, 1, 2)] + [same] * 5 + [datetime(2025, 12, 31)])
+
+    pages = _all_pages(2)
+    topics = [topic for page in pages for topic in page]
+    # Inserted in order, so later posts have larger ids and come first among equals
+    assert topics == ["topic 0", "topic 5", "topic 4", "topic 3", "topic 2", "topic 1", "topic 6"]
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+
+
+def test_malformed_cursor_is_rejected():
+    client = TestClient(app)
+    for cursor in ("not-a-cursor", base64.urlsafe_b64encode(b"2026-01-01T00:00:00|nope").decode()):
+        response = client.get(f"/agent/user-posts/{EMAIL}", params={"cursor": cursor})
+        assert response.status_code == 400, response.text
+        assert "Invalid cursor" in response.json()["detail"]
@@ -0,0 +1,123 @@
+import asyncio
+import socket
+
+import httpx
+import pytest
+import requests
+
+from app.models.agent import AgentState
+from app.services import agent_graph, linkedin_client, linkedin_service
+from app.services.linkedin_service import PublicationUnconfirmed
+from app.services.mongodb_service import get_collection
+from app.utils.constants import LINKEDIN_POST_SUCCESS
+
+
+def _state(**fields) -> AgentState:
+    return AgentState(niche="AI", topic="Remote hiring", final_post="Hiring remotely? Start here.",
+                      user_email="ledger@example.com", idempotency_key="workflow-1", **fields)
+
+
+def _publish(state: AgentState) -> dict:
+    return asyncio.run(agent_graph.apost_executor_node(state))
+
+
+@pytest.fixture
+def linkedin(monkeypatch):
+    """Scripted apublish_to_linkedin: each call pops the next outcome (a result or an exception)."""
+    outcomes, calls = [], []
+
+    async def apublish(text, image_asset_urn=None, user_email=None):
+        calls.append(text)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(agent_graph, "apublish_to_linkedin", apublish)
+    return outcomes, calls
+
+
+def test_published_workflow_is_not_published_again(linkedin):
+    outcomes, calls = linkedin
+    outcomes.append((LINKEDIN_POST_SUCCESS, "urn:li:share:1"))
+
+    first, retry = _publish(_state()), _publish(_state())
+    assert len(calls) == 1
+    assert first["linkedin_post_id"] == retry["linkedin_post_id"] == "urn:li:share:1"
+    assert retry["messages"][-1]["content"] == "post_success"
+
+
+def test_failed_publish_is_released_for_a_retry(linkedin):
+    outcomes, calls = linkedin
+    outcomes += [("❌ LinkedIn post failed with status 422: bad", None), (LINKEDIN_POST_SUCCESS, "urn:li:share:2")]
+
+    assert _publish(_state())["messages"][-1]["content"] == "post_failed"
+    assert _publish(_state())["linkedin_post_id"] == "urn:li:share:2"
+    assert len(calls) == 2
+
+
+def test_unanswered_publish_is_never_retried(linkedin):
+    outcomes, calls = linkedin
+    outcomes.append(PublicationUnconfirmed("timed out"))
+
+    assert _publish(_state())["messages"][-1]["content"] == "post_unconfirmed"
+    assert _publish(_state())["messages"][-1]["content"] == "post_unconfirmed"
+    assert len(calls) == 1
+    entry = get_collection().find_one({"idempotency_key": "workflow-1"})
+    assert entry["status"] == "unconfirmed"
+    assert "posted_date" not in entry
+
+
+@pytest.mark.parametrize("error, unconfirmed", [
+    (httpx.ReadTimeout, True),
+    (httpx.RemoteProtocolError, True),
+    (httpx.ConnectError, False),
+    (httpx.ConnectTimeout, False),
+])
+def test_publish_errors_that_may_have_reached_linkedin_are_unconfirmed(monkeypatch, error, unconfirmed):
+    def handler(request):
+        raise error("no answer", request=request)
+
+    http = linkedin_client.AsyncLinkedInHTTP()
+    http.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(linkedin_client, "_async_http", http)
+
+    publish = linkedin_service.apublish_to_linkedin("Hello LinkedIn")
+    if unconfirmed:
+        with pytest.raises(PublicationUnconfirmed):
+            asyncio.run(publish)
+    else:
+        status, post_urn = asyncio.run(publish)
+        assert status.startswith("🌐") and post_urn is None
+
+
+@pytest.mark.parametrize("error, unconfirmed", [
+    (requests.ReadTimeout, True),
+    (requests.ConnectionError, True),
+    (requests.ConnectTimeout, False),
+])
+def test_sync_publish_errors_that_may_have_reached_linkedin_are_unconfirmed(monkeypatch, error, unconfirmed):
+    def request(*args, **kwargs):
+        raise error("no answer")
+
+    http = linkedin_client.LinkedInHTTP()
+    monkeypatch.setattr(http.session, "request", request)
+    monkeypatch.setattr(linkedin_client, "_http", http)
+
+    if unconfirmed:
+        with pytest.raises(PublicationUnconfirmed):
+            linkedin_service.publish_to_linkedin("Hello LinkedIn")
+    else:
+        status, post_urn = linkedin_service.publish_to_linkedin("Hello LinkedIn")
+        assert status.startswith("🌐") and post_urn is None
+
+
+def test_sync_publish_to_a_refused_connection_is_a_network_error(monkeypatch):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    monkeypatch.setattr(linkedin_service, "LINKEDIN_POST_API_URL", f"http://127.0.0.1:{port}/v2/ugcPosts")
+    monkeypatch.setattr(linkedin_client, "_http", linkedin_client.LinkedInHTTP())
+
+    status, post_urn = linkedin_service.publish_to_linkedin("Hello LinkedIn")
+    assert status.startswith("🌐") and post_urn is None
@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+
+from app.models.agent import AgentState
+from app.services import agent_graph, llm_cache, rate_limiter
+from app.services.rate_limiter import Bucket, QuotaExhausted, RateLimited, acquire, call_openai
+from benchmarks.fakes import FakeChatModel
+
+
+def _rate_limit_error(code=None, headers=None) -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("rate limited", response=response, body={"code": code} if code else None)
+
+
+class Flaky:
+    """A call raising the given errors first, then returning "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Set the OpenAI per-minute limits (requests, tokens)."""
+    def set_limits(requests: int, tokens: int) -> None:
+        monkeypatch.setattr(rate_limiter, "OPENAI_REQUESTS_PER_MINUTE", requests)
+        monkeypatch.setattr(rate_limiter, "OPENAI_TOKENS_PER_MINUTE", tokens)
+    return set_limits
+
+
+@pytest.fixture
+def mongo_calls(monkeypatch):
+    """Count the bucket reads and writes that reach MongoDB."""
+    calls = []
+    for name in ("take_bucket_tokens", "block_bucket", "atake_bucket_tokens", "ablock_bucket"):
+        original = getattr(rate_limiter, name)
+
+        def counted(*args, _original=original, _name=name, **kwargs):
+            calls.append(_name)
+            return _original(*args, **kwargs)
+        monkeypatch.setattr(rate_limiter, name, counted)
+    return calls
+
+
+def test_bucket_grants_a_minute_of_capacity_then_paces():
+    bucket = Bucket("openai", "openai:test:requests", 60)
+    now = time.time()
+
+    assert bucket.take(60, now) == 0
+    assert bucket.take(1, now) == pytest.approx(1.0, abs=0.01)
+    assert bucket.take(1, now + 1.0) == 0
+
+
+def test_acquire_gives_up_past_the_deadline():
+    charges = [(Bucket("openai", "openai:test:tokens", 600), 600)]
+    acquire(charges)
+
+    with pytest.raises(RateLimited):
+        acquire(charges, deadline=time.time() + 1)
+
+
+def test_unlimited_buckets_never_reach_mongo(limits, mongo_calls):
+    limits(0, 0)
+
+    assert call_openai("gpt-test", 100, Flaky()) == "ok"
+    assert asyncio.run(rate_limiter.aacquire(rate_limiter.openai_charges("gpt-test", 100))) is None
+    assert mongo_calls == []
+
+
+def test_429_without_limits_still_waits_out_retry_after(limits, mongo_calls):
+    limits(0, 0)
+    call = Flaky(_rate_limit_error(headers={"retry-after-ms": "200"}))
+
+    started = time.time()
+    assert call_openai("gpt-test", 100, call) == "ok"
+    assert time.time() - started >= 0.2
+    assert call.calls == 2
+    assert mongo_calls == []
+
+
+def test_429_pauses_the_shared_buckets_for_every_worker(limits):
+    limits(1000, 0)
+    charges = rate_limiter.openai_charges("gpt-test", 100)
+    started = time.time()
+    assert call_openai("gpt-test", 100, Flaky(_rate_limit_error(headers={"retry-after-ms": "200"}))) == "ok"
+    assert time.time() - started >= 0.2
+
+    # Another worker's call on the same model waits until the pause is over
+    rate_limiter.penalize(charges, 0.2)
+    started = time.time()
+    acquire(charges)
+    assert time.time() - started >= 0.2
+
+
+def test_insufficient_quota_is_a_typed_rate_limit_error(limits):
+    limits(0, 0)
+    call = Flaky(_rate_limit_error(code="insufficient_quota"))
+
+    with pytest.raises(QuotaExhausted) as raised:
+        call_openai("gpt-test", 100, call)
+    assert isinstance(raised.value, RateLimited)
+    assert call.calls == 1
+
+
+class OutOfCredit(FakeChatModel):
+    async def _agenerate(self, *args, **kwargs):
+        raise _rate_limit_error(code="insufficient_quota")
+
+
+def test_nodes_fail_on_exhausted_quota_instead_of_falling_back(monkeypatch):
+    monkeypatch.setattr(agent_graph, "llm", OutOfCredit(latency=0.0))
+    state = AgentState(niche="AI", topic="Remote hiring", user_email="quota@example.com")
+
+    with pytest.raises(QuotaExhausted):
+        asyncio.run(agent_graph.acontent_creator_node(state))
+
+
+def test_cache_hits_draw_no_rate_limit_capacity(fake_llm, limits, mongo_calls, monkeypatch):
+    limits(1000, 100_000)
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(agent_graph, "LLM_CACHE_NODES", {"content_creator"})
+    state = AgentState(niche="AI", topic="Remote hiring", user_email="limits@example.com")
+
+    asyncio.run(agent_graph.acontent_creator_node(state))
+    drawn = len(mongo_calls)
+    asyncio.run(agent_graph.acontent_creator_node(state))
+
+    assert llm_cache.get_llm_cache().stats.hits == 1
+    assert drawn == 2  # the requests and the tokens bucket
+    assert len(mongo_calls) == drawn
@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.models.job import Job
+from app.models.schedule import Schedule, ScheduleCadence
+from app.services.mongodb_service import acreate_schedule, aget_schedule
+from app.services.scheduler import Scheduler, run_key
+from benchmarks.mongomock_backend import install_mongomock
+
+
+class RecordingQueue:
+    """Stands in for the JobQueue: records the runs submitted to it."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.submitted = []
+
+    async def submit(self, niche, user_email=None, idempotency_key=None):
+        if self.fail:
+            raise RuntimeError("queue unavailable")
+        self.submitted.append(idempotency_key)
+        return Job(niche=niche, user_email=user_email, idempotency_key=idempotency_key)
+
+
+def _daily(now: datetime) -> Schedule:
+    due = now - timedelta(minutes=5)
+    return Schedule(user_email="autopilot@example.com", niche="AI", cadence=ScheduleCadence.DAILY,
+                    time_of_day=due.strftime("%H:%M"), next_run_at=due.replace(second=0, microsecond=0))
+
+
+def test_due_schedule_is_started_once_across_schedulers():
+    install_mongomock(latency=0)  # every call yields, so both schedulers poll at once
+    now = datetime.now(timezone.utc)
+    schedule = _daily(now)
+    first, second = RecordingQueue(), RecordingQueue()
+
+    async def scenario():
+        await acreate_schedule(schedule)
+        claimed = await asyncio.gather(Scheduler(first).run_due(now), Scheduler(second).run_due(now))
+        return claimed, await aget_schedule(schedule.schedule_id)
+
+    claimed, stored = asyncio.run(scenario())
+    assert sorted(claimed) == [0, 1]
+    assert first.submitted + second.submitted == [run_key(schedule, schedule.next_run_at)]
+    assert stored.runs == 1
+    assert stored.next_run_at == schedule.next_run_at + timedelta(days=1)
+
+
+def test_run_left_by_a_failed_holder_is_retried_after_its_lease():
+    now = datetime.now(timezone.utc)
+    schedule = _daily(now)
+    retry = RecordingQueue()
+
+    async def scenario():
+        await acreate_schedule(schedule)
+        holder = Scheduler(RecordingQueue(fail=True), lease_seconds=60)
+        await holder.run_due(now)
+        during_lease = await Scheduler(retry).run_due(now + timedelta(seconds=30))
+        after_lease = await Scheduler(retry).run_due(now + timedelta(seconds=61))
+        return during_lease, after_lease
+
+    assert asyncio.run(scenario()) == (0, 1)
+    assert retry.submitted == [run_key(schedule, schedule.next_run_at)]
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.utils import config
+
+# Libraries app.main must not load at import: each is deferred to first use
+HEAVY_MODULES = ("langchain_openai", "openai", "google.generativeai", "PIL")
+
+
+def test_importing_the_app_defers_heavy_clients():
+    script = (
+        "import sys, app.main\n"
+        "from app.services import agent_graph\n"
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules], agent_graph._graph, agent_graph.llm)\n"
+    )
+    # A fresh interpreter, run from server/ with the test environment
+    output = subprocess.run([sys.executable, "-c", script], cwd=Path(__file__).parents[1], env=os.environ.copy(),
+                            capture_output=True, text=True, check=True).stdout
+
+    assert output.strip().splitlines()[-1] == "[] None None"
+
+
+def test_missing_configuration_fails_at_startup_not_import(monkeypatch):
+    monkeypatch.delenv(config.required_vars[0], raising=False)
+
+    with pytest.raises(EnvironmentError, match=config.required_vars[0]):
+        config.validate_config()
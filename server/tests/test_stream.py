@@ -0,0 +1,32 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def _events(body: str) -> list:
+    """(event, data) pairs of a Server-Sent Events body."""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_each_node_update_then_done(fake_llm, fake_linkedin):
+    with TestClient(app).stream("GET", "/agent/stream", params={"niche": "AI", "email": "sse@example.com"}) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _events(response.read().decode())
+
+    nodes = [data["node"] for event, data in events if event == "node"]
+    assert nodes == ["topic_generator", "content_creator", "reviewer", "image_generation", "post_executor"]
+    assert events[0][1]["update"]["topic"]
+    assert events[-1] == ("done", {"status": "success"})
+    assert len(fake_linkedin) == 1
+
+
+def test_invalid_niche_is_rejected_before_streaming(fake_llm):
+    response = TestClient(app).get("/agent/stream", params={"niche": " ", "email": "sse@example.com"})
+
+    assert response.status_code == 422
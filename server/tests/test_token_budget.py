@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.models.agent import AgentState
+from app.services import agent_graph, llm_cache, token_budget
+from app.services.mongodb_service import get_token_usage
+from app.services.token_budget import TokenBudgetExceeded, ainvoke_llm, invoke_llm
+from benchmarks.fakes import FakeChatModel
+from benchmarks.mongomock_backend import install_mongomock
+
+EMAIL = "budget@example.com"
+MESSAGES = [SystemMessage(content="You write LinkedIn posts."), HumanMessage(content="Write about AI.")]
+
+
+class FailingModel(FakeChatModel):
+    def _generate(self, *args, **kwargs):
+        raise RuntimeError("provider down")
+
+
+def _used() -> int:
+    return get_token_usage(EMAIL, token_budget._today())
+
+
+def test_reservation_is_settled_to_reported_usage(monkeypatch):
+    monkeypatch.setattr(token_budget, "USER_DAILY_TOKEN_BUDGET", 10_000)
+    model = FakeChatModel(latency=0.0)
+
+    result = invoke_llm("content_creator", model, MESSAGES, EMAIL)
+
+    assert _used() == result.usage_metadata["total_tokens"]
+
+
+def test_failed_call_releases_its_reservation(monkeypatch):
+    monkeypatch.setattr(token_budget, "USER_DAILY_TOKEN_BUDGET", 10_000)
+
+    with pytest.raises(RuntimeError):
+        invoke_llm("content_creator", FailingModel(latency=0.0), MESSAGES, EMAIL)
+
+    assert _used() == 0
+
+
+def test_concurrent_calls_never_reserve_past_the_budget(monkeypatch):
+    install_mongomock(latency=0)  # every call yields, so the reservations interleave
+    _, _, reserved = token_budget._prepare("content_creator", MESSAGES)
+    monkeypatch.setattr(token_budget, "USER_DAILY_TOKEN_BUDGET", reserved * 3)
+    model = FakeChatModel(latency=0.01)
+
+    async def scenario():
+        calls = [ainvoke_llm("content_creator", model, MESSAGES, EMAIL) for _ in range(10)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    rejected = [r for r in results if isinstance(r, TokenBudgetExceeded)]
+    assert len(rejected) == 7
+    assert _used() <= reserved * 3
+
+
+def test_exhausted_budget_rejects_the_workflow_up_front(monkeypatch):
+    monkeypatch.setattr(token_budget, "USER_DAILY_TOKEN_BUDGET", 1)
+
+    with pytest.raises(TokenBudgetExceeded):
+        token_budget.ensure_token_budget(EMAIL)
+    token_budget.ensure_token_budget(None)
+
+
+def test_cache_hits_are_not_charged(fake_llm, monkeypatch):
+    monkeypatch.setattr(token_budget, "USER_DAILY_TOKEN_BUDGET", 10_000)
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(agent_graph, "LLM_CACHE_NODES", {"content_creator"})
+    state = AgentState(niche="AI", topic="Remote hiring", user_email=EMAIL)
+
+    asyncio.run(agent_graph.acontent_creator_node(state))
+    charged = _used()
+    asyncio.run(agent_graph.acontent_creator_node(state))
+
+    assert llm_cache.get_llm_cache().stats.hits == 1
+    assert charged > 0
+    assert _used() == charged
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from app.models.agent import AgentState
+from app.services import agent_graph
+from app.services.topic_index import DuplicateTopic, TopicIndex, load_topic_index
+from benchmarks.fakes import FakeChatModel
+
+POSTED = "Why small language models win in production"
+
+
+class ScriptedTopics(FakeChatModel):
+    """Proposes the given topics in turn, repeating the last one."""
+
+    topics: list
+    prompts: list = []
+
+    def _reply(self, messages):
+        self.prompts.append(str(messages[-1].content))
+        return self.topics[min(len(self.prompts), len(self.topics)) - 1]
+
+
+def _state() -> AgentState:
+    return AgentState(niche="AI", user_email="dedup@example.com")
+
+
+def test_index_finds_reworded_topics_only():
+    index = TopicIndex([POSTED, "Remote work and team rituals"])
+
+    assert [topic for _, topic in index.similar("Why small language-models WIN in production!", 0.6)] == [POSTED]
+    assert index.similar("Quantum computing for supply chains", 0.6) == []
+
+
+def test_repeated_topic_is_regenerated_with_clashes_to_avoid(monkeypatch):
+    model = ScriptedTopics(latency=0.0, topics=[POSTED + "!", "Evaluating LLM agents with replayed traces"])
+    monkeypatch.setattr(agent_graph, "llm", model)
+    load_topic_index("dedup@example.com", "AI", [POSTED])
+
+    result = asyncio.run(agent_graph.atopic_generator_node(_state()))
+
+    assert result["topic"] == "Evaluating LLM agents with replayed traces"
+    assert len(model.prompts) == 2
+    assert POSTED in model.prompts[1]
+
+
+def test_topic_that_keeps_repeating_raises_duplicate_topic(monkeypatch):
+    model = ScriptedTopics(latency=0.0, topics=[POSTED])
+    monkeypatch.setattr(agent_graph, "llm", model)
+    load_topic_index("dedup@example.com", "AI", [POSTED])
+
+    with pytest.raises(DuplicateTopic) as raised:
+        agent_graph.topic_generator_node(_state())
+
+    assert raised.value.posted_topic == POSTED
+    assert len(model.prompts) == agent_graph.TOPIC_MAX_REGENERATIONS + 1
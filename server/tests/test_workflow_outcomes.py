@@ -0,0 +1,51 @@
+import asyncio
+
+from app.models.agent import AgentState
+from app.routes import route
+from app.services import agent_graph
+from app.services.batch_runner import run_batch
+from app.services.mongodb_service import aget_job_summary_from_summary_collection, aget_or_create_user
+
+
+class FailingGraph:
+    """A graph that raises before reaching post_executor."""
+
+    async def ainvoke(self, state, config=None):
+        raise RuntimeError("graph exploded")
+
+    async def astream(self, state, config=None):
+        yield {"topic_generator": {"topic": "Remote hiring"}}
+        raise RuntimeError("graph exploded")
+
+
+def _summary() -> dict:
+    return asyncio.run(aget_job_summary_from_summary_collection())
+
+
+def test_published_and_failed_posts_are_counted(fake_llm, fake_linkedin):
+    asyncio.run(aget_or_create_user("outcomes-id", "outcomes@example.com"))
+    graph = agent_graph.build_graph(image_prompt_source="final_post")
+    asyncio.run(graph.ainvoke(AgentState(niche="AI", user_email="outcomes@example.com")))
+    asyncio.run(agent_graph.apost_executor_node(AgentState(niche="AI", user_email="outcomes@example.com")))
+
+    summary = _summary()
+    assert (summary["total_completed"], summary["total_failed"]) == (1, 1)
+
+
+def test_batch_counts_workflows_that_raise():
+    result = asyncio.run(run_batch(FailingGraph(), [("AI", "a@example.com"), ("Cloud", "b@example.com")]))
+
+    assert result["failed"] == 2
+    assert _summary()["total_failed"] == 2
+
+
+def test_stream_counts_workflows_that_raise(monkeypatch):
+    monkeypatch.setattr(route, "get_graph", FailingGraph)
+
+    async def consume() -> str:
+        response = await route.stream_agent_workflow("AI", "stream@example.com")
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    body = asyncio.run(consume())
+    assert "event: error" in body
+    assert _summary()["total_failed"] == 1